@@ -0,0 +1,113 @@
+/**
+ * Precompressed Artifacts - Serve build outputs with strong ETags and gzip
+ * `parseUSTAV.py --gzip` (or `artifactCompressor.py`) writes <artifact>.gz
+ * next to every JSON artifact and records size, mtime and content-hash ETags
+ * in data/artifacts.json. Responses stream those bytes as they are: nothing
+ * is compressed or hashed per request, and a revalidation costs one stat.
+ * An artifact rewritten since it was compressed no longer matches its
+ * manifest entry and is left to the caller's fallback.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const DATA_DIR = path.join(__dirname, '../../data');
+
+function contentType(name) {
+  return name.endsWith('.ndjson') ? 'application/x-ndjson' : 'application/json; charset=utf-8';
+}
+
+/**
+ * True when an If-None-Match header lists the given ETag (weak comparison)
+ */
+function etagMatches(header, etag) {
+  if (!header) return false;
+  return header.split(',').some((tag) => {
+    const value = tag.trim();
+    return value === '*' || value.replace(/^W\//, '') === etag;
+  });
+}
+
+function createArtifactServer(dataDir = DATA_DIR) {
+  const manifestPath = path.join(dataDir, 'artifacts.json');
+  let artifacts = null;
+  let manifestMtime = 0;
+
+  function loadManifest() {
+    try {
+      const stat = fs.statSync(manifestPath);
+      if (stat.mtimeMs !== manifestMtime) {
+        artifacts = JSON.parse(fs.readFileSync(manifestPath, 'utf-8')).artifacts || {};
+        manifestMtime = stat.mtimeMs;
+      }
+    } catch (error) {
+      artifacts = null;
+      manifestMtime = 0;
+    }
+    return artifacts;
+  }
+
+  /**
+   * Manifest entry of an artifact whose file is still the one that was hashed
+   */
+  function freshEntry(name) {
+    const manifest = loadManifest();
+    if (!manifest || !Object.prototype.hasOwnProperty.call(manifest, name)) return null;
+    const entry = manifest[name];
+    try {
+      const stat = fs.statSync(path.join(dataDir, name), { bigint: true });
+      if (Number(stat.size) !== entry.bytes || String(stat.mtimeNs) !== entry.mtimeNs) return null;
+    } catch (error) {
+      return null;
+    }
+    return entry;
+  }
+
+  /**
+   * Send an artifact with ETag / If-None-Match support, gzip when accepted
+   * @param {string} name - Path relative to data/ ('ustav.json', 'ustav/ch1.json')
+   * @param {Object} options - { accept(entry): false to refuse, e.g. a dedup ustav.json }
+   * @returns {boolean} - false when the artifact cannot be served this way
+   */
+  function sendArtifact(req, res, name, options = {}) {
+    const entry = freshEntry(name);
+    if (!entry || (options.accept && !options.accept(entry))) return false;
+
+    const gzip = Boolean(entry.gzip) && req.acceptsEncodings(['gzip', 'identity']) === 'gzip';
+    const etag = gzip ? entry.gzip.etag : entry.etag;
+    res.set({
+      ETag: etag,
+      Vary: 'Accept-Encoding',
+      'Cache-Control': 'no-cache',
+      'Content-Type': contentType(name)
+    });
+    if (etagMatches(req.get('If-None-Match'), etag)) {
+      res.status(304).end();
+      return true;
+    }
+
+    const filePath = path.join(dataDir, name);
+    if (gzip) res.set('Content-Encoding', 'gzip');
+    res.set('Content-Length', String(gzip ? entry.gzip.bytes : entry.bytes));
+    fs.createReadStream(gzip ? path.join(path.dirname(filePath), entry.gzip.path) : filePath)
+      .on('error', (error) => {
+        console.error(`[Artifacts] Failed to read ${name}:`, error.message);
+        if (!res.headersSent) {
+          res.removeHeader('Content-Encoding');
+          res.removeHeader('Content-Length');
+          res.status(500).json({ error: `Artifact ${name} is unavailable` });
+        } else {
+          res.destroy(error);
+        }
+      })
+      .pipe(res);
+    return true;
+  }
+
+  return { sendArtifact, freshEntry };
+}
+
+module.exports = {
+  createArtifactServer,
+  etagMatches
+};
@@ -52,31 +52,40 @@ function augment(prompt, userData, context = {}) {
   }
 
   // Step 1: Validate user data against inputSchema
-  const validation = validateUserData(safeUserData, prompt.inputSchema);
+  const validation = validateUserData(safeUserData, prompt.inputSchema, prompt.interpolationPlan);
   if (!validation.valid) {
     throw new Error(`Invalid user data: ${validation.errors.join(', ')}`);
   }
 
   let augmentedPrompt = prompt.promptCode;
 
-  // Step 2: Interpolate input placeholders
-  Object.keys(safeUserData).forEach((inputKey) => {
-    // Skip internal keys (starting with _)
-    if (inputKey.startsWith('_')) return;
-    const placeholders = augmentedPrompt.match(/\[User:\s*Paste Data\]/g);
-
-    if (placeholders && placeholders.length > 0) {
-      // Replace first occurrence only (one per input)
-      const formattedData = formatDataForPrompt(safeUserData[inputKey]);
-      augmentedPrompt = augmentedPrompt.replace(
-        /\[User:\s*Paste Data\]/,
-        formattedData
-      );
-    }
-  });
+  // Step 2: Interpolate input placeholders (single join when the parser
+  // precompiled an interpolation plan for this prompt)
+  if (prompt.interpolationPlan) {
+    augmentedPrompt = applyInterpolationPlan(prompt.interpolationPlan, prompt.promptCode, safeUserData);
+  } else {
+    Object.keys(safeUserData).forEach((inputKey) => {
+      // Skip internal keys (starting with _)
+      if (inputKey.startsWith('_')) return;
+      const placeholders = augmentedPrompt.match(/\[User:\s*Paste Data\]/g);
+
+      if (placeholders && placeholders.length > 0) {
+        // Replace first occurrence only (one per input)
+        const formattedData = formatDataForPrompt(safeUserData[inputKey]);
+        augmentedPrompt = augmentedPrompt.replace(
+          /\[User:\s*Paste Data\]/,
+          formattedData
+        );
+      }
+    });
+  }
 
-  // Step 3: Add metadata header
-  const header = buildExecutionContext(prompt, context);
+  // Step 3: Add metadata header, plus the token-budgeted problem background
+  // only when retrieval found precomputed chunks (never without --chunks)
+  let header = buildExecutionContext(prompt, context);
+  if (context && context.background && context.background.text) {
+    header += `=== PROBLEM BACKGROUND ===\n${context.background.text}\n================================\n\n`;
+  }
 
   // Step 4: Append conversational context (if meaningful follow-up)
   if (safeUserData._followUp) {
@@ -98,6 +107,39 @@ function augment(prompt, userData, context = {}) {
   return header + '\n\n' + augmentedPrompt;
 }
 
+/**
+ * Fill a precompiled interpolation plan with user data
+ * Each slot receives the userData value named by its inputKey. Slots with
+ * no inputKey, or whose key the user did not send, take the remaining
+ * non-internal userData values in order, as the replace-first-placeholder
+ * loop did; slots left without a value keep their placeholder text. Text
+ * between slots is sliced from promptCode, so the plan only carries slot
+ * offsets.
+ * @param {Object} plan - { slots: [{ start, end, inputKey }] } from the parser
+ * @param {string} promptCode - Prompt text the slot offsets index into
+ * @param {Object} userData - User input data keyed by input1, input2, ...
+ * @returns {string} - Interpolated prompt code
+ */
+function applyInterpolationPlan(plan, promptCode, userData) {
+  const hasInput = (key) => !!key && Object.prototype.hasOwnProperty.call(userData, key);
+  const keyed = new Set(plan.slots.map(slot => slot.inputKey).filter(hasInput));
+  const spareKeys = Object.keys(userData).filter((key) => !key.startsWith('_') && !keyed.has(key));
+  const parts = [];
+  let cursor = 0;
+
+  plan.slots.forEach((slot) => {
+    parts.push(promptCode.slice(cursor, slot.start));
+    const inputKey = hasInput(slot.inputKey) ? slot.inputKey : spareKeys.shift();
+    parts.push(inputKey !== undefined
+      ? formatDataForPrompt(userData[inputKey])
+      : promptCode.slice(slot.start, slot.end));
+    cursor = slot.end;
+  });
+  parts.push(promptCode.slice(cursor));
+
+  return parts.join('');
+}
+
 /**
  * Build execution context header
  */
@@ -166,9 +208,10 @@ Error: ${error.message}
  * Validate user data against input schema
  * @param {Object} userData - User provided data
  * @param {Object} inputSchema - Schema definition  
+ * @param {Object} plan - Optional interpolation plan with pre-lowercased required columns
  * @returns {Object} - { valid: boolean, errors: string[] }
  */
-function validateUserData(userData, inputSchema) {
+function validateUserData(userData, inputSchema, plan = null) {
   const errors = [];
 
   // If no schema defined, accept all data
@@ -187,7 +230,17 @@ function validateUserData(userData, inputSchema) {
     }
 
     // Validate required columns for CSV/Table inputs
-    if (schema.requiredColumns && schema.requiredColumns.length > 0) {
+    if (plan && Array.isArray(plan.requiredColumns)) {
+      const columns = plan.requiredColumns.filter(col => col.inputKey === inputKey);
+      if (columns.length > 0) {
+        const dataKeys = new Set(extractDataKeys(data).map(dk => String(dk).toLowerCase()));
+        const missingColumns = columns.filter(col => !dataKeys.has(col.match)).map(col => col.column);
+
+        if (missingColumns.length > 0) {
+          errors.push(`Missing columns in ${inputKey}: ${missingColumns.join(', ')}`);
+        }
+      }
+    } else if (schema.requiredColumns && schema.requiredColumns.length > 0) {
       const dataKeys = extractDataKeys(data);
       const missingColumns = schema.requiredColumns.filter(col =>
         !dataKeys.some(dk => dk.toLowerCase() === col.toLowerCase())
@@ -375,6 +428,7 @@ function buildInputInstruction(schema) {
 
 module.exports = {
   augment,
+  applyInterpolationPlan,
   validateUserData,
   formatDataForPrompt,
   createTestData,
@@ -0,0 +1,73 @@
+/**
+ * Blob Reader - Resolves content-addressed references in ustav.json
+ * `parseUSTAV.py --format dedup` stores repeated text and sub-objects once in
+ * a top-level "blobs" table:
+ *   { "$text": [key, ...] }  → the blobs joined with a blank line (long text)
+ *   { "$blob": key }         → the stored object or array itself
+ * Data without a blob table is returned untouched.
+ */
+
+const PARAGRAPH_SEPARATOR = '\n\n';
+
+function isBlobDocument(data) {
+  return Boolean(data && data.blobs && typeof data.blobs === 'object');
+}
+
+/**
+ * Build a resolver over one blob table. Resolved "$blob" objects are memoized,
+ * so identical sub-objects share a single instance after loading.
+ */
+function createBlobReader(blobs) {
+  const resolvedBlobs = new Map();
+
+  function getBlob(key) {
+    if (!Object.prototype.hasOwnProperty.call(blobs, key)) {
+      throw new Error(`Missing blob: ${key}`);
+    }
+    return blobs[key];
+  }
+
+  function resolve(value) {
+    if (Array.isArray(value)) {
+      return value.map(resolve);
+    }
+    if (!value || typeof value !== 'object') {
+      return value;
+    }
+    if (Array.isArray(value.$text)) {
+      return value.$text.map(getBlob).join(PARAGRAPH_SEPARATOR);
+    }
+    if (typeof value.$blob === 'string') {
+      if (!resolvedBlobs.has(value.$blob)) {
+        resolvedBlobs.set(value.$blob, getBlob(value.$blob));
+      }
+      return resolvedBlobs.get(value.$blob);
+    }
+
+    const result = {};
+    for (const [key, item] of Object.entries(value)) {
+      result[key] = resolve(item);
+    }
+    return result;
+  }
+
+  return { getBlob, resolve };
+}
+
+/**
+ * Expand a parsed ustav.json document into the plain chapter tree
+ * @param {Object} data - Parsed JSON, with or without a blob table
+ * @returns {Object} - { chapters, metadata } with every reference resolved
+ */
+function resolveBlobs(data) {
+  if (!isBlobDocument(data)) return data;
+
+  const { blobs, ...rest } = data;
+  return createBlobReader(blobs).resolve(rest);
+}
+
+module.exports = {
+  isBlobDocument,
+  createBlobReader,
+  resolveBlobs
+};
@@ -0,0 +1,87 @@
+/**
+ * Context Chunks - Token-budgeted context from precomputed chunks
+ * `parseUSTAV.py --chunks` writes data/ustavChunks.json: section-aware chunks
+ * with stable IDs, parent IDs and token counts, plus a "parents" index of
+ * chunk positions per problem or prompt. Assembling context is therefore a
+ * lookup and a running sum; no text is split or measured per request.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+// A missing or unreadable file is remembered too, so retrieval without
+// `parseUSTAV.py --chunks` does not retry the read on every request
+let chunkData = null;
+let chunksLoaded = false;
+
+function loadChunks(chunkPath = path.join(__dirname, '../../data/ustavChunks.json')) {
+  if (chunksLoaded) return chunkData;
+  chunksLoaded = true;
+
+  try {
+    chunkData = JSON.parse(fs.readFileSync(chunkPath, 'utf-8'));
+    console.log(`[RAG] Loaded ${chunkData.totalChunks} context chunks`);
+  } catch (error) {
+    chunkData = null;
+    if (error.code === 'ENOENT') {
+      console.log('[RAG] No context chunks (run parseUSTAV.py --chunks); retrieval sends no background');
+    } else {
+      console.error('[RAG] Context chunks not available:', error.message);
+    }
+  }
+  return chunkData;
+}
+
+function reloadChunks(chunkPath) {
+  chunkData = null;
+  chunksLoaded = false;
+  return loadChunks(chunkPath);
+}
+
+/**
+ * Chunks of a problem or prompt, in book order, that fit within a token budget
+ * A chunk that continues the previously selected one repeats its leading
+ * overlapTokens, so only its new tokens count against the budget and only
+ * its new text (past the previous chunk's charEnd) is added to `text`.
+ * @param {string} parentId - Problem ID ('ch1_p1') or prompt ID ('ch1_p1_pr1')
+ * @param {number} tokenBudget - Maximum total tokens (Infinity for all chunks)
+ * @param {Object} options - { fields: only these section names/'promptCode' }
+ * @returns {Object|null} - { chunks, text, tokens, truncated } or null without chunk data
+ */
+function getContextChunks(parentId, tokenBudget = Infinity, options = {}) {
+  const data = loadChunks();
+  if (!data) return null;
+
+  const parent = data.parents[parentId];
+  const selected = [];
+  const parts = [];
+  let tokens = 0;
+  let truncated = false;
+
+  for (const position of parent ? parent.chunks : []) {
+    const chunk = data.chunks[position];
+    if (options.fields && !options.fields.includes(chunk.field)) continue;
+    const previous = selected[selected.length - 1];
+    const continues = previous && previous.field === chunk.field && chunk.charStart < previous.charEnd;
+    const cost = continues ? chunk.tokens - chunk.overlapTokens : chunk.tokens;
+    if (tokens + cost > tokenBudget) {
+      truncated = true;
+      break;
+    }
+    if (continues) {
+      parts[parts.length - 1] += chunk.text.slice(previous.charEnd - chunk.charStart);
+    } else {
+      parts.push(chunk.text);
+    }
+    selected.push(chunk);
+    tokens += cost;
+  }
+
+  return { chunks: selected, text: parts.join('\n\n'), tokens, truncated };
+}
+
+module.exports = {
+  loadChunks,
+  reloadChunks,
+  getContextChunks
+};
@@ -6,6 +6,12 @@
 const _ = require('lodash');
 const fs = require('fs');
 const path = require('path');
+const { resolveBlobs } = require('./blobReader');
+const { getContextChunks, reloadChunks } = require('./contextChunks');
+
+// Problem sections sent as background, within this many approximate tokens
+const CONTEXT_FIELDS = ['operationalReality', 'whyTraditionalFails', 'industryContext', 'businessCase'];
+const CONTEXT_TOKEN_BUDGET = 1500;
 
 // Load USTAV data
 let ustavData = null;
@@ -16,7 +22,7 @@ function loadUSTAV() {
   const ustavPath = path.join(__dirname, '../../data/ustav.json');
   try {
     const raw = fs.readFileSync(ustavPath, 'utf-8');
-    ustavData = JSON.parse(raw);
+    ustavData = resolveBlobs(JSON.parse(raw));
     console.log('[RAG] USTAV data loaded successfully');
     return ustavData;
   } catch (error) {
@@ -30,6 +36,21 @@ function reloadUSTAV() {
   return loadUSTAV();
 }
 
+/**
+ * Reload whenever `parseUSTAV.py --watch --sentinel <file>` finishes a build
+ * @param {string} sentinelPath - File the parser rewrites after each rebuild
+ * @param {Function} onReload - Called with the freshly loaded data
+ */
+function watchReloadSentinel(sentinelPath, onReload = () => {}) {
+  fs.watchFile(sentinelPath, { interval: 500 }, (curr, prev) => {
+    if (!curr.mtimeMs || curr.mtimeMs === prev.mtimeMs) return;
+    console.log('[RAG] Rebuild detected, reloading USTAV data');
+    const data = reloadUSTAV();
+    reloadChunks();
+    if (data) onReload(data);
+  });
+}
+
 /**
  * Primary retrieval function that handles ID matching or keyword search
  * @param {string} query - Prompt ID (e.g., 'ch1_p1_pr1') or search query
@@ -55,6 +76,24 @@ function retrieve(query) {
   return retrieveByKeyword(query, ustav);
 }
 
+/**
+ * Token-budgeted background for a problem from the precomputed context chunks
+ * @param {Object} problem - Problem record
+ * @returns {Object|null} - { text, tokens, truncated, chunkIds } or null when
+ *   `parseUSTAV.py --chunks` has not been run
+ */
+function assembleBackground(problem) {
+  const result = getContextChunks(problem.id, CONTEXT_TOKEN_BUDGET, { fields: CONTEXT_FIELDS });
+  if (!result || result.chunks.length === 0) return null;
+
+  return {
+    text: result.text,
+    tokens: result.tokens,
+    truncated: result.truncated,
+    chunkIds: result.chunks.map(chunk => chunk.id)
+  };
+}
+
 /**
  * Retrieve by exact prompt ID
  */
@@ -105,6 +144,7 @@ function retrieveByPromptId(promptId, ustav) {
       context: {
         chapter,
         problem,
+        background: assembleBackground(problem),
         path: `Chapter ${chNum} > Problem ${pNum} > ${prompt.title}`
       }
     };
@@ -130,6 +170,7 @@ function retrieveByPromptId(promptId, ustav) {
       context: {
         chapter,
         problem,
+        background: assembleBackground(problem),
         path: `Chapter ${chNum} > Problem ${pNum} > ${prompt.title}`
       }
     };
@@ -192,6 +233,7 @@ function retrieveByKeyword(query, ustav) {
     context: {
       chapter: bestMatch.chapter,
       problem: bestMatch.problem,
+      background: assembleBackground(bestMatch.problem),
       path: bestMatch.contextPath
     },
     searchScore: bestMatch.score
@@ -297,5 +339,6 @@ module.exports = {
   getIndex,
   validatePrompt,
   loadUSTAV,
-  reloadUSTAV
+  reloadUSTAV,
+  watchReloadSentinel
 };
@@ -3,7 +3,9 @@ const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
 const { executeRAG: generate } = require('../rag/index');
+const { resolveBlobs } = require('../rag/blobReader');
 const { buildPromptSchemas, validateInput } = require('../validation/schemas');
+const { createArtifactServer } = require('../middleware/precompressed');
 
 // Setup multer for file uploads
 const upload = multer({ storage: multer.memoryStorage() });
@@ -14,19 +16,34 @@ const createApiRoutes = (ustav) => {
   // Build validation schemas
   const promptSchemas = buildPromptSchemas(ustav);
 
+  // Precompressed build outputs (parseUSTAV.py --gzip)
+  const { sendArtifact } = createArtifactServer();
+
   /**
    * GET /api/ustav
-   * Return full USTAV data
+   * Return full USTAV data (precompressed file when fresh; dedup files need resolving)
    */
   router.get('/ustav', (req, res) => {
+    if (sendArtifact(req, res, 'ustav.json', { accept: (entry) => entry.format !== 'dedup' })) return;
     res.json(ustav);
   });
 
+  /**
+   * GET /api/artifacts/<path>
+   * Any build artifact listed in data/artifacts.json, e.g. ustav/ch1.json shards
+   */
+  router.get('/artifacts/*', (req, res) => {
+    if (!sendArtifact(req, res, req.params[0])) {
+      res.status(404).json({ message: 'Artifact not found. Rebuild with parseUSTAV.py --gzip.' });
+    }
+  });
+
   /**
    * GET /api/search-index
    * Return the search index for client-side search
    */
   router.get('/search-index', (req, res) => {
+    if (sendArtifact(req, res, 'searchIndex.json')) return;
     try {
       const indexPath = path.join(__dirname, '../../data/searchIndex.json');
       if (fs.existsSync(indexPath)) {
@@ -278,7 +295,7 @@ const createApiRoutes = (ustav) => {
       // Step 2: HOT RELOAD the server's ustav data
       const ustavPath = path.join(__dirname, '../../data/ustav.json');
       const ustavData = fs.readFileSync(ustavPath, 'utf-8');
-      const newUstav = JSON.parse(ustavData);
+      const newUstav = resolveBlobs(JSON.parse(ustavData));
 
       // Update the reference held by the closure
       Object.assign(ustav, newUstav);
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+USTAV Artifact Compressor - Precompressed copies and an ETag manifest
+Every JSON artifact a build commits (ustav.json, shards, indexes, chunk and
+sidecar files) is gzipped next to itself as <name>.gz as soon as it is in
+place. Compression runs in a thread pool (zlib and hashlib release the GIL)
+while the parser keeps serializing the remaining artifacts. Gzip headers
+carry no timestamp or name, so the same content always compresses to the
+same bytes.
+
+data/artifacts.json maps each artifact, relative to data/, to its size,
+mtime, SHA-256 and a strong ETag for the plain and the gzip representation.
+The server serves an artifact precompressed only while its size and mtime
+still match the manifest.
+
+Usage: python artifactCompressor.py [files...] [--level 9]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import ustavWriter
+from ustavWriter import atomic_output
+
+MANIFEST_VERSION = 1
+
+# Artifacts are compressed once per build and served many times; level 9
+# is ~2.5x slower than 6 but still only ~0.1 s for the 2.2 MB ustav.json
+DEFAULT_LEVEL = 9
+
+COMPRESSIBLE_SUFFIXES = (".json", ".ndjson")
+
+
+def compress_file(path, level=DEFAULT_LEVEL):
+    """Write path.gz and return the artifact's manifest entry"""
+    path = Path(path)
+    stat = path.stat()
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    gzip_path = path.with_name(path.name + ".gz")
+    with atomic_output(gzip_path, 'wb') as f:
+        f.write(compressed)
+    etag = digest[:32]
+    return {
+        "bytes": len(data),
+        "mtimeNs": str(stat.st_mtime_ns),  # beyond 2^53, so a string for JavaScript readers
+        "sha256": digest,
+        "etag": f'"{etag}"',
+        "gzip": {"path": gzip_path.name, "bytes": len(compressed), "etag": f'"{etag}-gz"'}
+    }
+
+
+class ArtifactCompressor:
+    """Compress artifacts in a thread pool as atomic_output commits them
+
+    While entered, the compressor is registered in ustavWriter.COMMIT_HOOKS;
+    add() queues any other file. On a clean exit the results are merged into
+    the manifest, whose entries for deleted artifacts (and their .gz files)
+    are dropped.
+    """
+
+    def __init__(self, data_dir, level=DEFAULT_LEVEL, workers=None):
+        self.data_dir = Path(data_dir)
+        self.manifest_path = self.data_dir / "artifacts.json"
+        self.level = level
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.pool = None
+        self.pending = {}
+        self.attributes = {}
+
+    def __enter__(self):
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        ustavWriter.COMMIT_HOOKS.append(self.add)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ustavWriter.COMMIT_HOOKS.remove(self.add)
+        self.pool.shutdown(wait=True)
+        if exc_type is None:
+            self.write_manifest({key: {**future.result(), **self.attributes.get(key, {})}
+                                 for key, future in self.pending.items()})
+        return False
+
+    def add(self, path):
+        """Queue a finished artifact; anything outside data/ or not JSON is ignored"""
+        path = Path(path).resolve()
+        if path.suffix not in COMPRESSIBLE_SUFFIXES or path == self.manifest_path.resolve():
+            return
+        try:
+            key = path.relative_to(self.data_dir.resolve()).as_posix()
+        except ValueError:
+            return
+        self.pending[key] = self.pool.submit(compress_file, path, self.level)
+
+    def describe(self, path, **attributes):
+        """Extra manifest fields for one artifact, e.g. format="dedup" for ustav.json"""
+        key = Path(path).resolve().relative_to(self.data_dir.resolve()).as_posix()
+        self.attributes.setdefault(key, {}).update(attributes)
+
+    def write_manifest(self, entries):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                artifacts = json.load(f).get("artifacts", {})
+        except (OSError, ValueError):
+            artifacts = {}
+        artifacts.update(entries)
+        for key in [key for key in artifacts if not (self.data_dir / key).exists()]:
+            stale = self.data_dir / key
+            try:
+                os.unlink(stale.with_name(stale.name + ".gz"))
+            except OSError:
+                pass
+            del artifacts[key]
+        with atomic_output(self.manifest_path) as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "level": self.level,
+                "artifacts": dict(sorted(artifacts.items()))
+            }, f, indent=2)
+
+    def totals(self):
+        """(artifacts, plain bytes, gzip bytes) compressed in this run"""
+        entries = [future.result() for future in self.pending.values()]
+        return (len(entries), sum(e["bytes"] for e in entries),
+                sum(e["gzip"]["bytes"] for e in entries))
+
+
+def main(argv=None):
+    data_dir = Path(__file__).parent.parent.parent / "data"
+    arg_parser = argparse.ArgumentParser(description="Gzip artifacts in data/ and update data/artifacts.json")
+    arg_parser.add_argument("files", nargs="*", type=Path,
+                            help="artifacts to compress (default: every *.json / *.ndjson in data/)")
+    arg_parser.add_argument("--level", type=int, default=DEFAULT_LEVEL, choices=range(1, 10),
+                            metavar="1-9", help=f"gzip compression level (default: {DEFAULT_LEVEL})")
+    args = arg_parser.parse_args(argv)
+
+    files = args.files or sorted(
+        path for path in data_dir.rglob("*")
+        if path.suffix in COMPRESSIBLE_SUFFIXES and not path.name.startswith(".")
+        and path.relative_to(data_dir).parts[0] != "overrides"
+    )
+    with ArtifactCompressor(data_dir, args.level) as compressor:
+        for path in files:
+            compressor.add(path)
+    count, plain, compressed = compressor.totals()
+    print(f"[GZIP] ✓ Compressed {count} artifact(s): {plain:,} -> {compressed:,} bytes")
+    print(f"[GZIP] ✓ Manifest written to {compressor.manifest_path}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
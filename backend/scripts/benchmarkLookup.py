@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+USTAV Lookup Benchmark - Tree walk versus the resident lookup service
+Replays one request mix (prompt inputs, chapter problems, keyword search,
+stats) against:
+  - tree-walk:      a port of the Node handlers' per-request work
+                    (retrieveByPromptId, getInputInstructions and
+                    validatePrompt, getIndex, retrieveByKeyword,
+                    getExecutionStats) plus res.json's serialization
+  - index:          lookupService's Corpus, in-process
+  - unix / http:    a lookupService process, one request at a time
+  - *-pipelined:    the same, --depth requests in flight per connection
+and reports p50/p99/mean latency per mode and route. Pipelined latency runs
+from sending a batch to receiving each response in it.
+
+The port skips the handlers' console logging, so the tree-walk numbers
+are a lower bound for the Node routes.
+
+Usage: python benchmarkLookup.py [--requests 20000] [--depth 32] [--output bench_lookup.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from benchmarkParser import git_revision
+from lookupService import Corpus, LookupService, input_instructions, iso_timestamp, load_document, validate_prompt
+from stageMetrics import percentile
+
+PROMPT_ID = re.compile(r"ch(\d+)_p(\d+)_pr(\d+)")
+STARTED = time.monotonic()
+
+# Tree walk: what each Node route does per request
+
+def walk_prompt(ustav, prompt_id):
+    chapter_number, problem_number, prompt_number = map(int, PROMPT_ID.match(prompt_id).groups())
+    chapters = ustav["chapters"]
+    if chapter_number - 1 >= len(chapters):
+        raise KeyError(f"Chapter ch{chapter_number} not found")
+    problems = chapters[chapter_number - 1]["problems"]
+    if problem_number - 1 >= len(problems):
+        raise KeyError(f"Problem {prompt_id} not found")
+    prompts = problems[problem_number - 1]["prompts"]
+    if prompt_number - 1 >= len(prompts):
+        raise KeyError(f"Prompt {prompt_id} not found")
+    return prompts[prompt_number - 1]
+
+
+def walk_prompt_inputs(ustav, prompt_id):
+    # getPromptInputRequirements retrieves the prompt, then validatePrompt retrieves it again
+    prompt = walk_prompt(ustav, prompt_id)
+    inputs = input_instructions(prompt)
+    return {"promptId": prompt["id"], "title": prompt.get("title"), "inputs": inputs,
+            "validation": validate_prompt(walk_prompt(ustav, prompt_id))}
+
+
+def walk_index(ustav):
+    return {
+        "metadata": ustav["metadata"],
+        "chapters": [{
+            "id": chapter["id"],
+            "number": chapter.get("number"),
+            "title": chapter.get("title"),
+            "problemCount": len(chapter.get("problems", [])),
+            "problems": [{"id": p["id"], "number": p.get("number"), "title": p.get("title"),
+                          "promptCount": len(p.get("prompts", []))} for p in chapter.get("problems", [])]
+        } for chapter in ustav["chapters"]]
+    }
+
+
+def walk_chapter_problems(ustav, number):
+    chapter = next(ch for ch in walk_index(ustav)["chapters"] if ch["number"] == number)
+    return {"chapter": {"id": chapter["id"], "number": chapter["number"], "title": chapter["title"]},
+            "problems": chapter["problems"]}
+
+
+def walk_search(ustav, query):
+    keywords = query.lower().split()
+    best, best_score = None, 0
+    for chapter_number, chapter in enumerate(ustav["chapters"], start=1):
+        for problem_number, problem in enumerate(chapter.get("problems", []), start=1):
+            sections = problem.get("sections", {})
+            fields = [chapter.get("title"), chapter.get("intro"), chapter.get("strategicPatterns"),
+                      problem.get("title"), sections.get("operationalReality"),
+                      sections.get("businessCase"), sections.get("industryContext")]
+            fields += [f"{fm.get('name')} {fm.get('symptom')}" for fm in problem.get("failureModes", [])]
+            text = " ".join(field for field in fields if field).lower()
+            score = sum(1 for keyword in keywords if keyword in text)
+            if score > best_score and problem.get("prompts"):
+                best, best_score = (chapter, problem, chapter_number, problem_number), score
+    if best is None:
+        raise KeyError(f'No prompts found matching: "{query}"')
+    chapter, problem, chapter_number, problem_number = best
+    # searchPrompts returns the whole chapter and problem as context
+    return {"success": True, "found": True, "prompt": problem["prompts"][0],
+            "context": {"chapter": chapter, "problem": problem,
+                        "path": f"Chapter {chapter_number} > Problem {problem_number}"},
+            "searchScore": best_score}
+
+
+def walk_stats(ustav):
+    # getExecutionStats builds the navigation index once per field it reads;
+    # res.json drops the totals the metadata does not have
+    stats = {"timestamp": iso_timestamp(), "uptime": time.monotonic() - STARTED}
+    for key in ("totalPrompts", "totalProblems", "totalChapters"):
+        metadata = walk_index(ustav)["metadata"]
+        if key in metadata:
+            stats[key] = metadata[key]
+    return stats
+
+
+def tree_walk(ustav, route, argument):
+    try:
+        if route == "inputs":
+            value = walk_prompt_inputs(ustav, argument)
+        elif route == "problems":
+            value = walk_chapter_problems(ustav, argument)
+        elif route == "search":
+            value = walk_search(ustav, argument)
+        else:
+            value = walk_stats(ustav)
+    except (KeyError, StopIteration) as error:
+        value = {"success": False, "error": error.args[0] if error.args else str(error)}
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def request_mix(corpus, count, seed=7):
+    """(route, argument, path) tuples: 40% inputs, 25% problems, 25% search, 10% stats"""
+    rng = random.Random(seed)
+    prompt_ids = list(corpus.prompts)
+    words = sorted({word.lower() for text, *_ in corpus.search_texts[:20] for word in text.split()[:30]
+                    if word.isalpha() and len(word) > 4})
+    queries = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(200)]
+    mix = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            prompt_id = rng.choice(prompt_ids)
+            mix.append(("inputs", prompt_id, f"/prompts/{prompt_id}/inputs"))
+        elif roll < 0.65:
+            number = rng.randint(1, len(corpus.chapters))
+            mix.append(("problems", number, f"/chapters/{number}/problems"))
+        elif roll < 0.9:
+            query = rng.choice(queries)
+            mix.append(("search", query, f"/prompts/search?q={quote(query)}"))
+        else:
+            mix.append(("stats", None, "/stats"))
+    return mix
+
+
+class Client:
+    """Blocking client for either transport, with its own read buffer"""
+
+    def __init__(self, sock, http):
+        self.sock = sock
+        self.http = http
+        self.buffer = b""
+
+    def request_bytes(self, path):
+        if self.http:
+            return f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1')
+        return path.encode('utf-8') + b"\n"
+
+    def fill(self):
+        data = self.sock.recv(1 << 16)
+        if not data:
+            raise ConnectionError("Service closed the connection")
+        self.buffer += data
+
+    def read_response(self):
+        if not self.http:
+            while b"\n" not in self.buffer:
+                self.fill()
+            line, self.buffer = self.buffer.split(b"\n", 1)
+            return line
+        while b"\r\n\r\n" not in self.buffer:
+            self.fill()
+        head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+        length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        while len(self.buffer) < length:
+            self.fill()
+        body, self.buffer = self.buffer[:length], self.buffer[length:]
+        return body
+
+
+def measure(run, mix, warmup=200):
+    """(per-route latency samples in milliseconds, requests per second)"""
+    run(mix[:warmup])
+    samples = {}
+    start = time.perf_counter()
+    results = run(mix)
+    throughput = len(results) / (time.perf_counter() - start)
+    for route, elapsed in results:
+        samples.setdefault(route, []).append(elapsed * 1000)
+    return samples, throughput
+
+
+def sequential(call):
+    def run(mix):
+        results = []
+        for route, argument, path in mix:
+            start = time.perf_counter()
+            call(route, argument, path)
+            results.append((route, time.perf_counter() - start))
+        return results
+    return run
+
+
+def pipelined(client, depth):
+    def run(mix):
+        results = []
+        for offset in range(0, len(mix), depth):
+            batch = mix[offset:offset + depth]
+            start = time.perf_counter()
+            client.sock.sendall(b"".join(client.request_bytes(path) for _, _, path in batch))
+            for route, _, _ in batch:
+                client.read_response()
+                results.append((route, time.perf_counter() - start))
+        return results
+    return run
+
+
+def summarize(samples, throughput):
+    def stats(values):
+        ordered = sorted(values)
+        return {"count": len(ordered), "p50": round(percentile(ordered, 0.5), 4),
+                "p99": round(percentile(ordered, 0.99), 4), "mean": round(sum(ordered) / len(ordered), 4)}
+    everything = [value for values in samples.values() for value in values]
+    return {"all": stats(everything), "requestsPerSecond": round(throughput),
+            "routes": {route: stats(values) for route, values in sorted(samples.items())}}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def connect(address, timeout=15):
+    deadline = time.monotonic() + timeout
+    while True:
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            if family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main(argv=None):
+    project_root = Path(__file__).parent.parent.parent
+    arg_parser = argparse.ArgumentParser(description="Benchmark the lookup service against the tree walk")
+    arg_parser.add_argument("--ustav", type=Path, default=project_root / "data" / "ustav.json")
+    arg_parser.add_argument("--requests", type=int, default=20000, help="requests per mode (default: 20000)")
+    arg_parser.add_argument("--depth", type=int, default=32, help="requests in flight when pipelining (default: 32)")
+    arg_parser.add_argument("--output", type=Path, default=project_root / "bench_lookup.json")
+    args = arg_parser.parse_args(argv)
+
+    ustav = load_document(args.ustav)
+    corpus = Corpus(load_document(args.ustav))
+    mix = request_mix(corpus, args.requests)
+    service = LookupService(args.ustav)
+    service.swap(corpus, None, 0)
+
+    modes = {
+        "tree-walk": measure(sequential(lambda route, argument, path: tree_walk(ustav, route, argument)), mix),
+        "index": measure(sequential(lambda route, argument, path: service.handle(path)), mix)
+    }
+
+    with tempfile.TemporaryDirectory(prefix="ustav-lookup-") as tmp:
+        socket_path = str(Path(tmp) / "lookup.sock")
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).parent / "lookupService.py"), "--ustav", str(args.ustav),
+             "--socket", socket_path, "--port", str(port)],
+            stdout=subprocess.DEVNULL, env={**os.environ, "PYTHONUNBUFFERED": "1"})
+        try:
+            for name, address, http in (("unix", socket_path, False), ("http", ("127.0.0.1", port), True)):
+                client = Client(connect(address), http)
+
+                def call(route, argument, path, client=client):
+                    client.sock.sendall(client.request_bytes(path))
+                    client.read_response()
+
+                modes[name] = measure(sequential(call), mix)
+                modes[f"{name}-pipelined"] = measure(pipelined(client, args.depth), mix)
+                client.sock.close()
+        finally:
+            process.terminate()
+            process.wait()
+
+    results = {mode: summarize(*measured) for mode, measured in modes.items()}
+    print(f"[BENCH] {len(mix):,} requests per mode, pipelining depth {args.depth}")
+    print(f"[BENCH] {'mode':<16} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'req/s':>9}")
+    for mode, result in results.items():
+        overall = result["all"]
+        print(f"[BENCH] {mode:<16} {overall['p50']:>9.4f} {overall['p99']:>9.4f} {overall['mean']:>9.4f} "
+              f"{result['requestsPerSecond']:>9,}")
+    for route in results["tree-walk"]["routes"]:
+        walk, served = results["tree-walk"]["routes"][route], results["unix"]["routes"][route]
+        print(f"[BENCH]   {route:<10} tree-walk p50 {walk['p50']:.4f} / p99 {walk['p99']:.4f} ms   "
+              f"unix p50 {served['p50']:.4f} / p99 {served['p99']:.4f} ms")
+
+    report = {
+        "generatedAt": datetime.now().isoformat(),
+        "commit": git_revision(project_root),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests": len(mix),
+        "depth": args.depth,
+        "results": results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] ✓ Results written to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+USTAV Parser Benchmark - Per-stage timings on synthetic books
+Generates books in the real marker format at several multiples of the real
+book's size, times every USTAVParser stage separately and writes the results
+as JSON so runs from different commits can be diffed.
+
+Usage: python benchmarkParser.py [--scales 1,10,100] [--repeat 3] [--output bench_output.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from parseUSTAV import MARKER_PATTERN, USTAVParser
+
+CHAPTER_LINE = re.compile(r"^CHAPTER \d+[ \t]*$", re.MULTILINE)
+PROBLEM_LINE = re.compile(r"^PROBLEM \d+\.(\d+)[ \t]*$", re.MULTILINE)
+
+STAGES = [
+    "load_book",
+    "index_book",
+    "extract_prompts",
+    "parse_input_schema",
+    "parse_output_requirements",
+    "parse_failure_modes",
+    "parse_chapters",
+    "save"
+]
+
+
+def generate_book(source_text, scale):
+    """Build a synthetic book: the real chapters repeated scale times, renumbered
+
+    Front matter and back matter are kept once; every copy of every chapter
+    gets a fresh chapter number so problem, prompt and failure-mode IDs stay
+    unique, exactly as they would in a larger real book.
+    """
+    chapter_starts = [m.start() for m in CHAPTER_LINE.finditer(source_text)]
+    backmatter = next((m.start() for m in MARKER_PATTERN.finditer(source_text)
+                       if m.lastgroup == "backmatter"), len(source_text))
+    body_starts = [start for start in chapter_starts if start < backmatter]
+    if not body_starts:
+        raise ValueError("Source book has no chapters")
+
+    chapters = [source_text[start:end] for start, end in zip(body_starts, body_starts[1:] + [backmatter])]
+    parts = [source_text[:body_starts[0]]]
+    number = 0
+    for _ in range(scale):
+        for chapter in chapters:
+            number += 1
+            chapter = CHAPTER_LINE.sub(f"CHAPTER {number}", chapter, count=1)
+            chapter = PROBLEM_LINE.sub(lambda m, n=number: f"PROBLEM {n}.{m.group(1)}", chapter)
+            parts.append(chapter)
+    parts.append(source_text[backmatter:])
+    return "".join(parts)
+
+
+def timed(fn, repeat):
+    """Run fn repeat times with parser logging silenced; returns (stats, last result)"""
+    samples = []
+    result = None
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            samples.append(time.perf_counter() - start)
+    return {
+        "min": round(min(samples), 6),
+        "median": round(statistics.median(samples), 6),
+        "max": round(max(samples), 6)
+    }, result
+
+
+def benchmark_book(book_path, output_dir, repeat):
+    """Time every parser stage on one book; returns {stage: timing stats}"""
+    parser = USTAVParser()
+    parser.book_path = book_path
+    parser.output_path = output_dir / "ustav.json"
+
+    stages = {}
+    stages["load_book"], _ = timed(parser.load_book, repeat)
+    stages["index_book"], index = timed(parser.index_book, repeat)
+
+    entries = [(problem, f"{problem['chapter']}.{problem['number']}")
+               for chapter in index for problem in chapter["problems"]]
+
+    stages["extract_prompts"], prompts = timed(
+        lambda: [prompt for entry, problem_id in entries
+                 for prompt in parser.extract_prompts(entry, problem_id)], repeat)
+    codes = [prompt["promptCode"] for prompt in prompts]
+    stages["parse_input_schema"], _ = timed(
+        lambda: [parser.parse_input_schema(code) for code in codes], repeat)
+    stages["parse_output_requirements"], _ = timed(
+        lambda: [parser.parse_output_requirements(code) for code in codes], repeat)
+    stages["parse_failure_modes"], _ = timed(
+        lambda: [parser.parse_failure_modes(entry, problem_id) for entry, problem_id in entries], repeat)
+    stages["parse_chapters"], chapters = timed(parser.parse_chapters, repeat)
+    stages["save"], _ = timed(lambda: parser.save(chapters), repeat)
+
+    counts = {
+        "bytes": book_path.stat().st_size,
+        "chapters": len(index),
+        "problems": len(entries),
+        "prompts": len(prompts),
+        "outputBytes": parser.output_path.stat().st_size
+    }
+    return stages, counts
+
+
+def git_revision(project_root):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark USTAVParser stages on synthetic books")
+    arg_parser.add_argument("--scales", default="1,10,100",
+                            help="comma-separated multiples of the real book size (default: 1,10,100)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per stage (default: 3)")
+    arg_parser.add_argument("--output", type=Path, help="results file (default: bench_output.json)")
+    args = arg_parser.parse_args(argv)
+
+    source = USTAVParser()
+    output_path = args.output or source.project_root / "bench_output.json"
+    source_text = source.book_path.read_text(encoding='utf-8')
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ustav-bench-") as tmp:
+        tmp_dir = Path(tmp)
+        for scale in scales:
+            book_path = tmp_dir / f"book-{scale}x.txt"
+            book_path.write_text(generate_book(source_text, scale), encoding='utf-8')
+            print(f"[BENCH] {scale}x book: {book_path.stat().st_size / 1e6:,.1f} MB")
+
+            stages, counts = benchmark_book(book_path, tmp_dir, args.repeat)
+            megabytes = counts["bytes"] / 1e6
+            for name in STAGES:
+                stats = stages[name]
+                stats["secondsPerMB"] = round(stats["median"] / megabytes, 6)
+                print(f"[BENCH]   {name:<26} {stats['median'] * 1000:10.1f} ms  "
+                      f"({stats['secondsPerMB'] * 1000:.2f} ms/MB)")
+            results.append({"scale": scale, **counts, "stages": stages})
+            book_path.unlink()
+
+    # Per-stage growth relative to the smallest book: ~1.0 means linear scaling
+    base = results[0] if results else None
+    for result in results[1:]:
+        size_ratio = result["bytes"] / base["bytes"]
+        result["scalingVsBase"] = {
+            name: round(result["stages"][name]["median"] / base["stages"][name]["median"] / size_ratio, 3)
+            if base["stages"][name]["median"] else None
+            for name in STAGES
+        }
+
+    report = {
+        "generatedAt": datetime.now().isoformat(),
+        "commit": git_revision(source.project_root),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] ✓ Results written to {output_path}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
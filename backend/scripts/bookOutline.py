@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+USTAV Book Outline - Every heading of the book files in one pass
+All heading keywords are compiled into a single Aho-Corasick automaton that
+walks each file's bytes once; a keyword only counts at the start of a line.
+The outline lists every heading with its line number and byte offsets, and
+the body chapters with their byte spans; parseUSTAV.py --outline indexes
+only those spans, converting them to character offsets in text mode.
+
+Usage: python bookOutline.py [book files...] [--output data/bookOutline.json | -]
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+
+from ustavWriter import atomic_output
+
+OUTLINE_VERSION = 1
+
+HEADINGS = {
+    b"PREFACE": "preface",
+    b"CHAPTER": "chapter",
+    b"PROBLEM": "problem",
+    b"SECTION": "section",
+    b"AFTERWORD": "afterword",
+    b"INDEX OF TERMS": "index",
+    b"MASTER BIBLIOGRAPHY": "bibliography"
+}
+
+# Numbered headings must carry their number; the others stand alone
+NUMBER_PATTERNS = {
+    "chapter": re.compile(r"(\d+)"),
+    "problem": re.compile(r"(\d+\.\d+)"),
+    "section": re.compile(r"(\d+)")
+}
+
+# Table-of-contents lines end in a tab and a page number
+TOC_PAGE_PATTERN = re.compile(r"\t+(\d+)$")
+
+
+class HeadingAutomaton:
+    """Aho-Corasick automaton over the heading keywords, anchored at line starts
+
+    Every keyword is compiled with a leading newline and the scan starts as if
+    one had just been read, so matches can only begin a line. Transitions are
+    expanded into a full DFA (goto plus failure links resolved up front), so
+    the scan does one dict lookup per byte; while the automaton sits in its
+    root state it skips straight to the next newline with bytes.find().
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.output = [None]
+        for keyword in keywords:
+            state = 0
+            for byte in b"\n" + keyword:
+                if byte not in self.goto[state]:
+                    self.goto.append({})
+                    self.output.append(None)
+                    self.goto[state][byte] = len(self.goto) - 1
+                state = self.goto[state][byte]
+            self.output[state] = keyword
+
+        # Breadth-first failure links, folded into the transition tables
+        fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for byte, target in self.goto[state].items():
+                queue.append(target)
+                fallback = fail[state]
+                while fallback and byte not in self.goto[fallback]:
+                    fallback = fail[fallback]
+                fail[target] = self.goto[fallback].get(byte, 0)
+            for byte, target in self.goto[fail[state]].items():
+                self.goto[state].setdefault(byte, target)
+        self.line_start = self.goto[0][ord("\n")]
+
+    def scan(self, data):
+        """Yield (start offset, keyword) for every line-initial keyword in data"""
+        goto, output, line_start = self.goto, self.output, self.line_start
+        state = line_start
+        i, size = 0, len(data)
+        while i < size:
+            if state == 0:
+                i = data.find(b"\n", i)
+                if i == -1:
+                    return
+                state = line_start
+                i += 1
+                continue
+            state = goto[state].get(data[i], 0)
+            i += 1
+            keyword = output[state]
+            if keyword is not None:
+                yield i - len(keyword), keyword
+
+
+AUTOMATON = HeadingAutomaton(HEADINGS)
+
+
+def scan_file(path):
+    """Outline of one file: every heading plus the body chapters' byte spans"""
+    data = Path(path).read_bytes()
+    headings = []
+    line, counted = 1, 0
+
+    for start, keyword in AUTOMATON.scan(data):
+        line_end = data.find(b"\n", start)
+        if line_end == -1:
+            line_end = len(data)
+        text = data[start:line_end].decode('utf-8', errors='replace').rstrip("\r")
+        kind = HEADINGS[keyword]
+        rest = text[len(keyword):]
+        if rest and not rest[0].isspace():
+            continue  # "PREFACES", "CHAPTERS" and the like
+
+        heading = {"kind": kind}
+        pattern = NUMBER_PATTERNS.get(kind)
+        if pattern:
+            number = pattern.match(rest.lstrip())
+            if number is None:
+                continue
+            heading["number"] = number.group(1)
+            rest = rest.lstrip()[number.end():]
+
+        page = TOC_PAGE_PATTERN.search(rest)
+        if page:
+            rest = rest[:page.start()]
+        title = rest.strip(" \t-–—:")
+        if not title and pattern and page is None:
+            # Body headings ("CHAPTER 1") carry their title on the next line
+            next_end = data.find(b"\n", line_end + 1)
+            title = data[line_end + 1:next_end if next_end != -1 else len(data)].decode(
+                'utf-8', errors='replace').strip()
+        line += data.count(b"\n", counted, start)
+        counted = start
+
+        heading.update({
+            "title": title or None,
+            "line": line,
+            "byteOffset": start,
+            "lineEndOffset": line_end,
+            "toc": page is not None
+        })
+        if page:
+            heading["page"] = int(page.group(1))
+        headings.append(heading)
+
+    return {
+        "path": str(path),
+        "bytes": len(data),
+        "headings": headings,
+        "chapters": chapter_spans(headings, len(data))
+    }
+
+
+BACK_MATTER = ("afterword", "index", "bibliography")
+
+
+def chapter_spans(headings, size):
+    """Byte span of each body chapter: its heading up to the next chapter or back matter
+
+    The bibliography repeats CHAPTER headings, so nothing after the first
+    back-matter heading counts as a chapter.
+    """
+    body = [h for h in headings if not h["toc"]]
+    back_matter = next((i for i, h in enumerate(body) if h["kind"] in BACK_MATTER), len(body))
+    body = body[:back_matter + 1]
+    spans = []
+    for i, heading in enumerate(body):
+        if heading["kind"] != "chapter":
+            continue
+        end = next((h["byteOffset"] for h in body[i + 1:]
+                    if h["kind"] == "chapter" or h["kind"] in BACK_MATTER), size)
+        spans.append({
+            "number": int(heading["number"]),
+            "line": heading["line"],
+            "byteOffset": heading["byteOffset"],
+            "endByteOffset": end,
+            "problems": sum(1 for h in body if h["kind"] == "problem"
+                            and heading["byteOffset"] < h["byteOffset"] < end)
+        })
+    return spans
+
+
+def build_outline(paths):
+    return {"version": OUTLINE_VERSION, "files": [scan_file(path) for path in paths]}
+
+
+def main(argv=None):
+    project_root = Path(__file__).parent.parent.parent
+    arg_parser = argparse.ArgumentParser(description="Write a JSON outline of the book's headings")
+    arg_parser.add_argument("files", nargs="*", type=Path,
+                            help="book files (default: the book and its preface in the project root)")
+    arg_parser.add_argument("--output", default=str(project_root / "data" / "bookOutline.json"),
+                            help="outline file, or - for stdout (default: data/bookOutline.json)")
+    args = arg_parser.parse_args(argv)
+
+    paths = args.files or [project_root / "AI SOLVED BUSINESS PROBLEMS.txt",
+                           project_root / "AI SOLVED BUSINESS PROBLEMS PREFACE.txt"]
+    paths = [path for path in paths if path.exists()] if not args.files else paths
+    outline = build_outline(paths)
+
+    if args.output == "-":
+        json.dump(outline, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        with atomic_output(args.output) as f:
+            json.dump(outline, f, indent=2, ensure_ascii=False)
+        for entry in outline["files"]:
+            print(f"[OUTLINE] {entry['path']}: {len(entry['headings'])} heading(s), "
+                  f"{len(entry['chapters'])} chapter(s)")
+        print(f"[OUTLINE] ✓ Written to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+USTAV Build Diagnostics - Structural validation inside the parse pass
+Each chapter is checked as it streams out of the parser, before any writer
+sees it: expected sections, prompt counts, unique IDs, non-empty failure
+modes and numeric business-case figures, plus the fallbacks the parser
+otherwise fills in silently ("Untitled Prompt", "UNKNOWN" severity, empty
+sections). Every finding carries the book byte offset and line of the
+record it concerns, and the report is written as JSON next to ustav.json.
+
+In strict mode the first error raises ValidationError, which aborts the
+build before any output is replaced.
+"""
+
+import json
+import math
+
+from ustavModel import SECTION_NAMES, Problem
+from ustavWriter import atomic_output
+
+DIAGNOSTICS_VERSION = 1
+
+# (block, key) of every business-case figure; the required ones feed the ROI engine
+BUSINESS_CASE_FIGURES = (
+    ("currentState", "annualSpend", True),
+    ("currentState", "estimatedErrorRate", False),
+    ("currentState", "currentAnnualLoss", False),
+    ("withAI", "targetRate", False),
+    ("withAI", "annualBenefit", True),
+    ("withAI", "annualOperatingCost", False),
+    ("withAI", "year1NetRecovery", False),
+    ("implementation", "totalCost", True),
+    ("payback", "months", False)
+)
+
+
+class ValidationError(ValueError):
+    """Raised on the first error in strict mode"""
+
+    def __init__(self, diagnostic):
+        super().__init__(f"{diagnostic['id']}: {diagnostic['message']} "
+                         f"(line {diagnostic['line']}, byte {diagnostic['byteOffset']})")
+        self.diagnostic = diagnostic
+
+
+class BookLocator:
+    """Byte offset and line number for a parser offset
+
+    Offsets are char offsets in text mode and already byte offsets in mmap
+    mode. Called with increasing offsets, both conversions continue from
+    the previous position instead of rescanning from the start.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.offset = self.byte_offset = 0
+        self.line = 1
+
+    def locate(self, offset):
+        if offset < self.offset:
+            self.offset = self.byte_offset = 0
+            self.line = 1
+        if self.parser.book_map is None:
+            span = self.parser.book_text[self.offset:offset]
+            self.byte_offset += len(span.encode('utf-8'))
+            self.line += span.count("\n")
+        else:
+            self.byte_offset = offset
+            self.line += self.parser.book_map[self.offset:offset].count(b"\n")
+        self.offset = offset
+        return self.byte_offset, self.line
+
+
+class BuildValidator:
+    """Collect diagnostics for parsed chapters; see check_chapter()"""
+
+    def __init__(self, parser, strict=False):
+        self.parser = parser
+        self.strict = strict
+        self.locator = BookLocator(parser)
+        self.diagnostics = []
+        self.seen_ids = {}
+        self.chapter_entries = {f"ch{entry['number']}": entry for entry in parser.index}
+        self.problem_entries = {
+            f"ch{problem['chapter']}_p{problem['number']}": problem
+            for entry in parser.index for problem in entry["problems"]
+        }
+
+    @property
+    def errors(self):
+        return sum(1 for d in self.diagnostics if d["severity"] == "error")
+
+    @property
+    def warnings(self):
+        return len(self.diagnostics) - self.errors
+
+    def add(self, severity, code, record_id, message, offset, field=None):
+        """Record a finding at a parser offset; located in bulk by resolve()"""
+        diagnostic = {
+            "severity": severity,
+            "code": code,
+            "id": record_id,
+            "field": field,
+            "message": message,
+            "offset": offset
+        }
+        self.diagnostics.append(diagnostic)
+        if self.strict and severity == "error":
+            self.resolve()
+            raise ValidationError(diagnostic)
+
+    def resolve(self):
+        """Replace parser offsets with byte offsets and lines, in one forward pass"""
+        pending = sorted((d for d in self.diagnostics if "offset" in d), key=lambda d: d["offset"])
+        for diagnostic in pending:
+            diagnostic["byteOffset"], diagnostic["line"] = self.locator.locate(diagnostic.pop("offset"))
+
+    def check_id(self, record_id, offset):
+        if record_id in self.seen_ids:
+            self.add("error", "duplicate-id", record_id,
+                     f"ID already used (line {self.locator.locate(self.seen_ids[record_id])[1]})", offset)
+        else:
+            self.seen_ids[record_id] = offset
+
+    def check_chapter(self, chapter):
+        """Validate one parsed chapter (after overrides) against its index entry"""
+        entry = self.chapter_entries.get(chapter["id"])
+        start = entry["start"] if entry else 0
+        self.check_id(chapter["id"], start)
+        if not chapter.get("title"):
+            self.add("error", "missing-title", chapter["id"], "Chapter has no title", start, "title")
+        if not chapter.get("problems"):
+            self.add("error", "empty-chapter", chapter["id"], "Chapter contains no problems", start)
+        for problem in chapter.get("problems", []):
+            self.check_problem(problem)
+
+    def check_problem(self, problem):
+        problem_id = problem["id"]
+        entry = self.problem_entries.get(problem_id)
+        model = Problem(self.parser, entry) if entry else None
+        start = entry["start"] if entry else 0
+        self.check_id(problem_id, start)
+
+        fallback_title = f"Problem {entry['chapter']}.{entry['number']}" if entry else None
+        if problem.get("title") in (None, "", fallback_title):
+            self.add("warning", "untitled-problem", problem_id, "No title line after the PROBLEM marker",
+                     start, "title")
+
+        sections = problem.get("sections", {})
+        for number, name in enumerate(SECTION_NAMES, start=1):
+            span = entry["sections"].get(number) if entry else None
+            if span is None and not sections.get(name):
+                self.add("error", "missing-section", problem_id, f"SECTION {number} ({name}) not found",
+                         start, f"sections.{name}")
+            elif not sections.get(name):
+                self.add("warning", "empty-section", problem_id, f"SECTION {number} ({name}) is empty",
+                         span["start"] if span else start, f"sections.{name}")
+
+        if problem.get("metadata", {}).get("severity") == "UNKNOWN":
+            self.add("warning", "unknown-severity", problem_id, "No severity found in the execution prompt",
+                     start, "metadata.severity")
+
+        prompts = problem.get("prompts", [])
+        if not prompts:
+            self.add("error", "no-prompts", problem_id, "No BEGIN/END PROMPT block", start, "prompts")
+        offsets = [prompt.begin for prompt in model.prompts] if model else []
+        for position, prompt in enumerate(prompts):
+            offset = offsets[position] if position < len(offsets) else start
+            self.check_id(prompt["id"], offset)
+            if not prompt.get("promptCode"):
+                self.add("error", "empty-prompt", prompt["id"], "Prompt block is empty", offset, "promptCode")
+            if prompt.get("title") == "Untitled Prompt":
+                self.add("warning", "untitled-prompt", prompt["id"], "No title or role line in the prompt",
+                         offset, "title")
+
+        failure_modes = problem.get("failureModes", [])
+        if not failure_modes:
+            self.add("error", "no-failure-modes", problem_id, "SECTION 8 has no FAILURE MODE blocks",
+                     start, "failureModes")
+        offsets = [failure_mode.marker_start for failure_mode in model.failure_modes] if model else []
+        for position, failure_mode in enumerate(failure_modes):
+            offset = offsets[position] if position < len(offsets) else start
+            self.check_id(failure_mode["id"], offset)
+            for field in ("name", "symptom", "rootCause"):
+                if not failure_mode.get(field):
+                    self.add("warning", "empty-failure-field", failure_mode["id"], f"Failure mode has no {field}",
+                             offset, field)
+
+        business_case = problem.get("businessCase", {})
+        span = entry["sections"].get(6) if entry else None
+        offset = span["start"] if span else start
+        for block, key, required in BUSINESS_CASE_FIGURES:
+            value = business_case.get(block, {}).get(key)
+            field = f"businessCase.{block}.{key}"
+            if value is None:
+                if required:
+                    self.add("warning", "missing-figure", problem_id, f"No {block}.{key} in the business case",
+                             offset, field)
+            elif isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                self.add("error", "non-numeric-figure", problem_id, f"{block}.{key} is not a number: {value!r}",
+                         offset, field)
+
+    def summary(self):
+        by_code = {}
+        for d in self.diagnostics:
+            by_code[d["code"]] = by_code.get(d["code"], 0) + 1
+        return {"errors": self.errors, "warnings": self.warnings, "byCode": dict(sorted(by_code.items()))}
+
+    def save(self, path):
+        self.resolve()
+        with atomic_output(path) as f:
+            json.dump({
+                "version": DIAGNOSTICS_VERSION,
+                "book": str(self.parser.book_path),
+                "strict": self.strict,
+                "summary": self.summary(),
+                "diagnostics": self.diagnostics
+            }, f, indent=2, ensure_ascii=False)
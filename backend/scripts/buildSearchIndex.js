@@ -1,11 +1,12 @@
 
 const fs = require('fs');
 const path = require('path');
+const { resolveBlobs } = require('../rag/blobReader');
 
 const ustavPath = path.join(__dirname, '../../data/ustav.json');
 const outputPath = path.join(__dirname, '../../data/searchIndex.json');
 
-const ustav = JSON.parse(fs.readFileSync(ustavPath, 'utf8'));
+const ustav = resolveBlobs(JSON.parse(fs.readFileSync(ustavPath, 'utf8')));
 
 const index = [];
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+USTAV Chunk Writer - Section-aware RAG context chunks with token counts
+Every problem section and every prompt body is cut into overlapping chunks
+at build time. Each chunk carries a stable ID, its parent chapter, problem
+and prompt IDs and an approximate token count, so context assembly is a
+lookup in "parents" plus a running sum instead of splitting text per request.
+"""
+
+import json
+import re
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+
+from ustavWriter import atomic_output
+
+CHUNKS_VERSION = 2
+
+# Word runs and single punctuation marks; long words count as several tokens
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_WORD_TOKEN = 6
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def approximate_tokens(text):
+    """Cheap BPE-style token estimate, close to real tokenizers for English prose"""
+    return sum(1 + (len(piece) - 1) // CHARS_PER_WORD_TOKEN for piece in TOKEN_PIECE_PATTERN.findall(text))
+
+
+class TokenCounts:
+    """approximate_tokens() for any whitespace-bounded span of one text
+
+    The text is tokenized once; a span's count is a difference of prefix
+    sums over the pieces starting inside it. Chunk, unit and overlap edges
+    all sit at whitespace, where no piece is cut, so the counts equal
+    approximate_tokens() of the span itself.
+    """
+
+    def __init__(self, text):
+        spans = [piece.span() for piece in TOKEN_PIECE_PATTERN.finditer(text)]
+        self.starts = [start for start, _ in spans]
+        self.prefix = [0, *accumulate(1 + (end - start - 1) // CHARS_PER_WORD_TOKEN for start, end in spans)]
+
+    def count(self, start, end):
+        return self.prefix[bisect_left(self.starts, end)] - self.prefix[bisect_left(self.starts, start)]
+
+
+def split_units(text, size, counts=None):
+    """Cut text into (start, end) spans no larger than size tokens
+
+    Paragraphs are kept whole when they fit; longer ones fall back to lines
+    and then to words, so chunk edges land on the most natural boundary.
+    """
+    counts = counts or TokenCounts(text)
+    units = []
+
+    def split(start, end, separators):
+        span = text[start:end]
+        if counts.count(start, end) <= size or not separators:
+            units.append((start, end))
+            return
+        pattern = separators[0]
+        cursor = start
+        for match in re.finditer(pattern, span):
+            split(cursor, start + match.end(), separators[1:])
+            cursor = start + match.end()
+        if cursor < end:
+            split(cursor, end, separators[1:])
+
+    split(0, len(text), [r"\n\s*\n", r"\n", r"(?<=\S)\s+"])
+    return [(start, end) for start, end in units if text[start:end].strip()]
+
+
+class ChunkWriter:
+    """Accumulate chunks per chapter and write data/ustavChunks.json
+
+    Chunks never cross a section boundary. Consecutive chunks of the same
+    text share up to `overlap` tokens of trailing words; a chunk's
+    overlapTokens counts the ones it repeats from its predecessor, so token
+    totals count every piece of text once. A chunk ID is
+    "<parent>:<field>:<n>", e.g. "ch1_p1:businessCase:0" or
+    "ch1_p1_pr1:promptCode:3", and stays the same across builds of the same
+    text with the same settings.
+    """
+
+    def __init__(self, chunk_path, size=400, overlap=50):
+        if size <= 0 or not 0 <= overlap < size:
+            raise ValueError(f"Invalid chunk settings: size={size}, overlap={overlap}")
+        self.chunk_path = Path(chunk_path)
+        self.size = size
+        self.overlap = overlap
+        self.chunks = []
+        self.parents = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            with atomic_output(self.chunk_path) as f:
+                json.dump({
+                    "version": CHUNKS_VERSION,
+                    "chunkSize": self.size,
+                    "overlap": self.overlap,
+                    "tokenizer": "approximate",
+                    "totalChunks": len(self.chunks),
+                    "totalTokens": sum(chunk["tokens"] - chunk["overlapTokens"] for chunk in self.chunks),
+                    "parents": self.parents,
+                    "chunks": self.chunks
+                }, f, ensure_ascii=False, separators=(',', ':'))
+        return False
+
+    def chunk_text(self, text):
+        """Yield (start, end, tokens, overlap tokens) for the chunks of one text"""
+        counts = TokenCounts(text)
+        units = [(start, end, counts.count(start, end)) for start, end in split_units(text, self.size, counts)]
+        first, lead, carried = 0, None, 0
+        while first < len(units):
+            if carried + units[first][2] > self.size:
+                lead, carried = None, 0
+            last, tokens = first, carried
+            while last < len(units) and (last == first or tokens + units[last][2] <= self.size):
+                tokens += units[last][2]
+                last += 1
+            start = units[first][0] if lead is None else lead
+            yield start, units[last - 1][1], tokens, carried
+            lead, carried = self.overlap_start(text, start, units[last - 1][1], counts)
+            first = last
+
+    def overlap_start(self, text, start, end, counts):
+        """(offset, tokens) of the trailing words of text[start:end] that fit in the overlap"""
+        lead, carried = None, 0
+        if not self.overlap:
+            return lead, carried
+        # Every piece is at least one token, so only the last overlap + 1
+        # pieces can matter; a word cut at that edge already overflows
+        last = bisect_left(counts.starts, end)
+        window = max(start, counts.starts[max(last - self.overlap - 1, 0)]) if last else start
+        words = list(WORD_PATTERN.finditer(text, window, end))
+        for word in reversed(words):
+            tokens = counts.count(word.start(), word.end())
+            if carried + tokens > self.overlap:
+                break
+            lead, carried = word.start(), carried + tokens
+        return lead, carried
+
+    def add_text(self, parent_id, field, text, **refs):
+        """Chunk one section or prompt body under parent_id"""
+        if not text:
+            return
+        first = len(self.chunks)
+        for n, (start, end, tokens, overlap_tokens) in enumerate(self.chunk_text(text)):
+            self.chunks.append({
+                "id": f"{parent_id}:{field}:{n}",
+                **refs,
+                "field": field,
+                "charStart": start,
+                "charEnd": end,
+                "tokens": tokens,
+                "overlapTokens": overlap_tokens,
+                "text": text[start:end]
+            })
+        # parents[id] lists chunk positions in document order and their token total
+        entry = self.parents.setdefault(parent_id, {"chunks": [], "tokens": 0})
+        for position in range(first, len(self.chunks)):
+            chunk = self.chunks[position]
+            entry["chunks"].append(position)
+            entry["tokens"] += chunk["tokens"] - chunk["overlapTokens"]
+
+    def write_chapter(self, chapter):
+        """Chunk every section and prompt of a parsed chapter"""
+        for problem in chapter.get("problems", []):
+            refs = {"chapterId": chapter["id"], "problemId": problem["id"]}
+            for name, body in problem.get("sections", {}).items():
+                self.add_text(problem["id"], name, body, **refs)
+            for prompt in problem.get("prompts", []):
+                self.add_text(prompt["id"], "promptCode", prompt.get("promptCode", ""),
+                              **refs, promptId=prompt["id"])
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+USTAV Input Validator - Streaming CSV checks compiled from a prompt's inputSchema
+compile_schema() turns the requiredColumns that parse_input_schema extracts
+into one validator per input. Each column gets a type from its name
+(identifiers, ZIP codes, dates, e-mail addresses, numbers, free text). A
+file is read row batch by row batch, checked column by column per batch,
+and reduced to bounded state: per-column statistics, heavy-hitter counts
+and at most max_errors row-level error samples. A multi-hundred-MB upload
+therefore needs only as much memory as one batch.
+
+The resulting report can stand in for the raw file: summary_text() renders
+the header check and the column statistics in a few lines for the prompt.
+
+Usage: python inputValidator.py ch1_p1_pr1 input2 invoices.csv [--json] [--ustav data/ustav.json]
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import re
+import sys
+from collections import Counter
+from datetime import date
+from itertools import chain, islice
+from pathlib import Path
+
+VALIDATOR_VERSION = 1
+
+
+def plural(word):
+    if word.endswith("y") and word[-2:-1] not in "aeiou":
+        return word[:-1] + "ies"
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word + "es"
+    return word + "s"
+
+
+def name_tokens(*words):
+    """Pattern for any of the words, singular or plural, as a whole "_"-separated token of a column key"""
+    forms = [form for word in words for form in (word, plural(word))]
+    return re.compile(r"(?:^|_)(?:" + "|".join(map(re.escape, forms)) + r")(?:_|$)")
+
+
+# Column key pattern -> type, first match wins
+COLUMN_TYPES = (
+    (name_tokens("zip", "zip_code", "postal_code"), "zip"),
+    (name_tokens("email", "e_mail"), "email"),
+    (name_tokens("date", "timestamp", "dob"), "date"),
+    (name_tokens("id", "number", "num", "no", "code", "sku", "tracking"), "identifier"),
+    (name_tokens("amount", "rate", "charge", "cost", "price", "spend", "revenue", "total", "weight",
+                 "qty", "quantity", "count", "days", "hours", "minutes", "sales", "sold", "picked",
+                 "on_hand", "on_order", "balance", "margin", "volume", "units", "value", "frequency",
+                 "credits", "percent", "percentage", "pct", "%", "score", "gpa", "usd", "acv", "rent", "temp",
+                 "humidity", "pressure", "speed", "vibration_level", "in_transit", "rating"), "number"),
+)
+
+NUMBER_PATTERN = re.compile(r"[-+]?\(?\$?\s*(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)\)?%?")
+NUMBER_STRIP = str.maketrans("", "", "$,% ")
+ZIP_PATTERN = re.compile(r"\d{5}(?:-\d{4})?|[A-Z]\d[A-Z] ?\d[A-Z]\d")
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+DATE_PATTERNS = (
+    (re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ].*)?"), (1, 2, 3)),
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), (3, 1, 2)),
+    (re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})"), (3, 2, 1)),
+)
+
+
+def normalize_column(name):
+    """Comparable form of a column name: "** Min_Charge." and "min charge" -> "mincharge" """
+    name = re.sub(r"\(.*?\)", "", name)
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def clean_column(name):
+    """Display form of a schema column, without the markdown and punctuation around it"""
+    return name.strip().strip("*").strip().rstrip(".").strip()
+
+
+def join_fragments(columns):
+    """Re-join column names the schema extraction split at commas inside parentheses"""
+    joined, pending = [], ""
+    for column in columns:
+        pending = f"{pending}, {column}" if pending else column
+        if pending.count("(") <= pending.count(")"):
+            joined.append(pending)
+            pending = ""
+    if pending:
+        joined.append(pending)
+    return joined
+
+
+def column_type(name):
+    if re.search(r"\(or\b", name):  # "Zip_Code (or City/Neighborhood)" allows free text
+        return "text"
+    key = re.sub(r"[^a-z0-9%]+", "_", re.sub(r"\(.*?\)", "", name).lower()).strip("_")
+    for pattern, kind in COLUMN_TYPES:
+        if pattern.search(key):
+            return kind
+    return "text"
+
+
+def batch_pattern(line):
+    """Pattern matching a whole column batch joined with newlines, empty values included"""
+    return re.compile(rf"(?:(?:{line})?\n)*(?:{line})?")
+
+
+# Fast paths: one regex call accepts a column batch whose values all have
+# the common shape; only a batch that fails is parsed value by value
+PLAIN_NUMBERS = batch_pattern(r"-?\d+(?:\.\d+)?")
+FORMATTED_NUMBERS = batch_pattern(r"-?\$?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?%?")
+ISO_DATES = batch_pattern(r"\d{4}-\d\d-\d\d")
+BATCH_PATTERNS = {
+    "zip": batch_pattern(ZIP_PATTERN.pattern),
+    "email": batch_pattern(r"[^@\s]+@[^@\s]+\.[^@\s]+"),
+}
+
+
+def parse_number(value):
+    if not NUMBER_PATTERN.fullmatch(value):
+        return None
+    negative = value.startswith("(") and value.endswith(")")
+    try:
+        number = float(value.strip("()").translate(NUMBER_STRIP))
+    except ValueError:
+        return None
+    return -number if negative else number
+
+
+def parse_date(value):
+    for pattern, (y, m, d) in DATE_PATTERNS:
+        match = pattern.fullmatch(value)
+        if match:
+            try:
+                return date(int(match.group(y)), int(match.group(m)), int(match.group(d)))
+            except ValueError:
+                return None
+    return None
+
+
+# type -> value parser returning None for an invalid value
+PARSERS = {
+    "number": parse_number,
+    "date": parse_date,
+    "zip": lambda value: value if ZIP_PATTERN.fullmatch(value) else None,
+    "email": lambda value: value if EMAIL_PATTERN.fullmatch(value) else None,
+    "identifier": lambda value: value,
+    "text": lambda value: value,
+}
+
+
+def parse_batch(kind, values):
+    """Parsed form of every value in a column batch; None for empty or invalid values"""
+    joined = "\n".join(values)
+    if kind in ("text", "identifier") or (kind in BATCH_PATTERNS and BATCH_PATTERNS[kind].fullmatch(joined)):
+        return [value or None for value in values]
+    if kind == "number" and PLAIN_NUMBERS.fullmatch(joined):
+        return [float(value) if value else None for value in values]
+    if kind == "number" and FORMATTED_NUMBERS.fullmatch(joined):
+        return [float(value) if value else None for value in joined.translate(NUMBER_STRIP).split("\n")]
+    if kind == "date" and ISO_DATES.fullmatch(joined):
+        try:
+            return [date.fromisoformat(value) if value else None for value in values]
+        except ValueError:  # a well-formed but impossible date, e.g. 2024-02-30
+            pass
+    parse = PARSERS[kind]
+    return [parse(value) if value else None for value in values]
+
+
+class HeavyHitters:
+    """Misra-Gries summary: the frequent values of a stream in at most k counters
+
+    Each batch is counted exactly, merged into the counters and cut back to
+    k by subtracting the (k+1)-th largest count, which keeps the summary
+    mergeable; a value's count is underestimated by at most n / (k + 1).
+    """
+
+    def __init__(self, k=16):
+        self.k = k
+        self.counters = Counter()
+
+    def update(self, values):
+        counters = self.counters
+        counters.update(values)
+        if len(counters) > self.k:
+            cut = sorted(counters.values(), reverse=True)[self.k]
+            self.counters = Counter({value: count - cut for value, count in counters.items() if count > cut})
+
+    def top(self, limit=5):
+        return sorted(self.counters.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class ColumnStats:
+    """Bounded running statistics for one column"""
+
+    def __init__(self, name, kind, distinct_limit=1000):
+        self.name = name
+        self.kind = kind
+        self.count = self.empty = self.invalid = 0
+        self.minimum = self.maximum = None
+        self.total = 0.0
+        self.distinct = set()
+        self.distinct_limit = distinct_limit
+        self.distinct_overflow = False
+        self.hitters = HeavyHitters()
+        self.max_length = 0
+
+    def update(self, values, parsed):
+        """Fold one batch: the raw values and their parsed forms; returns its invalid count"""
+        empty = values.count("")
+        valid = [result for result in parsed if result is not None]
+        invalid = len(values) - empty - len(valid)
+        self.count += len(values)
+        self.empty += empty
+        self.invalid += invalid
+        if self.kind in ("number", "date"):
+            if valid:
+                low, high = min(valid), max(valid)
+                self.minimum = low if self.minimum is None else min(self.minimum, low)
+                self.maximum = high if self.maximum is None else max(self.maximum, high)
+                if self.kind == "number":
+                    self.total += math.fsum(valid)
+        else:
+            self.hitters.update(valid)
+            self.max_length = max(self.max_length, max(map(len, values)))
+        if not self.distinct_overflow:
+            self.distinct.update(values)
+            self.distinct.discard("")
+            if len(self.distinct) > self.distinct_limit:
+                self.distinct_overflow = True
+                self.distinct = set()
+        return invalid
+
+    def to_dict(self):
+        stats = {
+            "type": self.kind,
+            "count": self.count,
+            "empty": self.empty,
+            "invalid": self.invalid,
+            "distinct": f">{self.distinct_limit}" if self.distinct_overflow else len(self.distinct)
+        }
+        if self.minimum is not None:
+            valid = self.count - self.empty - self.invalid
+            stats["min"] = self.minimum.isoformat() if self.kind == "date" else self.minimum
+            stats["max"] = self.maximum.isoformat() if self.kind == "date" else self.maximum
+            if self.kind == "number":
+                stats["sum"] = round(self.total, 4)
+                stats["mean"] = round(self.total / valid, 4)
+        if self.kind not in ("number", "date"):
+            stats["maxLength"] = self.max_length
+            # Values seen once are noise in a high-cardinality column
+            stats["top"] = [[value, count] for value, count in self.hitters.top() if count > 1]
+        return stats
+
+
+class InputValidator:
+    """Validator for one input of a prompt, compiled from its requiredColumns"""
+
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = [clean_column(column) for column in join_fragments(columns) if clean_column(column)]
+        self.types = {column: column_type(column) for column in self.columns}
+
+    def match_header(self, header):
+        """(required column -> file column index, missing columns, extra file columns)"""
+        positions = {}
+        for index, name in enumerate(header):
+            positions.setdefault(normalize_column(name), index)
+        mapping, missing = {}, []
+        for column in self.columns:
+            index = positions.get(normalize_column(column))
+            if index is None:
+                missing.append(column)
+            else:
+                mapping[column] = index
+        used = set(mapping.values())
+        extra = [name for index, name in enumerate(header) if index not in used]
+        return mapping, missing, extra
+
+    def validate(self, source, batch_rows=10000, max_errors=100, delimiter=None):
+        """Stream a CSV file (path or text file object) and return a ValidationReport
+        
+        The source is read once, front to back, so it need not be seekable;
+        blank lines are skipped.
+        """
+        if isinstance(source, (str, Path)):
+            with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+                return self.validate(f, batch_rows, max_errors, delimiter)
+
+        if delimiter is None:
+            # Sniff a prefix ending on a line break, then read it again ahead of the rest
+            sample = source.read(65536)
+            if sample and not sample.endswith(("\n", "\r")):
+                sample += source.readline()
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+            except csv.Error:
+                delimiter = ","
+            source = chain(io.StringIO(sample, newline=''), source)
+        reader = csv.reader(source, delimiter=delimiter)
+        report = ValidationReport(self, max_errors)
+        header = next(reader, None)
+        if header is None:
+            report.error(0, None, "empty-file", "File has no header row")
+            return report
+
+        mapping, missing, extra = self.match_header([name.strip() for name in header])
+        report.header = {"columns": len(header), "missing": missing, "extra": extra,
+                         "mapping": {column: header[index].strip() for column, index in mapping.items()}}
+        for column in missing:
+            report.error(1, column, "missing-column", f"Required column {column} not in header")
+        stats = {column: ColumnStats(column, self.types[column]) for column in mapping}
+        report.columns = stats
+        width = len(header)
+
+        while True:
+            first_line = reader.line_num + 1
+            batch = list(islice(reader, batch_rows))
+            if not batch:
+                break
+            # Line numbers are exact unless a quoted field spans lines
+            lines = range(first_line, first_line + len(batch))
+            if not all(map(any, batch)):
+                kept = [position for position, row in enumerate(batch) if any(row)]
+                batch = [batch[position] for position in kept]
+                lines = [lines[position] for position in kept]
+                if not batch:
+                    continue
+            if set(map(len, batch)) != {width}:
+                for position, row in enumerate(batch):
+                    if len(row) != width:
+                        if any(row):
+                            report.error(lines[position], None, "row-width",
+                                         f"Expected {width} fields, found {len(row)}")
+                        batch[position] = (row + [""] * width)[:width]
+            report.rows += len(batch)
+            fields = list(zip(*batch))
+            del batch
+            for column, index in mapping.items():
+                kind = self.types[column]
+                values = list(map(str.strip, fields[index]))
+                parsed = parse_batch(kind, values)
+                invalid = stats[column].update(values, parsed)
+                report.errors_total += invalid
+                for line, value, result in zip(lines, values, parsed):
+                    if not invalid or not report.can_sample:
+                        break
+                    if value and result is None:
+                        invalid -= 1
+                        report.sample(line, column, f"invalid-{kind}",
+                                      f"{column}: {value[:40]!r} is not a valid {kind}")
+        return report
+
+
+class ValidationReport:
+    """Header check, column statistics and bounded error samples for one file"""
+
+    def __init__(self, validator, max_errors):
+        self.validator = validator
+        self.max_errors = max_errors
+        self.header = {}
+        self.columns = {}
+        self.rows = 0
+        self.errors = []
+        self.errors_total = 0
+
+    @property
+    def can_sample(self):
+        return len(self.errors) < self.max_errors
+
+    @property
+    def ok(self):
+        return not self.header.get("missing") and self.errors_total == 0 and self.rows > 0
+
+    def error(self, line, column, code, message):
+        self.errors_total += 1
+        self.sample(line, column, code, message)
+
+    def sample(self, line, column, code, message):
+        """Keep the details of an error already counted, up to max_errors of them"""
+        if self.can_sample:
+            self.errors.append({"line": line, "column": column, "code": code, "message": message})
+
+    def to_dict(self):
+        by_column = {column: stats.invalid for column, stats in self.columns.items() if stats.invalid}
+        return {
+            "version": VALIDATOR_VERSION,
+            "input": self.validator.name,
+            "ok": self.ok,
+            "rows": self.rows,
+            "header": self.header,
+            "errors": {"total": self.errors_total, "invalidByColumn": by_column, "samples": self.errors},
+            "columns": {column: stats.to_dict() for column, stats in self.columns.items()}
+        }
+
+    def summary_text(self):
+        """A few lines describing the file, to send instead of its rows"""
+        lines = [f"{self.validator.name}: {self.rows:,} rows, {self.header.get('columns', 0)} columns"]
+        if self.header.get("missing"):
+            lines.append(f"Missing columns: {', '.join(self.header['missing'])}")
+        for column, stats in self.columns.items():
+            data = stats.to_dict()
+            parts = [data["type"], f"{data['empty']} empty", f"{data['invalid']} invalid",
+                     f"{data['distinct']} distinct"]
+            if "min" in data:
+                parts.append(f"range {data['min']} to {data['max']}")
+            if "mean" in data:
+                parts.append(f"mean {data['mean']:g}, sum {data['sum']:g}")
+            if data.get("top"):
+                parts.append("top " + ", ".join(f"{value} ({count})" for value, count in data["top"][:3]))
+            lines.append(f"- {column}: " + "; ".join(parts))
+        if self.errors_total:
+            lines.append(f"{self.errors_total:,} row error(s), first at line {self.errors[0]['line']}")
+        return "\n".join(lines)
+
+
+def compile_schema(input_schema):
+    """{input key: InputValidator} for every input of a prompt that lists required columns"""
+    return {
+        key: InputValidator(spec.get("name", key), spec["requiredColumns"])
+        for key, spec in input_schema.items()
+        if spec.get("requiredColumns")
+    }
+
+
+def find_prompt(data, prompt_id):
+    for chapter in data.get("chapters", []):
+        for problem in chapter.get("problems", []):
+            for prompt in problem.get("prompts", []):
+                if prompt.get("id") == prompt_id:
+                    return prompt
+    return None
+
+
+def main(argv=None):
+    default_path = Path(__file__).parent.parent.parent / "data" / "ustav.json"
+    arg_parser = argparse.ArgumentParser(description="Validate a CSV upload against a prompt's input schema")
+    arg_parser.add_argument("prompt_id", help="e.g. ch1_p1_pr1")
+    arg_parser.add_argument("input_key", help="e.g. input2")
+    arg_parser.add_argument("csv_file", type=Path)
+    arg_parser.add_argument("--ustav", type=Path, default=default_path,
+                            help="parsed book (default: data/ustav.json; not the dedup format)")
+    arg_parser.add_argument("--batch-rows", type=int, default=10000)
+    arg_parser.add_argument("--max-errors", type=int, default=100)
+    arg_parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = arg_parser.parse_args(argv)
+
+    with open(args.ustav, 'r', encoding='utf-8') as f:
+        prompt = find_prompt(json.load(f), args.prompt_id)
+    if prompt is None:
+        print(f"[INPUT] ✗ Prompt {args.prompt_id} not found in {args.ustav}")
+        return False
+    validator = compile_schema(prompt.get("inputSchema", {})).get(args.input_key)
+    if validator is None:
+        print(f"[INPUT] ✗ {args.prompt_id} has no column schema for {args.input_key}")
+        return False
+
+    report = validator.validate(args.csv_file, args.batch_rows, args.max_errors)
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(report.summary_text())
+        for error in report.errors[:10]:
+            print(f"[INPUT]   line {error['line']}: {error['message']}")
+    return report.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+USTAV Lookup Service - Resident indexes over the parser's output
+The Node routes walk the chapter tree on every request. This service loads
+data/ustav.json (compact, pretty, dedup or ndjson) once, indexes chapters,
+problems, prompts and failure modes by ID, and answers lookups from those
+hash maps. Responses for a given path are serialized once and then served
+as bytes from a bounded cache; the /stats aggregates are computed at load
+time.
+
+Response bodies follow the Node handlers in backend/routes/rag.js, with
+these deliberate differences:
+  - prompts are found by ID in a hash map rather than by the chapter,
+    problem and prompt positions parsed out of the ID; the parser numbers
+    IDs by position, so both find the same record
+  - /prompts/:id/inputs only accepts prompt IDs; for any other string
+    getPromptInputRequirements falls back to keyword search
+  - /chapters/:key accepts a chapter ID as well as a chapter number
+  - /stats carries getExecutionStats' keys (timestamp, uptime and the
+    metadata totals) plus a request counter and the load-time aggregates
+
+Two transports share one router:
+  - a Unix socket speaking one request path per line, one JSON response
+    ({"status": ..., "body": ...}) per line, in order
+  - HTTP/1.1 with keep-alive
+Both accept pipelined requests: every complete request in a read is
+answered, and the responses go out in a single write.
+
+The output file is polled (size, mtime, inode); when the parser replaces
+it, a new index set is built in a worker thread and swapped in with one
+assignment. Requests already in progress finish against the old build; a
+build that fails to load leaves the previous one in service.
+
+Usage: python lookupService.py [--socket data/.ustav-lookup.sock] [--port 5055] [--ustav data/ustav.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SERVICE_VERSION = 1
+
+# Mount point of the Node RAG routes; stripped so the same paths work on both
+ROUTE_PREFIX = "/api/rag"
+
+SEARCH_CACHE_SIZE = 1024
+RESPONSE_CACHE_SIZE = 4096
+# Bytes a client may send without completing a request (line or HTTP head)
+MAX_REQUEST_BYTES = 64 * 1024
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def is_number(text):
+    """Plain ASCII digits; str.isdigit() also accepts "²", which int() rejects"""
+    return text.isascii() and text.isdigit()
+
+
+def encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def iso_timestamp():
+    """new Date().toISOString(): UTC, milliseconds, "Z" suffix"""
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace("+00:00", "Z")
+
+
+def remember(cache, key, value, size):
+    """Store value in an OrderedDict cache, evicting the least recently used entry"""
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+
+def input_instructions(prompt):
+    """getInputInstructions (backend/rag/augmentation.js): one entry per inputSchema key"""
+    schema = prompt.get("inputSchema")
+    if not isinstance(schema, dict):
+        return []
+    instructions = []
+    for key, field in schema.items():
+        instruction = f"Provide the {field.get('name')}. Format: {field.get('requiredFormat')}."
+        if field.get("requiredColumns"):
+            instruction += f" Required columns: {', '.join(field['requiredColumns'])}."
+        if field.get("systemSource"):
+            instruction += f" Source: {field['systemSource']}."
+        if field.get("example"):
+            instruction += f" Example: {field['example']}"
+        instructions.append({
+            "inputKey": key,
+            "name": field.get("name"),
+            "systemSource": field.get("systemSource") or "User Input",
+            "requiredFormat": field.get("requiredFormat") or "Text",
+            "requiredColumns": field.get("requiredColumns") or [],
+            "example": field.get("example") or None,
+            "instructions": instruction
+        })
+    return instructions
+
+
+def validate_prompt(prompt):
+    """validatePrompt (backend/rag/retrieval.js) for a prompt that was found"""
+    errors = []
+    if not (prompt.get("promptCode") or "").strip():
+        errors.append({"field": "promptCode", "message": "Prompt code is missing or empty"})
+    if not prompt.get("inputSchema"):
+        errors.append({"field": "inputSchema", "message": "Input schema not defined"})
+    if not prompt.get("outputRequirements"):
+        errors.append({"field": "outputRequirements", "message": "Output requirements not specified"})
+    return {
+        "valid": not errors,
+        "errors": errors,
+        "prompt": prompt,
+        "message": f"Found {len(errors)} validation errors" if errors else "Prompt is valid"
+    }
+
+
+def resolve_blobs(data):
+    """Expand a dedup document's {"$text"} / {"$blob"} references (see backend/rag/blobReader.js)"""
+    blobs = data.pop("blobs", None)
+    if not isinstance(blobs, dict):
+        return data
+
+    def resolve(value):
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if isinstance(value.get("$text"), list):
+            return "\n\n".join(blobs[key] for key in value["$text"])
+        if isinstance(value.get("$blob"), str):
+            return blobs[value["$blob"]]
+        return {key: resolve(item) for key, item in value.items()}
+
+    return resolve(data)
+
+
+def load_document(path):
+    """{"chapters": [...], "metadata": {...}} from any of the parser's output formats"""
+    text = Path(path).read_text(encoding='utf-8')
+    try:
+        return resolve_blobs(json.loads(text))
+    except json.JSONDecodeError as error:
+        if error.msg != "Extra data":
+            raise
+
+    # ndjson: chapter header records, their problem records, a metadata trailer
+    chapters, metadata = [], {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        kind = record.pop("type", None)
+        if kind == "chapter":
+            chapters.append({**record, "problems": []})
+        elif kind == "problem":
+            record.pop("chapterId", None)
+            chapters[-1]["problems"].append(record)
+        elif kind == "metadata":
+            metadata = record
+    return {"chapters": chapters, "metadata": metadata}
+
+
+def severity_level(severity):
+    """"LOW (8.8/10) – 5-Step ..." -> "LOW" """
+    match = re.match(r"\s*([A-Z]+)\b", severity or "")
+    return match.group(1) if match else "UNKNOWN"
+
+
+class Corpus:
+    """Hash indexes, search texts and serialized responses for one build"""
+
+    def __init__(self, data, source=None):
+        self.metadata = data.get("metadata", {})
+        self.chapters = data.get("chapters", [])
+        self.chapter_ids = {}
+        self.chapter_numbers = {}
+        self.problems = {}
+        self.problem_positions = {}
+        self.positions = {}
+        self.prompts = {}
+        self.failure_modes = {}
+        self.search_texts = []
+
+        for chapter_number, chapter in enumerate(self.chapters, start=1):
+            self.chapter_ids[chapter["id"]] = chapter
+            # Routes take the chapter's own number, as index.chapters.find() does
+            number = chapter.get("number")
+            if isinstance(number, int) and not isinstance(number, bool):
+                self.chapter_numbers.setdefault(number, chapter)
+            self.positions[chapter["id"]] = (chapter_number, None)
+            for problem_number, problem in enumerate(chapter.get("problems", []), start=1):
+                self.problems[problem["id"]] = (chapter, problem)
+                self.problem_positions[(chapter_number, problem_number)] = (chapter, problem)
+                self.positions[problem["id"]] = (chapter_number, problem_number)
+                for prompt in problem.get("prompts", []):
+                    self.prompts[prompt["id"]] = (chapter, problem, prompt)
+                for failure_mode in problem.get("failureModes", []):
+                    self.failure_modes[failure_mode["id"]] = (chapter, problem, failure_mode)
+                # The fields retrieveByKeyword searches, lowercased once
+                sections = problem.get("sections", {})
+                fields = [chapter.get("title"), chapter.get("intro"), chapter.get("strategicPatterns"),
+                          problem.get("title"), sections.get("operationalReality"),
+                          sections.get("businessCase"), sections.get("industryContext")]
+                fields += [f"{fm.get('name')} {fm.get('symptom')}" for fm in problem.get("failureModes", [])]
+                text = " ".join(field for field in fields if field).lower()
+                self.search_texts.append((text, chapter_number, problem_number, chapter, problem))
+
+        self.responses = OrderedDict()
+        self.search_cache = OrderedDict()
+        self.stats = self.compute_stats(source)
+        # Everything but the opening brace, so live counters can be prepended
+        self.stats_tail = encode(self.stats)[1:]
+
+    def compute_stats(self, source):
+        severities = {}
+        for _, _, prompt in self.prompts.values():
+            level = severity_level(prompt.get("severity"))
+            severities[level] = severities.get(level, 0) + 1
+        inputs = [len(prompt.get("inputSchema") or {}) for _, _, prompt in self.prompts.values()]
+        # getExecutionStats reports the metadata totals; JSON drops missing ones
+        stats = {key: self.metadata[key] for key in ("totalPrompts", "totalProblems", "totalChapters")
+                 if key in self.metadata}
+        stats.update({
+            "indexed": {
+                "chapters": len(self.chapters),
+                "problems": len(self.problems),
+                "prompts": len(self.prompts),
+                "failureModes": len(self.failure_modes)
+            },
+            "promptsWithInputs": sum(1 for count in inputs if count),
+            "totalInputs": sum(inputs),
+            "severity": dict(sorted(severities.items())),
+            "chapters": [{
+                "id": chapter["id"],
+                "number": chapter.get("number"),
+                "title": chapter.get("title"),
+                "problems": len(chapter.get("problems", [])),
+                "prompts": sum(len(p.get("prompts", [])) for p in chapter.get("problems", [])),
+                "failureModes": sum(len(p.get("failureModes", [])) for p in chapter.get("problems", []))
+            } for chapter in self.chapters],
+            "metadata": self.metadata
+        })
+        if source is not None:
+            stat = os.stat(source)
+            stats["build"] = {"path": str(source), "bytes": stat.st_size,
+                              "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()}
+        return stats
+
+    def route(self, path, query):
+        """(status, JSON body bytes) for a request path; the latest 200 responses are kept"""
+        cached = self.responses.get(path)
+        if cached is not None and not query:
+            self.responses.move_to_end(path)
+            return 200, cached
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts[:2] == ["prompts", "search"]:
+            return self.search(parse_qs(query).get("q", [""])[0])
+
+        status, value = self.lookup(parts)
+        if status != 200:
+            return status, encode(value)
+        body = encode(value)
+        # Keyed by the raw path, so "/chapters/01" and "%63h1" spellings are
+        # separate entries; the bound keeps such variants from piling up
+        remember(self.responses, path, body, RESPONSE_CACHE_SIZE)
+        return status, body
+
+    def lookup(self, parts):
+        head, rest = parts[0], parts[1:]
+        if head == "prompts" and rest:
+            entry = self.prompts.get(rest[0])
+            if rest[1:] == ["inputs"]:
+                # getPromptInputRequirements; the route answers its errors with a 400
+                if entry is None:
+                    return 400, {"success": False, "error": f"Prompt {rest[0]} not found"}
+                prompt = entry[2]
+                return 200, {"promptId": prompt["id"], "title": prompt.get("title"),
+                             "inputs": input_instructions(prompt), "validation": validate_prompt(prompt)}
+            if entry is None:
+                return 404, {"success": False, "error": f"Prompt {rest[0]} not found"}
+            chapter, problem, prompt = entry
+            if not rest[1:]:
+                return 200, {"prompt": prompt, "context": self.context(chapter, problem, prompt)}
+        elif head == "problems" and len(rest) == 1:
+            entry = self.problems.get(rest[0])
+            if entry is None:
+                return 404, {"success": False, "error": f"Problem {rest[0]} not found"}
+            return 200, {"problem": entry[1], "context": self.context(entry[0], entry[1])}
+        elif head == "failure-modes" and len(rest) == 1:
+            entry = self.failure_modes.get(rest[0])
+            if entry is None:
+                return 404, {"success": False, "error": f"Failure mode {rest[0]} not found"}
+            return 200, {"failureMode": entry[2], "context": self.context(entry[0], entry[1])}
+        elif head == "chapters":
+            return self.lookup_chapter(rest)
+        elif head == "health" and not rest:
+            return 200, {"status": "ok", "version": SERVICE_VERSION, "chapters": len(self.chapters), "prompts": len(self.prompts)}
+        return 404, {"success": False, "error": f"No route for /{'/'.join(parts)}"}
+
+    def lookup_chapter(self, rest):
+        if not rest:
+            return 200, [{"id": chapter["id"], "number": chapter.get("number"), "title": chapter.get("title"),
+                          "problemCount": len(chapter.get("problems", []))}
+                         for chapter in self.chapters]
+        key = rest[0]
+        if len(rest) == 4 and rest[1] == "problems" and rest[3] == "prompts" and is_number(rest[2]):
+            return self.problem_prompts(key, int(rest[2]))
+        chapter = self.chapter_ids.get(key) or (self.chapter_numbers.get(int(key)) if is_number(key) else None)
+        if chapter is None:
+            return 404, {"success": False, "error": f"Chapter {key} not found"}
+        summary = {"id": chapter["id"], "number": chapter.get("number"), "title": chapter.get("title")}
+        if not rest[1:]:
+            return 200, {**summary, "intro": chapter.get("intro"),
+                         "problems": self.problem_summaries(chapter)}
+        if rest[1:] == ["problems"]:
+            return 200, {"chapter": summary, "problems": self.problem_summaries(chapter)}
+        return 404, {"success": False, "error": f"No route for /chapters/{'/'.join(rest)}"}
+
+    def problem_prompts(self, key, problem_number):
+        """getProblemPrompts, which takes the chapter and problem by position, not by number"""
+        if is_number(key):
+            chapter_number = int(key)
+        elif key in self.chapter_ids:
+            chapter_number = self.positions[key][0]
+        else:
+            return 404, {"success": False, "error": f"Chapter {key} not found"}
+        if not 0 < chapter_number <= len(self.chapters):
+            return 404, {"success": False, "error": f"Chapter {chapter_number} not found"}
+        entry = self.problem_positions.get((chapter_number, problem_number))
+        if entry is None:
+            return 404, {"success": False, "error": f"Problem {chapter_number}.{problem_number} not found"}
+        chapter, problem = entry
+        return 200, {
+            "success": True,
+            "prompts": [{
+                "id": p["id"],
+                "title": p.get("title"),
+                "version": p.get("version"),
+                "severity": p.get("severity"),
+                "inputCount": len(p.get("inputSchema") or {}),
+                "promptability": p.get("promptability", 0)
+            } for p in problem.get("prompts", [])],
+            "problem": {"id": problem["id"], "title": problem.get("title"),
+                        "description": (problem.get("sections", {}).get("operationalReality") or "")[:200]},
+            "chapter": {"id": chapter["id"], "title": chapter.get("title")}
+        }
+
+    def problem_summaries(self, chapter):
+        return [{"id": p["id"], "number": p.get("number"), "title": p.get("title"),
+                 "promptCount": len(p.get("prompts", []))} for p in chapter.get("problems", [])]
+
+    def context(self, chapter, problem, prompt=None):
+        """IDs and the breadcrumb path; the full records are one lookup away"""
+        chapter_number, problem_number = self.positions[problem["id"]]
+        path = f"Chapter {chapter_number} > Problem {problem_number}"
+        if prompt is not None:
+            path += f" > {prompt.get('title')}"
+        return {"chapterId": chapter["id"], "problemId": problem["id"], "path": path}
+
+    def search(self, query):
+        """retrieveByKeyword's scoring: one point per keyword found in a problem's text"""
+        cached = self.search_cache.get(query)
+        if cached is not None:
+            self.search_cache.move_to_end(query)
+            return cached
+        keywords = query.lower().split()
+        if not keywords:
+            return 400, encode({"success": False, "error": "Missing search query parameter: q"})
+
+        best, best_score = None, 0
+        for entry in self.search_texts:
+            score = sum(1 for keyword in keywords if keyword in entry[0])
+            # First problem with the highest score wins, as with _.maxBy
+            if score > best_score and entry[4].get("prompts"):
+                best, best_score = entry, score
+        if best is None:
+            result = 404, encode({"success": False, "found": False, "keyword": query,
+                                  "error": f'No prompts found matching: "{query}"'})
+        else:
+            _, chapter_number, problem_number, chapter, problem = best
+            prompt = problem["prompts"][0]
+            result = 200, encode({
+                "success": True,
+                "found": True,
+                "prompt": {"id": prompt["id"], "title": prompt.get("title"), "severity": prompt.get("severity"),
+                           "inputCount": len(prompt.get("inputSchema") or {})},
+                "context": {"chapterId": chapter["id"], "problemId": problem["id"],
+                            "path": f"Chapter {chapter_number} > Problem {problem_number}"},
+                "searchScore": best_score
+            })
+        remember(self.search_cache, query, result, SEARCH_CACHE_SIZE)
+        return result
+
+
+class LookupService:
+    """Current Corpus, request counters and the reload watcher"""
+
+    def __init__(self, ustav_path, poll_interval=0.5):
+        self.ustav_path = Path(ustav_path)
+        self.poll_interval = poll_interval
+        self.corpus = None
+        self.state = None
+        self.generation = 0
+        self.requests = 0
+        self.started = time.monotonic()
+
+    def file_state(self):
+        stat = os.stat(self.ustav_path)
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def build(self):
+        """Load and index the output file; returns (corpus, file state, seconds)"""
+        start = time.perf_counter()
+        state = self.file_state()
+        corpus = Corpus(load_document(self.ustav_path), self.ustav_path)
+        return corpus, state, time.perf_counter() - start
+
+    def swap(self, corpus, state, seconds):
+        self.corpus, self.state = corpus, state
+        self.generation += 1
+        corpus.stats["build"] = {**corpus.stats.get("build", {}), "generation": self.generation,
+                                 "loadMs": round(seconds * 1000, 1)}
+        corpus.stats_tail = encode(corpus.stats)[1:]
+        print(f"[LOOKUP] ✓ Build {self.generation} in service: {len(corpus.chapters)} chapter(s), "
+              f"{len(corpus.prompts)} prompt(s), indexed in {seconds * 1000:.0f} ms")
+
+    async def watch(self):
+        """Poll the output file and swap in a new Corpus after each rebuild"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self.file_state() == self.state:
+                    continue
+                self.swap(*await asyncio.to_thread(self.build))
+            except Exception as error:
+                # A missing or broken file must not take the service down
+                print(f"[LOOKUP] ⚠ Reload failed, still serving build {self.generation}: {error}")
+                try:
+                    self.state = self.file_state()
+                except OSError:
+                    pass
+
+    def handle(self, target):
+        """(status, body bytes) for a request target such as /api/rag/prompts/ch1_p1_pr1"""
+        self.requests += 1
+        corpus = self.corpus
+        if corpus is None:
+            return 503, encode({"success": False, "error": "USTAV database not available"})
+        parts = urlsplit(target)
+        path = parts.path
+        if path.startswith(ROUTE_PREFIX):
+            path = path[len(ROUTE_PREFIX):]
+        path = "/" + path.strip("/")
+        if path == "/stats":
+            live = (f'{{"timestamp":"{iso_timestamp()}",'
+                    f'"uptime":{time.monotonic() - self.started:.3f},"requests":{self.requests},')
+            return 200, live.encode('utf-8') + corpus.stats_tail
+        return corpus.route(path, parts.query)
+
+
+class _Connection(asyncio.Protocol):
+    """Buffers input, answers every complete request in it, writes the answers at once"""
+
+    def __init__(self, service):
+        self.service = service
+        self.transport = None
+        self.buffer = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def dispatch(self, target):
+        """service.handle(), with a failing request answered by a 500 instead of dropping the batch"""
+        try:
+            return self.service.handle(target)
+        except Exception as error:
+            print(f"[LOOKUP] ✗ {target[:200]!r} failed: {type(error).__name__}: {error}")
+            return 500, encode({"success": False, "error": "Internal error"})
+
+    def data_received(self, data):
+        self.buffer += data
+        responses, close = self.respond()
+        if responses:
+            self.transport.write(b"".join(responses))
+        if close:
+            self.transport.close()
+        elif len(self.buffer) > MAX_REQUEST_BYTES:
+            self.transport.write(self.overflow())
+            self.transport.close()
+
+    # Stop reading while the client is not reading its responses
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+class LineConnection(_Connection):
+    """Unix socket protocol: a path per line in, a JSON object per line out"""
+
+    def respond(self):
+        *lines, self.buffer = self.buffer.split(b"\n")
+        responses = []
+        for line in lines:
+            target = line.decode('utf-8', 'replace').strip()
+            if not target:
+                continue
+            if target.startswith("GET "):
+                target = target[4:].strip()
+            status, body = self.dispatch(target)
+            responses.append(b'{"status":%d,"body":%b}\n' % (status, body))
+        return responses, False
+
+    def overflow(self):
+        return b'{"status":400,"body":{"success":false,"error":"Request line too long"}}\n'
+
+
+class HttpConnection(_Connection):
+    """HTTP/1.1 GET/HEAD with keep-alive and pipelining"""
+
+    def respond(self):
+        responses = []
+        while True:
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                return responses, False
+            head = self.buffer[:end].decode('latin-1').split("\r\n")
+            headers = {}
+            for line in head[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = headers.get("content-length", "0")
+            length = int(length) if is_number(length) else 0
+            if len(self.buffer) < end + 4 + length:
+                return responses, False  # request body still arriving; it is ignored
+            self.buffer = self.buffer[end + 4 + length:]
+
+            request = head[0].split()
+            if len(request) != 3 or not request[2].startswith("HTTP/"):
+                responses.append(self.response(400, encode({"success": False, "error": "Bad request"}), False))
+                return responses, True
+            method, target, version = request
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+            if method not in ("GET", "HEAD"):
+                status, body = 405, encode({"success": False, "error": f"Method {method} not allowed"})
+            else:
+                status, body = self.dispatch(target)
+            responses.append(self.response(status, body, keep_alive, method == "HEAD"))
+            if not keep_alive:
+                return responses, True
+
+    def response(self, status, body, keep_alive, head_only=False):
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n")
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        return (head + "\r\n").encode('latin-1') + (b"" if head_only else body)
+
+    def overflow(self):
+        return self.response(431, encode({"success": False, "error": "Request head too large"}), False)
+
+
+async def serve(service, socket_path=None, host="127.0.0.1", port=None):
+    loop = asyncio.get_running_loop()
+    service.swap(*await asyncio.to_thread(service.build))
+    servers = []
+    if socket_path:
+        socket_path = Path(socket_path)
+        if socket_path.is_socket():
+            socket_path.unlink()
+        servers.append(await loop.create_unix_server(lambda: LineConnection(service), str(socket_path)))
+        print(f"[LOOKUP] ✓ Listening on unix:{socket_path}")
+    if port is not None:
+        servers.append(await loop.create_server(lambda: HttpConnection(service), host, port))
+        print(f"[LOOKUP] ✓ Listening on http://{host}:{port}")
+    try:
+        await service.watch()
+    finally:
+        for server in servers:
+            server.close()
+        if socket_path:
+            socket_path.unlink(missing_ok=True)
+
+
+def main(argv=None):
+    data_dir = Path(__file__).parent.parent.parent / "data"
+    arg_parser = argparse.ArgumentParser(description="Serve USTAV lookups from in-memory indexes")
+    arg_parser.add_argument("--ustav", type=Path, default=data_dir / "ustav.json",
+                            help="parser output to serve (default: data/ustav.json)")
+    arg_parser.add_argument("--socket", type=Path, default=data_dir / ".ustav-lookup.sock",
+                            help="Unix socket path (default: data/.ustav-lookup.sock)")
+    arg_parser.add_argument("--no-socket", action="store_true", help="serve HTTP only")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, help="also serve HTTP on this port")
+    arg_parser.add_argument("--poll-interval", type=float, default=0.5,
+                            help="seconds between checks of the output file (default: 0.5)")
+    args = arg_parser.parse_args(argv)
+
+    service = LookupService(args.ustav, args.poll_interval)
+    try:
+        asyncio.run(serve(service, None if args.no_socket else args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n[LOOKUP] Stopped after {service.requests:,} request(s)")
+    except (OSError, ValueError) as error:
+        print(f"[LOOKUP] ✗ {error}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -12,6 +12,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { resolveBlobs } = require('../rag/blobReader');
 
 /**
  * Generate comprehensive metrics from USTAV data
@@ -296,7 +297,7 @@ function main() {
 
   // Load file
   try {
-    const data = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+    const data = resolveBlobs(JSON.parse(fs.readFileSync(filePath, 'utf-8')));
     const metrics = generateMetrics(data);
 
     if (jsonFormat) {
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+USTAV Curated Overlay - Hand-curated fields patched over parser output
+Curated content lives in data/overrides/*.json as {stable ID: patch}, where
+the ID is a chapter ("ch1"), problem ("ch1_p1"), prompt ("ch1_p1_pr1") or
+failure mode ("fm_ch1_p1_01"). Patches are JSON merge patches (RFC 7386):
+objects merge key by key, null removes a key and anything else replaces the
+parsed value. They are applied to each chapter as the parser streams it, so
+curating one problem never means rewriting the whole of data/ustav.json.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+def merge_patch(target, patch):
+    """Return target with an RFC 7386 merge patch applied; neither is modified"""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+class Overlay:
+    """All patches from one overrides directory, keyed by stable ID"""
+
+    def __init__(self, patches=None, sources=None):
+        self.patches = dict(patches or {})
+        self.sources = dict(sources or {})
+        self.applied = set()
+
+    @classmethod
+    def load(cls, directory):
+        """Read every *.json file in directory (sorted); an ID may appear only once"""
+        patches, sources = {}, {}
+        for path in sorted(Path(directory).glob("*.json")):
+            with open(path, 'r', encoding='utf-8') as f:
+                file_patches = json.load(f)
+            if not isinstance(file_patches, dict):
+                raise ValueError(f"{path.name}: expected an object of {{id: patch}}")
+            for ref_id, patch in file_patches.items():
+                if ref_id in sources:
+                    raise ValueError(f"{path.name}: {ref_id} is already patched in {sources[ref_id]}")
+                patches[ref_id] = patch
+                sources[ref_id] = path.name
+        return cls(patches, sources)
+
+    def __len__(self):
+        return len(self.patches)
+
+    def digest(self):
+        """Content hash of every patch, for the build fingerprint"""
+        data = json.dumps(self.patches, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def patch(self, record):
+        """Apply the patch for record["id"], if any; returns the (new) record"""
+        patch = self.patches.get(record.get("id"))
+        if patch is None:
+            return record
+        self.applied.add(record["id"])
+        return merge_patch(record, patch)
+
+    def patched_keys(self, ref_id):
+        """Top-level keys the patch for ref_id sets or removes"""
+        return set(self.patches.get(ref_id) or ())
+
+    def apply_chapter(self, chapter):
+        """Patch a parsed chapter bottom-up: prompts and failure modes, problems, then the chapter"""
+        problems = []
+        for problem in chapter.get("problems", []):
+            problem = {
+                **problem,
+                "prompts": [self.patch(prompt) for prompt in problem.get("prompts", [])],
+                "failureModes": [self.patch(fm) for fm in problem.get("failureModes", [])]
+            }
+            problems.append(self.patch(problem))
+        return self.patch({**chapter, "problems": problems})
+
+    def unused(self):
+        """IDs that matched nothing in the book (typos or removed content)"""
+        return sorted(set(self.patches) - self.applied)
@@ -1,26 +1,193 @@
 #!/usr/bin/env python3
 """
-USTAV Book Parser - Extract Chapter 1 & All 5 Problems
+USTAV Book Parser - Extract All Chapters & Problems
 Engineered for Zero Tolerance Production Quality
 """
 
+import argparse
+import cProfile
+import hashlib
 import json
+import mmap
 import re
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
 
+from artifactCompressor import DEFAULT_LEVEL as DEFAULT_GZIP_LEVEL, ArtifactCompressor
+from buildDiagnostics import BuildValidator, ValidationError
+from chunkWriter import ChunkWriter
+from overlay import Overlay
+from searchIndex import SearchIndexWriter
+from shardWriter import GRANULARITIES, ShardWriter
+from sqliteWriter import SQLiteWriter
+from stageMetrics import METRICS, timed
+from ustavModel import RECOVERY_TIMEFRAMES, SECTION_NAMES, Chapter, Problem
+from ustavWriter import FORMATS, StreamingWriter, atomic_output
+
+# Structural markers, each matched on its own line so the table of contents
+# ("CHAPTER 1 Logistics ...\t10") and the closing index never register as
+# body boundaries. INDEX OF TERMS closes the last chapter.
+MARKER_PATTERN = re.compile(
+    r"^(?:CHAPTER (?P<chapter>\d+)"
+    r"|PROBLEM (?P<problem>\d+\.\d+)"
+    r"|SECTION (?P<section>\d+)"
+    r"|(?P<failure>FAILURE MODE #?\d+(?::[^\n]*)?)"
+    r"|<<< (?P<prompt>BEGIN|END) PROMPT >>>"
+    r"|(?P<backmatter>INDEX OF TERMS))[ \t]*$",
+    re.MULTILINE
+)
+MARKER_PATTERN_BYTES = re.compile(MARKER_PATTERN.pattern.encode('ascii'), re.MULTILINE)
+
+# Bump whenever extraction logic changes so cached problems are re-parsed
+CACHE_VERSION = 6
+
+# Placeholder the Node augmentation step fills with user data, in order
+PLACEHOLDER_PATTERN = re.compile(r"\[User:\s*Paste Data\]")
+
+
+def utf16_length(text):
+    """Length of text in UTF-16 code units, the unit JavaScript strings index by"""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+# Recovery steps end where the next "<Something>-Term" heading begins
+STEP_BOUNDARY_PATTERN = re.compile(r"\w+-Term", re.IGNORECASE)
+
+# Business case (Section 6) figures: "$12,000,000", "$1.4M", "$45K/yr", "6%"
+MONEY_PATTERN = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*([KMB])?(?![A-Za-z])", re.IGNORECASE)
+PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(month|week|day|hour|minute)s?", re.IGNORECASE)
+MONEY_SCALE = {"": 1, "K": 1e3, "M": 1e6, "B": 1e9}
+DAYS_PER_MONTH = 365 / 12
+
+# Line labels inside the business-case blocks
+BENEFIT_LABEL = re.compile(r"sav|recover|gain|benefit|avoid|reduc|prevent|captur|increase|boost|uplift|protect|"
+                           r"realloc|reclaim", re.IGNORECASE)
+# "Onboarding Time: Reduced by 3 weeks ($15,000 value)" is a gain despite its label
+BENEFIT_VALUE = re.compile(r"\b(?:value|worth|saved)\b", re.IGNORECASE)
+COST_LABEL = re.compile(r"cost|fee|time|licen[cs]e|subscription|investment|setup|training|honorari|tooling|api",
+                        re.IGNORECASE)
+LOSS_LABEL = re.compile(r"loss|leak|lost|exposure|friction|waste", re.IGNORECASE)
+# "Annual Freight Spend", "Total labor cost": a yearly base figure, not a unit price
+SPEND_LABEL = re.compile(r"\b(?:annual|total|yearly)\b.*\b(?:spend|cost|fees?|revenue|volume|budget|sales|cogs|value|funding)\b",
+                         re.IGNORECASE)
+# The share of the base figure lost today: "Estimated Error Rate: 6%", "Annual
+# Churn: 20%", "Return Rate: 22%", "Estimated Waste (30%)", "Time spent on
+# 'First Pass' screening: 40%"; win, yield and conversion rates are not losses
+ERROR_RATE_LABEL = re.compile(r"error|leak|overbill|waste|\bloss\b|churn|turnover|stockout|abandon|withdraw|"
+                              r"\breturn|false positive|friction|shock|\btime\b", re.IGNORECASE)
+# "API Costs: <$1,000/year", "Analyst Oversight (2 hrs/week)": operating, not one-time
+RECURRING_LABEL = re.compile(r"ongoing|recurring|/\s*(?:year|yr|month|week)\b|\bper\s+(?:year|month|week)\b",
+                             re.IGNORECASE)
+PER_UNIT_PATTERN = re.compile(r"^\s*(?:/|per\b)\s*(?!y(?:ea)?r\b)", re.IGNORECASE)
+ONE_TIME_LABEL = re.compile(r"implementation|setup|integration|one-time", re.IGNORECASE)
+CUMULATIVE_LABEL = re.compile(r"cumulative|\d-year", re.IGNORECASE)
+
+class _LineCapture:
+    """Line-oriented state machine for one failure-mode field
+    
+    Seeks each heading keyword in order, captures from the line after the
+    last one, and stops either at a blank line followed by the stop_after_blank
+    heading or, for recovery steps, at any blank line or "-Term" heading.
+    """
+    __slots__ = ("needles", "stop_after_blank", "step", "state", "lines", "prev_blank")
+    
+    SEEKING, CAPTURING, DONE = range(3)
+    
+    def __init__(self, needles, stop_after_blank=None, step=False):
+        self.needles = list(needles)
+        self.stop_after_blank = stop_after_blank
+        self.step = step
+        self.state = self.SEEKING
+        self.lines = []
+        self.prev_blank = False
+    
+    def feed(self, line, lowered):
+        """Consume one line; returns True if the line was captured"""
+        if self.state == self.SEEKING:
+            pos = 0
+            while self.needles:
+                idx = lowered.find(self.needles[0], pos)
+                if idx == -1:
+                    return False
+                pos = idx + len(self.needles.pop(0))
+            self.state = self.CAPTURING
+            return False
+        
+        if self.state == self.DONE:
+            return False
+        
+        # A boundary only counts once at least one character was captured
+        has_text = len(self.lines) > 1 or (self.lines and self.lines[0] != "")
+        
+        if self.step:
+            if not line:
+                if has_text:
+                    self.state = self.DONE
+                    return False
+            else:
+                # On the first captured line the boundary may not start at column 0
+                boundary = STEP_BOUNDARY_PATTERN.search(line, 0 if self.lines else 1)
+                if boundary:
+                    self.lines.append(line[:boundary.start()])
+                    self.state = self.DONE
+                    return False
+            self.lines.append(line)
+            return True
+        
+        if (self.prev_blank and lowered.startswith(self.stop_after_blank)
+                and (len(self.lines) > 2 or (len(self.lines) == 2 and self.lines[0] != ""))):
+            self.lines.pop()
+            self.state = self.DONE
+            return False
+        
+        self.prev_blank = not line
+        self.lines.append(line)
+        return True
+    
+    def value(self):
+        return "\n".join(self.lines).strip()
+
 class USTAVParser:
     def __init__(self):
         self.book_text = ""
+        self.book_map = None
+        self.book_view = None
+        self.index = []
+        self.extracted_at = datetime.now().isoformat()
         self.project_root = Path(__file__).parent.parent.parent
         self.book_path = self.project_root / "AI SOLVED BUSINESS PROBLEMS.txt"
         self.output_path = self.project_root / "data" / "ustav.json"
+        self.diagnostics_path = self.project_root / "data" / "ustav.diagnostics.json"
+        self.shard_dir = self.project_root / "data" / "ustav"
+        self.sqlite_path = self.project_root / "data" / "ustav.db"
+        self.search_index_path = self.project_root / "data" / "searchIndex.bm25.json"
+        self.chunk_path = self.project_root / "data" / "ustavChunks.json"
+        self.related_path = self.project_root / "data" / "related.npy"
+        self.cache_path = self.project_root / "data" / ".ustav-cache.json"
+        self.overrides_dir = self.project_root / "data" / "overrides"
+        self.outline_path = self.project_root / "data" / "bookOutline.json"
+        self.problem_cache = {}
+        # Parsed chapters by span hash, kept between builds in watch mode only
+        self.chapter_cache = None
         
-    def load_book(self):
-        """Read the entire USTAV book"""
+    @timed()
+    def load_book(self, use_mmap=False):
+        """Read the entire USTAV book, or map it read-only when use_mmap is set"""
         print(f"[PARSER] Loading USTAV book from {self.book_path}...")
         try:
+            if use_mmap:
+                # Offsets become byte offsets into the mapping; text is only
+                # decoded span by span when a field is written out
+                with open(self.book_path, 'rb') as f:
+                    self.book_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.book_view = memoryview(self.book_map)
+                print(f"[PARSER] ✓ Book mapped: {len(self.book_map):,} bytes")
+                return True
             with open(self.book_path, 'r', encoding='utf-8') as f:
                 self.book_text = f.read()
             print(f"[PARSER] ✓ Book loaded: {len(self.book_text):,} characters")
@@ -29,197 +196,267 @@ class USTAVParser:
             print(f"[PARSER] ✗ Failed to load book: {e}")
             return False
     
-    def parse_chapter_1(self):
-        """Extract Chapter 1: Logistics & Supply Chain"""
-        print("\n[PARSER] Parsing CHAPTER 1: Logistics & Supply Chain...")
+    def close_book(self):
+        """Release the memory mapping, if any"""
+        if self.book_map is not None:
+            self.book_view.release()
+            self.book_map.close()
+            self.book_map = self.book_view = None
+    
+    @property
+    def buffer(self):
+        """The loaded book: a str, or the mapped bytes in mmap mode"""
+        return self.book_text if self.book_map is None else self.book_map
+    
+    def text(self, start, end):
+        """Return the book span [start, end) as a str"""
+        if self.book_map is None:
+            return self.book_text[start:end]
+        return str(self.book_view[start:end], 'utf-8')
+    
+    def offset_before(self, offset, chars, floor=0):
+        """Offset of the character `chars` characters before offset, not below floor
         
-        # Find chapter boundaries
-        ch1_start = self.book_text.find("Logistics & Supply Chain - The AI Operating System")
-        if ch1_start == -1:
-            print("[PARSER] ✗ Could not find Chapter 1 start")
-            return None
+        Counts characters in both modes, so the result is a char offset in
+        text mode and a byte offset on a character boundary in mmap mode.
+        """
+        if self.book_map is None:
+            return max(floor, offset - chars)
+        # A UTF-8 character is at most 4 bytes
+        window = bytes(self.book_view[max(floor, offset - 4 * chars):offset])
+        lead = 0
+        while lead < len(window) and window[lead] & 0xC0 == 0x80:
+            lead += 1
+        tail = window[lead:].decode('utf-8')[-chars:]
+        return offset - len(tail.encode('utf-8'))
+    
+    @timed()
+    def index_book(self, start=0, end=None):
+        """Tokenize every structural marker in one pass over the book
         
-        # Find the actual chapter content (skip to the detailed intro)
-        detailed_start = self.book_text.find("Your phone rings at 2:00 AM. It's not a security alarm", ch1_start)
-        if detailed_start == -1:
-            print("[PARSER] ✗ Could not find Chapter 1 detailed content")
-            return None
+        start/end restrict the scan to one span in the buffer's own offsets
+        (characters in text mode, bytes in mmap mode); outline_span() turns
+        a bookOutline.py outline into such a span.
+        """
+        buffer = self.buffer
+        end = len(buffer) if end is None else end
+        pattern = MARKER_PATTERN if self.book_map is None else MARKER_PATTERN_BYTES
+        markers = []
+        for match in pattern.finditer(buffer, start, end):
+            kind = match.lastgroup
+            value = match.group(kind)
+            if isinstance(value, bytes):
+                value = value.decode('ascii')
+            markers.append((kind, match.start(), match.end(), value))
         
-        # Find Chapter 2 start
-        ch2_start = self.book_text.find("\n\nCHAPTER", ch1_start + 100)
-        if ch2_start == -1:
-            ch2_start = len(self.book_text)
+        chapters = []
+        chapter = problem = section = None
+        begin_marker = None
         
-        chapter_text = self.book_text[detailed_start:ch2_start]
-        print(f"[PARSER] Found Chapter 1 text: {len(chapter_text):,} characters")
+        span_end = end
+        for kind, start, end, value in markers:
+            if kind in ("chapter", "backmatter"):
+                if problem:
+                    self._close_problem(problem, section, start)
+                if chapter:
+                    chapter["end"] = start
+                chapter = problem = section = None
+                if kind == "backmatter":
+                    break
+                chapter = {
+                    "number": int(value),
+                    "start": start,
+                    "headerEnd": end,
+                    "end": span_end,
+                    "problems": []
+                }
+                chapters.append(chapter)
+            elif chapter is None:
+                # Front matter (preface samples, table of contents)
+                continue
+            elif kind == "problem":
+                if problem:
+                    self._close_problem(problem, section, start)
+                chapter_num, problem_num = value.split(".")
+                problem = {
+                    "chapter": int(chapter_num),
+                    "number": int(problem_num),
+                    "start": start,
+                    "headerEnd": end,
+                    "end": chapter["end"],
+                    "sections": {},
+                    "prompts": [],
+                    "failureModes": []
+                }
+                section = None
+                chapter["problems"].append(problem)
+            elif problem is None:
+                continue
+            elif kind == "section":
+                if section:
+                    section["end"] = start
+                section = {"number": int(value), "start": end, "end": problem["end"]}
+                problem["sections"].setdefault(section["number"], section)
+            elif kind == "failure":
+                problem["failureModes"].append((start, end))
+            elif value == "BEGIN":
+                begin_marker = (start, end)
+            elif begin_marker:
+                problem["prompts"].append((begin_marker[0], begin_marker[1], start, end))
+                begin_marker = None
+        
+        if problem:
+            self._close_problem(problem, section, span_end)
+        self.index = chapters
+        print(f"[PARSER] Indexed {len(markers):,} markers: "
+              f"{len(chapters)} chapter(s), "
+              f"{sum(len(ch['problems']) for ch in chapters)} problem(s)")
+        return chapters
+    
+    def outline_span(self, outline_path):
+        """Span from the first body chapter to the back matter, per a bookOutline.py outline
+        
+        The outline records byte offsets; in text mode they are converted to
+        character offsets. Returns None when the outline is missing, covers
+        another book, or no longer matches the loaded book, so the caller
+        falls back to scanning everything.
+        """
+        try:
+            with open(outline_path, 'r', encoding='utf-8') as f:
+                outline = json.load(f)
+        except (OSError, ValueError):
+            return None
+        book_path = Path(self.book_path).resolve()
+        entry = next((f for f in outline.get("files", []) if Path(f["path"]).resolve() == book_path), None)
+        if not entry or not entry["chapters"]:
+            return None
         
-        # Extract chapter introduction
-        intro_end = chapter_text.find("PROBLEM 1.1")
-        intro = chapter_text[:intro_end].strip() if intro_end > 0 else ""
+        if self.book_map is None:
+            encoded = self.book_text.encode('utf-8')
+            to_offset = lambda byte_offset: len(encoded[:byte_offset].decode('utf-8'))
+        else:
+            encoded = self.book_map
+            to_offset = lambda byte_offset: byte_offset
+        if len(encoded) != entry["bytes"]:
+            return None
         
-        # Extract all 5 problems
+        # Every chapter heading must still sit where the outline says it does
+        for chapter in entry["chapters"]:
+            match = MARKER_PATTERN_BYTES.match(encoded, chapter["byteOffset"])
+            if not match or match.group("chapter") != str(chapter["number"]).encode('ascii'):
+                return None
+        return to_offset(entry["chapters"][0]["byteOffset"]), to_offset(entry["chapters"][-1]["endByteOffset"])
+    
+    def _close_problem(self, problem, section, end):
+        """Fix the end offset of a problem and its last open section"""
+        problem["end"] = end
+        if section:
+            section["end"] = end
+    
+    def line_after(self, offset):
+        """Return the stripped line that follows a marker ending at offset"""
+        buffer = self.buffer
+        newline = "\n" if self.book_map is None else b"\n"
+        line_start = offset + 1 if buffer[offset:offset + 1] == newline else offset
+        line_end = buffer.find(newline, line_start)
+        if line_end == -1:
+            line_end = len(buffer)
+        return self.text(line_start, line_end).strip(), line_end
+    
+    def chapters(self):
+        """Lazy Chapter records for the indexed book; nothing is decoded until read"""
+        return [Chapter(self, entry) for entry in self.index]
+    
+    def parse_chapter(self, entry):
+        """Extract one chapter and all of its problems from its index entry"""
+        chapter = Chapter(self, entry)
+        with METRICS.stage("parse_chapter", chapter.id):
+            return self._parse_chapter(chapter, entry)
+    
+    def _parse_chapter(self, chapter, entry):
+        print(f"\n[PARSER] Parsing CHAPTER {chapter.number}...")
+        print(f"[PARSER] Found Chapter {chapter.number} text: {entry['end'] - entry['start']:,} characters")
+        
+        # Extract all problems found by the indexer
         problems = []
-        for i in range(1, 6):
-            print(f"[PARSER]   Parsing Problem 1.{i}...")
-            problem = self.parse_problem(chapter_text, i)
+        for problem_entry in entry["problems"]:
+            problem_id = f"{problem_entry['chapter']}.{problem_entry['number']}"
+            print(f"[PARSER]   Parsing Problem {problem_id}...")
+            problem = self.parse_problem(problem_entry)
             if problem:
                 problems.append(problem)
-                print(f"[PARSER]   ✓ Problem 1.{i} complete: {problem['title']}")
+                print(f"[PARSER]   ✓ Problem {problem_id} complete: {problem['title']}")
             else:
-                print(f"[PARSER]   ✗ Failed to parse Problem 1.{i}")
+                print(f"[PARSER]   ✗ Failed to parse Problem {problem_id}")
         
-        return {
-            "id": "ch1",
-            "number": 1,
-            "title": "Logistics & Supply Chain - The AI Operating System",
-            "intro": intro,
-            "problems": problems,
-            "metadata": {
-                "extractionDate": datetime.now().isoformat(),
-                "totalProblems": len(problems),
-                "totalPrompts": sum(len(p.get('prompts', [])) for p in problems),
-                "totalFailureModes": sum(len(p.get('failureModes', [])) for p in problems)
-            }
-        }
+        return chapter.to_dict(problems)
     
-    def parse_problem(self, chapter_text, problem_num):
-        """Parse individual problem (1-5)"""
-        problem_id = f"1.{problem_num}"
-        
-        # Find problem boundaries
-        problem_start = chapter_text.find(f"PROBLEM {problem_id}\n")
-        if problem_start == -1:
-            return None
-        
-        # Find next problem or end
-        next_problem = chapter_text.find(f"\n\nPROBLEM 1.{problem_num + 1}", problem_start)
-        problem_end = next_problem if next_problem > 0 else len(chapter_text)
-        
-        problem_text = chapter_text[problem_start:problem_end]
-        
-        # Extract title
-        title_match = re.search(r"^PROBLEM \d+\.\d+\n([^\n]+)\n", problem_text)
-        title = title_match.group(1) if title_match else f"Problem {problem_id}"
-        
-        # Extract sections
-        sections = {}
-        for i in range(1, 9):
-            section_text = self.extract_section(problem_text, i)
-            section_names = [
-                "operationalReality",
-                "whyTraditionalFails",
-                "managerDecisionPoint",
-                "aiWorkflow",
-                "executionPrompt",
-                "businessCase",
-                "industryContext",
-                "failureModes"
-            ]
-            sections[section_names[i-1]] = section_text
-        
-        # Extract prompts from section 5
-        prompts = self.extract_prompts(problem_text, problem_id)
-        
-        # Extract business case
-        business_case = self.parse_business_case(sections["businessCase"], problem_id)
-        
-        # Extract failure modes
-        failure_modes = self.parse_failure_modes(sections["failureModes"], problem_id)
-        
-        return {
-            "id": f"ch1_p{problem_num}",
-            "number": problem_num,
-            "title": title,
-            "sections": sections,
-            "prompts": prompts,
-            "businessCase": business_case,
-            "failureModes": failure_modes,
-            "metadata": {
-                "severity": self.extract_severity(sections["executionPrompt"]),
-                "promptCount": len(prompts),
-                "failureModeCount": len(failure_modes)
-            }
-        }
+    def parse_chapters(self, workers=1):
+        """Parse every indexed chapter, farming chapters out to a process pool"""
+        return list(self.iter_chapters(workers))
     
-    def extract_section(self, problem_text, section_num):
-        """Extract specific section (1-8)"""
-        start_pattern = f"\nSECTION {section_num}\n"
-        start_pos = problem_text.find(start_pattern)
+    def iter_chapters(self, workers=1):
+        """Yield parsed chapters in book order as soon as each one is ready
         
-        if start_pos == -1:
-            return ""
+        With the chapter cache enabled, chapters whose text is unchanged since
+        the previous build are reused and only the others are parsed.
+        """
+        cache = self.chapter_cache or {}
+        keys = [self.span_hash(entry["start"], entry["end"]) if self.chapter_cache is not None else None
+                for entry in self.index]
+        pending = [entry for entry, key in zip(self.index, keys) if key not in cache]
         
-        # Remove the section header
-        start_pos += len(start_pattern)
-        
-        # Find next section
-        next_section = problem_text.find(f"\nSECTION {section_num + 1}", start_pos)
-        next_problem = problem_text.find("\n\nPROBLEM", start_pos)
+        with ExitStack() as stack:
+            if workers <= 1 or len(pending) <= 1:
+                parsed = map(self.parse_chapter, pending)
+            else:
+                print(f"[PARSER] Parsing {len(pending)} chapters with {workers} worker(s)...")
+                # Mapped books are re-mapped in each worker (the OS shares the pages)
+                # instead of pickling the text
+                book_text = self.book_text if self.book_map is None else None
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(book_text, self.book_path, self.extracted_at, self.problem_cache,
+                              METRICS.enabled, METRICS.trace_memory)
+                ))
+                # map() yields in submission order, so the merge matches a serial run
+                parsed = _merge_worker_metrics(pool.map(_parse_chapter_worker, pending))
+            
+            chapters = {}
+            for entry, key in zip(self.index, keys):
+                chapter = cache.get(key)
+                if chapter is None:
+                    chapter = next(parsed)
+                else:
+                    print(f"[PARSER] Chapter {entry['number']} unchanged, reusing previous parse")
+                if self.chapter_cache is not None:
+                    chapters[key] = chapter
+                yield chapter
         
-        # Determine end position
-        if next_section > 0 and (next_problem == -1 or next_section < next_problem):
-            end_pos = next_section
-        elif next_problem > 0:
-            end_pos = next_problem
-        else:
-            end_pos = len(problem_text)
+        if self.chapter_cache is not None:
+            self.chapter_cache = chapters
+    
+    def parse_problem(self, problem_entry):
+        """Parse an individual problem from its index entry"""
+        # Unchanged problem spans are served from the incremental cache
+        cached = self.problem_cache.get(self.span_hash(problem_entry["start"], problem_entry["end"]))
+        if cached is not None:
+            return cached
         
-        return problem_text[start_pos:end_pos].strip()
+        problem = Problem(self, problem_entry)
+        with METRICS.stage("parse_problem", problem.id):
+            return problem.to_dict()
     
-    def extract_prompts(self, problem_text, problem_id):
+    def extract_section(self, problem_entry, section_num):
+        """Extract specific section (1-8)"""
+        return Problem(self, problem_entry).sections[SECTION_NAMES[section_num - 1]].text
+    
+    def extract_prompts(self, problem_entry, problem_id):
         """Extract all prompts with FULL CODE from Section 5"""
-        prompts = []
-        problem_num = problem_id.split('.')[1]
-        
-        # Find all BEGIN...END PROMPT blocks
-        begin_marker = "<<< BEGIN PROMPT >>>"
-        end_marker = "<<< END PROMPT >>>"
-        
-        search_start = 0
-        prompt_count = 0
-        
-        while True:
-            begin_idx = problem_text.find(begin_marker, search_start)
-            if begin_idx == -1:
-                break
-            
-            end_idx = problem_text.find(end_marker, begin_idx)
-            if end_idx == -1:
-                break
-            
-            prompt_count += 1
-            
-            # Extract full prompt code
-            full_prompt_code = problem_text[begin_idx + len(begin_marker):end_idx].strip()
-            
-            # Extract metadata from before the BEGIN PROMPT marker
-            section_start = max(0, begin_idx - 500)
-            context = problem_text[section_start:begin_idx]
-            
-            # Extract version, role, severity
-            version_match = re.search(r"\*\*Version:\*\*\s*([^\n]+)", context)
-            role_match = re.search(r"\*\*Role:\*\*\s*([^\n]+)", context)
-            severity_match = re.search(r"\*\*Severity:\*\*\s*([^\n]+)", context)
-            
-            prompt_id = f"ch1_p{problem_num}_pr{prompt_count}"
-            
-            prompts.append({
-                "id": prompt_id,
-                "version": version_match.group(1).strip() if version_match else "1.0.v1",
-                "title": self.extract_prompt_title(full_prompt_code),
-                "role": role_match.group(1).strip() if role_match else "AI Assistant",
-                "severity": severity_match.group(1).strip() if severity_match else "UNKNOWN",
-                "promptCode": full_prompt_code,
-                "inputSchema": self.parse_input_schema(full_prompt_code),
-                "outputRequirements": self.parse_output_requirements(full_prompt_code),
-                "mockOutput": self.generate_mock_output(prompt_id),
-                "platformCompatibility": self.extract_platform_compatibility(context)
-            })
-            
-            search_start = end_idx + len(end_marker)
-        
-        return prompts
+        return [prompt.to_dict() for prompt in Problem(self, problem_entry).prompts]
     
+    @timed()
     def extract_prompt_title(self, prompt_code):
         """Extract prompt title"""
         # Try to find a title in the format "# PROMPT X.X:"
@@ -234,6 +471,7 @@ class USTAVParser:
         
         return "Untitled Prompt"
     
+    @timed()
     def parse_input_schema(self, prompt_code):
         """Parse input schema from prompt code"""
         schema = {}
@@ -265,6 +503,44 @@ class USTAVParser:
         
         return schema
     
+    @timed()
+    def build_interpolation_plan(self, prompt_code, input_schema):
+        """Precompile promptCode into placeholder slots
+        
+        Slot i is bound to the i-th inputSchema key; augmentation fills
+        each slot with the user input of that key and copies the text
+        between slots from promptCode itself, without rescanning the
+        prompt. Slot offsets are UTF-16 code units (JavaScript string
+        indices) into promptCode.
+        """
+        input_keys = list(input_schema)
+        slots = []
+        cursor = 0
+        utf16_offset = 0
+        for match in PLACEHOLDER_PATTERN.finditer(prompt_code):
+            utf16_offset += utf16_length(prompt_code[cursor:match.start()])
+            end = utf16_offset + utf16_length(match.group(0))
+            slots.append({
+                "start": utf16_offset,
+                "end": end,
+                "inputKey": input_keys[len(slots)] if len(slots) < len(input_keys) else None
+            })
+            utf16_offset = end
+            cursor = match.end()
+        
+        required_columns = [
+            {"inputKey": input_key, "column": column, "match": column.lower()}
+            for input_key, field in input_schema.items()
+            for column in field["requiredColumns"]
+        ]
+        
+        return {
+            "slots": slots,
+            "requiredInputs": list(input_schema),
+            "requiredColumns": required_columns
+        }
+    
+    @timed()
     def parse_output_requirements(self, prompt_code):
         """Parse output requirements"""
         requirements = []
@@ -285,12 +561,28 @@ class USTAVParser:
         
         return requirements
     
+    def refresh_patched_prompts(self, chapter, overlay):
+        """Re-derive inputSchema and interpolationPlan for prompts whose patch set promptCode or inputSchema
+        
+        Patched records are new dicts (see overlay.merge_patch), so updating
+        them in place never touches the cached parse.
+        """
+        for problem in chapter.get("problems", []):
+            for prompt in problem.get("prompts", []):
+                keys = overlay.patched_keys(prompt["id"])
+                if "promptCode" in keys and "inputSchema" not in keys:
+                    prompt["inputSchema"] = self.parse_input_schema(prompt["promptCode"])
+                if keys & {"promptCode", "inputSchema"}:
+                    prompt["interpolationPlan"] = self.build_interpolation_plan(prompt["promptCode"],
+                                                                                prompt["inputSchema"])
+        return chapter
+    
     def generate_mock_output(self, prompt_id):
         """Generate mock output placeholder"""
         return {
             "promptId": prompt_id,
             "status": "success",
-            "executedAt": datetime.now().isoformat(),
+            "executedAt": self.extracted_at,
             "message": "Mock output - generated for demonstration",
             "data": {
                 "summary": "Analysis complete",
@@ -298,6 +590,7 @@ class USTAVParser:
             }
         }
     
+    @timed()
     def extract_platform_compatibility(self, context):
         """Extract platform compatibility"""
         compat_match = re.search(r"\*\*Platform Compatibility:\*\*\s*([^\n]+)", context)
@@ -308,8 +601,19 @@ class USTAVParser:
         platforms = [p.strip() for p in re.split(r'[,;]', compat_match.group(1))]
         return [p for p in platforms if p]
     
+    @timed()
     def parse_business_case(self, section_text, problem_id):
-        """Parse business case (Section 6)"""
+        """Parse business case (Section 6)
+        
+        The section is a run of blocks ("Current State", "With ...",
+        "Implementation Cost", "Payback") whose indented lines read
+        "Label: $amount ...". Only the figures the book states are kept;
+        ROI, payback projections and sensitivity grids are computed over all
+        problems at once by roiEngine.py, which records the inputs it had to
+        default. Recurring lines of the implementation block count as
+        operating cost and are taken out of its year-one total, so the
+        engine does not charge them twice.
+        """
         business_case = {
             "currentState": {},
             "withAI": {},
@@ -318,79 +622,222 @@ class USTAVParser:
             "sensitivityAnalysis": {}
         }
         
-        # Extract key numbers
-        annual_spend_match = re.search(r"Annual[^\n]*Spend[^\n]*:\s*\$?([\d,]+)", section_text, re.IGNORECASE)
-        error_rate_match = re.search(r"Error Rate[^\n]*:\s*(\d+(?:\.\d+)?%?)", section_text, re.IGNORECASE)
-        payback_match = re.search(r"Payback[^\n]*:\s*([\d\.]+)\s*(?:months?|days?)", section_text, re.IGNORECASE)
+        blocks = {}
+        block = None
+        for line in section_text.split("\n"):
+            if not line.strip():
+                continue
+            if not line[0].isspace():
+                heading = line.strip()
+                key = next((name for prefix, name in (("Current State", "currentState"), ("With ", "withAI"),
+                                                      ("Implementation", "implementation"), ("Payback", "payback"))
+                            if heading.startswith(prefix)), None)
+                block = blocks.setdefault(key, {"heading": heading, "items": []}) if key else None
+                continue
+            if block is not None:
+                label, _, value = line.strip().partition(":")
+                block["items"].append((label, value or label))
+        
+        def money(text):
+            match = MONEY_PATTERN.search(text)
+            if not match:
+                return None
+            amount = float(match.group(1).replace(',', '')) * MONEY_SCALE[(match.group(2) or "").upper()]
+            return int(amount) if amount.is_integer() else amount
+        
+        def spend(label, value):
+            match = MONEY_PATTERN.search(value)
+            if (not match or not SPEND_LABEL.search(label) or LOSS_LABEL.search(label)
+                    or PER_UNIT_PATTERN.match(value, match.end())):
+                return None
+            return money(value)
         
-        if annual_spend_match:
-            business_case["currentState"]["annualFramightSpend"] = int(annual_spend_match.group(1).replace(',', ''))
+        def percent(text):
+            match = PERCENT_PATTERN.search(text)
+            return float(match.group(1)) / 100 if match else None
         
-        if error_rate_match:
-            rate_str = error_rate_match.group(1).replace('%', '')
-            business_case["currentState"]["estimatedErrorRate"] = float(rate_str) / 100
+        def put(target, key, value):
+            if value is not None:
+                target[key] = value
         
-        if payback_match:
-            business_case["payback"]["months"] = float(payback_match.group(1))
+        current = blocks.get("currentState", {"items": []})["items"]
+        state = business_case["currentState"]
+        put(state, "annualSpend", next((spend(l, v) for l, v in current if spend(l, v) is not None), None))
+        put(state, "estimatedErrorRate", next((percent(f"{l}:{v}") for l, v in current
+                                               if ERROR_RATE_LABEL.search(l) and percent(f"{l}:{v}") is not None),
+                                              None))
+        put(state, "currentAnnualLoss", next((money(v) for l, v in reversed(current)
+                                              if LOSS_LABEL.search(l) and money(v) is not None), None))
+        
+        with_ai = blocks.get("withAI", {"heading": "", "items": []})
+        operating, one_time, benefits, net = [], [], [], None
+        for label, value in with_ai["items"]:
+            amount = money(value)
+            if amount is None or CUMULATIVE_LABEL.search(label):
+                continue
+            if re.search(r"\bnet\b", label, re.IGNORECASE):
+                net = amount
+            elif BENEFIT_LABEL.search(label) or BENEFIT_VALUE.search(value):
+                benefits.append((label, amount))
+            elif COST_LABEL.search(label):
+                (one_time if ONE_TIME_LABEL.search(label) else operating).append(amount)
+            else:
+                benefits.append((label, amount))
+        totals = [amount for label, amount in benefits if re.search(r"\btotal\b", label, re.IGNORECASE)]
+        outcome = business_case["withAI"]
+        put(outcome, "targetRate", percent(with_ai["heading"]))
+        put(outcome, "annualBenefit", totals[0] if totals else benefits[0][1] if benefits else None)
+        
+        costs, recurring, total_cost = list(one_time), [], None
+        for label, value in blocks.get("implementation", {"items": []})["items"]:
+            amount = money(value)
+            if amount is None:
+                continue
+            # "Year 1 Net Recovery" is stated here as often as in the With block
+            if re.search(r"\bnet\b", label, re.IGNORECASE):
+                net = amount if net is None else net
+            elif BENEFIT_LABEL.search(label):
+                continue
+            elif re.search(r"\btotal\b", label, re.IGNORECASE):
+                total_cost = amount
+            elif RECURRING_LABEL.search(f"{label}:{value}"):
+                recurring.append(amount)
+            else:
+                costs.append(amount)
+        operating += recurring
+        put(outcome, "annualOperatingCost", sum(operating) if operating else None)
+        put(outcome, "year1NetRecovery", net)
+        put(business_case["implementation"], "totalCost",
+            total_cost - sum(recurring) if total_cost is not None else sum(costs) if costs else None)
+        
+        payback_items = blocks.get("payback", {"items": []})["items"]
+        duration = DURATION_PATTERN.search(payback_items[0][1]) if payback_items else None
+        if duration:
+            amount, unit = float(duration.group(1)), duration.group(2).lower()
+            days = {"month": DAYS_PER_MONTH, "week": 7, "day": 1, "hour": 1 / 24, "minute": 1 / 1440}[unit] * amount
+            # Unrounded, so a payback of minutes or hours does not read as zero months
+            business_case["payback"]["months"] = amount if unit == "month" else days / DAYS_PER_MONTH
         
         return business_case
     
-    def parse_failure_modes(self, section_text, problem_id):
+    def parse_failure_modes(self, problem_entry, problem_id):
         """Parse failure modes (Section 8)"""
-        failure_modes = []
-        problem_num = problem_id.split('.')[1]
-        
-        failure_pattern = r"FAILURE MODE #?(\d+)\n([^\n]+)\n\n([\s\S]+?)(?=FAILURE MODE|$)"
+        return [failure_mode.to_dict() for failure_mode in Problem(self, problem_entry).failure_modes]
+    
+    @timed()
+    def scan_failure_content(self, failure_content):
+        """Extract symptom, root cause and recovery steps in one pass over the lines"""
+        symptom = _LineCapture(("what you see", "symptom"), stop_after_blank="why it happens")
+        root_cause = _LineCapture(("why it happens", "root cause"), stop_after_blank="how to")
+        recovery = _LineCapture(("how to recover",), stop_after_blank="email")
+        steps = [_LineCapture((timeframe.lower(),), step=True) for _, timeframe in RECOVERY_TIMEFRAMES]
         
-        for match in re.finditer(failure_pattern, section_text, re.IGNORECASE):
-            failure_title = match.group(2)
-            failure_content = match.group(3)
-            
-            # Extract sections
-            symptom_match = re.search(r"What You See[\s\S]*?Symptom[^\n]*\n([\s\S]+?)(?=\n\nWhy It Happens|$)", 
-                                    failure_content, re.IGNORECASE)
-            root_cause_match = re.search(r"Why It Happens[\s\S]*?Root Cause[^\n]*\n([\s\S]+?)(?=\n\nHow to|$)",
-                                       failure_content, re.IGNORECASE)
-            recovery_match = re.search(r"How to Recover[\s\S]*?\n([\s\S]+?)(?=\n\nEmail|$)",
-                                     failure_content, re.IGNORECASE)
-            
-            failure_modes.append({
-                "id": f"fm_ch1_p{problem_num}_{str(len(failure_modes) + 1).zfill(2)}",
-                "name": failure_title.strip(),
-                "symptom": symptom_match.group(1).strip() if symptom_match else "",
-                "rootCause": root_cause_match.group(1).strip() if root_cause_match else "",
-                "recovery": {
-                    "immediate": self.extract_recovery_step(recovery_match.group(1) if recovery_match else "", "Immediate"),
-                    "shortTerm": self.extract_recovery_step(recovery_match.group(1) if recovery_match else "", "Short-Term"),
-                    "longTerm": self.extract_recovery_step(recovery_match.group(1) if recovery_match else "", "Long-Term")
-                }
-            })
+        for line in failure_content.split("\n"):
+            lowered = line.lower()
+            symptom.feed(line, lowered)
+            root_cause.feed(line, lowered)
+            # Recovery steps only ever see the lines of the recovery block
+            if recovery.feed(line, lowered):
+                for step in steps:
+                    step.feed(line, lowered)
         
-        return failure_modes
-    
-    def extract_recovery_step(self, recovery_text, timeframe):
-        """Extract recovery step"""
-        pattern = f"{timeframe}[^\n]*\n([\\s\\S]+?)(?=\n\n|\\w+-Term|$)"
-        match = re.search(pattern, recovery_text, re.IGNORECASE)
-        return {
-            "timeframe": timeframe,
-            "action": match.group(1).strip() if match else "",
-            "details": match.group(1).strip() if match else ""
-        }
+        return symptom.value(), root_cause.value(), [step.value() for step in steps]
     
+    @timed()
     def extract_severity(self, prompt_section):
         """Extract severity"""
         match = re.search(r"Severity[:\s]*([^\n]+)", prompt_section, re.IGNORECASE)
         return match.group(1).strip() if match else "UNKNOWN"
     
+    def span_hash(self, start, end):
+        """Content hash of the book span [start, end)"""
+        span = self.buffer[start:end]
+        if isinstance(span, str):
+            span = span.encode('utf-8')
+        return hashlib.sha256(f"v{CACHE_VERSION}:".encode('ascii') + span).hexdigest()
+    
+    def book_fingerprint(self, outputs, options=()):
+        """Content hash of the whole book plus the outputs it was built into"""
+        digest = hashlib.sha256(self.span_hash(0, len(self.buffer)).encode('ascii'))
+        for value in [*outputs, *options]:
+            digest.update(f"\0{value}".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def output_files(self, output_format="pretty", shards=None, sqlite=False, search_index=False,
+                     chunks=False, related=False, gzip=False):
+        """Every file a build with these options produces a fresh copy of"""
+        outputs = [self.output_file(output_format), self.diagnostics_path]
+        if shards:
+            outputs.append(self.shard_dir / "manifest.json")
+        if sqlite:
+            outputs.append(self.sqlite_path)
+        if search_index:
+            outputs.append(self.search_index_path)
+        if chunks:
+            outputs.append(self.chunk_path)
+        if related:
+            outputs.extend([self.related_path, self.related_path.with_suffix(".json")])
+        if gzip:
+            outputs.append(self.output_path.parent / "artifacts.json")
+        return outputs
+    
+    def output_file(self, output_format="pretty"):
+        """Output path for a format; NDJSON goes next to the JSON file"""
+        if output_format == "ndjson":
+            return self.output_path.with_suffix(".ndjson")
+        return self.output_path
+    
+    @timed()
+    def load_cache(self):
+        """Load the per-problem parse cache; returns the stored book fingerprint"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("version") != CACHE_VERSION:
+            return None
+        self.problem_cache = cache.get("problems", {})
+        print(f"[PARSER] Loaded parse cache: {len(self.problem_cache)} problem(s)")
+        return cache.get("fingerprint")
+    
+    @timed()
+    def save_cache(self, parsed, fingerprint):
+        """Persist parsed problems (by ID) keyed by the content hash of their span"""
+        problems = {}
+        for entry in self.index:
+            for problem_entry in entry["problems"]:
+                problem_id = f"ch{problem_entry['chapter']}_p{problem_entry['number']}"
+                if problem_id in parsed:
+                    key = self.span_hash(problem_entry["start"], problem_entry["end"])
+                    problems[key] = parsed[problem_id]
+        
+        try:
+            tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": CACHE_VERSION,
+                    "fingerprint": fingerprint,
+                    "problems": problems
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[PARSER] ⚠ Failed to write parse cache: {e}")
+    
+    def base_metadata(self):
+        """Book-level metadata that does not depend on the parse results"""
+        return {
+            "title": "AI Solved Business Problems",
+            "subtitle": "50 Real-World Challenges from 10 Industries",
+            "version": "1.0.0",
+            "extractedAt": self.extracted_at
+        }
+    
     def save(self, chapters):
         """Save parsed data to JSON"""
         output = {
             "metadata": {
-                "title": "AI Solved Business Problems",
-                "subtitle": "50 Real-World Challenges from 10 Industries",
-                "version": "1.0.0",
-                "extractedAt": datetime.now().isoformat(),
+                **self.base_metadata(),
                 "totalChapters": len(chapters),
                 "totalProblems": sum(len(ch.get('problems', [])) for ch in chapters),
                 "totalPrompts": sum(len(p.get('prompts', [])) 
@@ -401,10 +848,7 @@ class USTAVParser:
         }
         
         try:
-            # Ensure output directory exists
-            self.output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.output_path, 'w', encoding='utf-8') as f:
+            with atomic_output(self.output_path) as f:
                 json.dump(output, f, indent=2, ensure_ascii=False)
             
             print(f"\n[PARSER] ✓ Saved to {self.output_path}")
@@ -416,34 +860,418 @@ class USTAVParser:
             print(f"[PARSER] ✗ Failed to save: {e}")
             return False
     
-    def parse(self):
+    def save_stream(self, chapters, output_format):
+        """Stream chapters to disk as they are parsed (compact, dedup or NDJSON)"""
+        output_path = self.output_file(output_format)
+        try:
+            with StreamingWriter(output_path, output_format, self.base_metadata()) as writer:
+                for chapter in chapters:
+                    writer.write_chapter(chapter)
+                    print(f"[PARSER] ✓ Streamed {chapter['id']} ({len(chapter.get('problems', []))} problem(s))")
+            
+            print(f"\n[PARSER] ✓ Saved to {output_path}")
+            print(f"[PARSER]   - {writer.totals['totalChapters']} chapter(s)")
+            print(f"[PARSER]   - {writer.totals['totalProblems']} problem(s)")
+            print(f"[PARSER]   - {writer.totals['totalPrompts']} prompt(s)")
+            return writer.totals["totalChapters"] > 0
+        except ValidationError:
+            raise
+        except Exception as e:
+            print(f"[PARSER] ✗ Failed to save: {e}")
+            return False
+    
+    def save_diagnostics(self, validator):
+        """Write the validation report and summarize it on the console"""
+        try:
+            validator.save(self.diagnostics_path)
+        except OSError as e:
+            print(f"[PARSER] ⚠ Failed to write diagnostics: {e}")
+            return
+        mark = "✗" if validator.errors else ("⚠" if validator.warnings else "✓")
+        print(f"[PARSER] {mark} Validation: {validator.errors} error(s), {validator.warnings} warning(s) "
+              f"-> {self.diagnostics_path}")
+        for diagnostic in [d for d in validator.diagnostics if d["severity"] == "error"][:10]:
+            print(f"[PARSER]   line {diagnostic['line']}: {diagnostic['id']}: {diagnostic['message']}")
+    
+    def analyze_business_cases(self):
+        """Run the ROI engine over every indexed problem's business case in one batch"""
+        from roiEngine import BusinessCaseTable
+        
+        table = BusinessCaseTable.from_cases(
+            (problem.id, self.parse_business_case(problem.sections["businessCase"].text, problem.id))
+            for chapter in self.chapters() for problem in chapter.problems
+        )
+        print(f"[PARSER] Computed ROI and sensitivity grids for {len(table)} business case(s)")
+        return table.analyze()
+    
+    def parse(self, workers=1, use_mmap=False, use_cache=True, output_format="pretty", shards=None,
+              sqlite=False, search_index=False, roi=False, overrides=True, chunks=False,
+              chunk_size=400, chunk_overlap=50, related=False, related_k=5, strict=False,
+              gzip=False, gzip_level=DEFAULT_GZIP_LEVEL, outline=False):
         """Main parse orchestration"""
         print("\n" + "="*60)
         print("USTAV BOOK PARSER - PRODUCTION MODE")
         print("Zero Tolerance Quality Standard")
         print("="*60 + "\n")
         
+        self.extracted_at = datetime.now().isoformat()
+        
         # Load book
-        if not self.load_book():
+        if not self.load_book(use_mmap):
             return False
         
-        # Parse Chapter 1
-        chapter = self.parse_chapter_1()
-        if not chapter:
-            print("[PARSER] ✗ Failed to parse Chapter 1")
-            return False
+        try:
+            # Curated patches from data/overrides, applied as chapters stream out
+            overlay = None
+            if overrides and self.overrides_dir.is_dir():
+                try:
+                    overlay = Overlay.load(self.overrides_dir)
+                except (OSError, ValueError) as e:
+                    print(f"[PARSER] ✗ Failed to load overrides: {e}")
+                    return False
+                print(f"[PARSER] Loaded {len(overlay)} curated override(s) from {self.overrides_dir}")
+            
+            # Nothing to do when the book is byte-identical to the last build
+            outputs = self.output_files(output_format, shards, sqlite, search_index, chunks, related, gzip)
+            fingerprint = self.book_fingerprint(outputs, [f"format={output_format}", f"shards={shards}",
+                                                          f"roi={roi}", f"chunks={chunk_size}/{chunk_overlap}",
+                                                          f"related={related_k}", f"strict={strict}",
+                                                          f"gzip={gzip_level if gzip else None}",
+                                                          f"overrides={overlay.digest() if overlay else None}"])
+            if (use_cache and self.load_cache() == fingerprint
+                    and all(output.exists() for output in outputs)):
+                print("[PARSER] ✓ Book unchanged since last build, skipping write")
+                return True
+            
+            # Locate every chapter, problem, section and prompt boundary
+            span = self.outline_span(self.outline_path) if outline else None
+            if span:
+                print(f"[PARSER] Indexing the body chapters outlined in {self.outline_path}")
+                self.index_book(*span)
+            else:
+                if outline:
+                    print(f"[PARSER] ⚠ {self.outline_path} is missing or out of date, scanning the whole book")
+                self.index_book()
+            
+            if self.problem_cache:
+                reused = sum(1 for entry in self.index for p in entry["problems"]
+                             if self.span_hash(p["start"], p["end"]) in self.problem_cache)
+                total = sum(len(entry["problems"]) for entry in self.index)
+                print(f"[PARSER] {reused}/{total} problem(s) unchanged, re-parsing the rest")
+            
+            if not self.index:
+                print("[PARSER] ✗ No chapters found")
+                return False
+            
+            # Every chapter is checked as it passes, before any writer sees it
+            validator = BuildValidator(self, strict)
+            
+            # Secondary outputs receive each chapter as it passes
+            writers = []
+            if shards:
+                writers.append(ShardWriter(self.shard_dir, shards, self.base_metadata()))
+            if sqlite:
+                writers.append(SQLiteWriter(self.sqlite_path, self.base_metadata()))
+            if search_index:
+                writers.append(SearchIndexWriter(self.search_index_path))
+            chunk_writer = None
+            if chunks:
+                try:
+                    chunk_writer = ChunkWriter(self.chunk_path, chunk_size, chunk_overlap)
+                    writers.append(chunk_writer)
+                except ValueError as e:
+                    print(f"[PARSER] ✗ {e}")
+                    return False
+            if related:
+                try:
+                    from relatedProblems import RelatedProblemsWriter
+                    writers.append(RelatedProblemsWriter(self.related_path, related_k))
+                except ImportError as e:
+                    print(f"[PARSER] ✗ --related needs NumPy: {e}")
+                    return False
+                except ValueError as e:
+                    print(f"[PARSER] ✗ {e}")
+                    return False
+            
+            # Batched over all problems up front so results can join the stream
+            analyses = None
+            if roi:
+                try:
+                    from roiEngine import apply_analysis
+                    with METRICS.stage("roi"):
+                        analyses = self.analyze_business_cases()
+                except ImportError as e:
+                    print(f"[PARSER] ✗ --roi needs NumPy: {e}")
+                    return False
+            
+            # Parse all chapters, remembering problems for the cache
+            parsed = {}
+            def collect(chapters):
+                for chapter in chapters:
+                    if use_cache:
+                        parsed.update((p["id"], p) for p in chapter.get("problems", []))
+                    if analyses:
+                        # New dicts, so cached problems keep the plain extraction
+                        chapter = {**chapter, "problems": [
+                            {**p, "businessCase": apply_analysis(p["businessCase"], analyses[p["id"]])}
+                            if p["id"] in analyses else p
+                            for p in chapter.get("problems", [])
+                        ]}
+                    if overlay:
+                        with METRICS.stage("overlay", chapter["id"]):
+                            chapter = self.refresh_patched_prompts(overlay.apply_chapter(chapter), overlay)
+                    with METRICS.stage("validate", chapter["id"]):
+                        validator.check_chapter(chapter)
+                    for writer in writers:
+                        with METRICS.stage(f"write:{type(writer).__name__}", chapter["id"]):
+                            writer.write_chapter(chapter)
+                    yield chapter
+            chapters = collect(self.iter_chapters(workers))
+            
+            # Finished artifacts are gzipped in the background while the rest serialize
+            compressor = ArtifactCompressor(self.output_path.parent, gzip_level) if gzip else None
+            
+            # Save to file; secondary outputs are discarded if the main one fails
+            try:
+                with METRICS.stage("build"), ExitStack() as stack:
+                    if compressor:
+                        stack.enter_context(compressor)
+                        # The server may only send ustav.json as-is when it holds the plain tree
+                        compressor.describe(self.output_file(output_format), format=output_format)
+                    for writer in writers:
+                        stack.enter_context(writer)
+                    if output_format == "pretty":
+                        saved = self.save(list(chapters))
+                    else:
+                        saved = self.save_stream(chapters, output_format)
+                    if not saved:
+                        raise OSError("main output was not written")
+            except (OSError, ValidationError) as e:
+                print(f"[PARSER] ✗ Build aborted: {e}")
+                return False
+            finally:
+                self.save_diagnostics(validator)
+            
+            if shards:
+                print(f"[PARSER] ✓ Wrote {shards} shards and manifest to {self.shard_dir}")
+            if sqlite:
+                print(f"[PARSER] ✓ Wrote SQLite database to {self.sqlite_path}")
+            if search_index:
+                print(f"[PARSER] ✓ Wrote BM25 search index to {self.search_index_path}")
+            if compressor:
+                count, plain, compressed = compressor.totals()
+                print(f"[PARSER] ✓ Gzipped {count} artifact(s): {plain:,} -> {compressed:,} bytes, "
+                      f"ETags in {compressor.manifest_path}")
+            if chunk_writer:
+                print(f"[PARSER] ✓ Wrote {len(chunk_writer.chunks)} context chunk(s) to {self.chunk_path}")
+            if related:
+                print(f"[PARSER] ✓ Wrote top-{related_k} related problems to {self.related_path}")
+            if overlay:
+                print(f"[PARSER] ✓ Applied {len(overlay.applied)} curated override(s)")
+                for ref_id in overlay.unused():
+                    print(f"[PARSER] ⚠ Override {ref_id} ({overlay.sources[ref_id]}) matched nothing")
+            
+            if use_cache:
+                self.save_cache(parsed, fingerprint)
+        finally:
+            self.close_book()
         
-        chapters = [chapter]
+        print("\n[PARSER] ✓ PARSE COMPLETE\n")
+        return True
+    
+    def book_state(self):
+        """(mtime, size) of the book plus the curated override files, or None while the book is missing"""
+        try:
+            stat = self.book_path.stat()
+            overrides = tuple((path.name, path.stat().st_mtime_ns, path.stat().st_size)
+                              for path in sorted(self.overrides_dir.glob("*.json")))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, overrides
+    
+    def watch(self, poll_interval=1.0, debounce=0.5, sentinel=None, **options):
+        """Rebuild whenever the book changes until interrupted
         
-        # Save to file
-        if not self.save(chapters):
-            return False
+        The book and data/overrides are polled with stat() only. A change is rebuilt once the file
+        has stopped changing for `debounce` seconds, so an editor's burst of
+        saves produces one build. Parsed chapters stay in memory between
+        builds and only chapters whose text changed are parsed again. After a
+        build that replaced the main output, `sentinel` (if given) is
+        rewritten so the server can reload.
+        """
+        self.chapter_cache = {}
+        output_path = self.output_file(options.get("output_format", "pretty"))
         
-        print("\n[PARSER] ✓ PARSE COMPLETE\n")
+        def output_state():
+            try:
+                return output_path.stat().st_mtime_ns
+            except OSError:
+                return None
+        
+        def build():
+            before = output_state()
+            started = time.perf_counter()
+            try:
+                ok = self.parse(**options)
+            except Exception as e:
+                # A half-edited book must not take the watcher down
+                print(f"[WATCH] ✗ Build failed: {e}")
+                return
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"[WATCH] {'✓' if ok else '✗'} Build finished in {elapsed:.0f} ms")
+            if ok and sentinel and output_state() != before:
+                with atomic_output(sentinel) as f:
+                    f.write(f"{self.extracted_at}\n")
+                print(f"[WATCH] ✓ Touched {sentinel}")
+        
+        build()
+        last_state = self.book_state()
+        print(f"[WATCH] Watching {self.book_path} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(poll_interval)
+                state = self.book_state()
+                if state == last_state:
+                    continue
+                
+                # Wait for the burst of writes to settle before rebuilding
+                while True:
+                    time.sleep(debounce)
+                    settled = self.book_state()
+                    if settled == state:
+                        break
+                    state = settled
+                last_state = state
+                
+                if state is None:
+                    print("[WATCH] ⚠ Book is missing, waiting for it to reappear")
+                    continue
+                print("[WATCH] Book changed, rebuilding...")
+                build()
+        except KeyboardInterrupt:
+            print("\n[WATCH] Stopped")
         return True
 
+# Process pool workers share one parser per process; the book text is
+# shipped once through the initializer rather than with every chapter,
+# or mapped from book_path when the parent runs in mmap mode.
+_worker_parser = None
+
+def _init_worker(book_text, book_path, extracted_at, problem_cache, metrics=False, trace_memory=False):
+    global _worker_parser
+    METRICS.reset()
+    if metrics:
+        METRICS.enable(trace_memory)
+    _worker_parser = USTAVParser()
+    _worker_parser.book_path = book_path
+    _worker_parser.extracted_at = extracted_at
+    _worker_parser.problem_cache = problem_cache
+    if book_text is None:
+        _worker_parser.load_book(use_mmap=True)
+    else:
+        _worker_parser.book_text = book_text
+
+def _parse_chapter_worker(entry):
+    # Stage samples travel back with the chapter they were recorded for
+    return _worker_parser.parse_chapter(entry), METRICS.drain()
+
+def _merge_worker_metrics(results):
+    for chapter, samples in results:
+        METRICS.merge(samples)
+        yield chapter
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Parse the USTAV book into data/ustav.json")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="parallel chapter workers (0 = one per CPU core)")
+    arg_parser.add_argument("--mmap", action="store_true",
+                            help="memory-map the book and decode text only per output field")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="ignore the incremental parse cache and rebuild everything")
+    arg_parser.add_argument("--format", choices=FORMATS, default="pretty",
+                            help="pretty: indented ustav.json (default); compact: streamed minified "
+                                 "JSON; ndjson: streamed ustav.ndjson, one problem per line; dedup: "
+                                 "compact JSON with repeated text stored once in a blob table")
+    arg_parser.add_argument("--shards", choices=GRANULARITIES,
+                            help="also write data/ustav/manifest.json plus one JSON file per chapter or problem")
+    arg_parser.add_argument("--sqlite", action="store_true",
+                            help="also write data/ustav.db (normalized tables + FTS5 search index)")
+    arg_parser.add_argument("--search-index", action="store_true",
+                            help="also write data/searchIndex.bm25.json (inverted index, BM25 scoring)")
+    arg_parser.add_argument("--chunks", action="store_true",
+                            help="also write data/ustavChunks.json (section-aware RAG context chunks "
+                                 "with token counts)")
+    arg_parser.add_argument("--chunk-size", type=int, default=400,
+                            help="maximum approximate tokens per context chunk (default: 400)")
+    arg_parser.add_argument("--chunk-overlap", type=int, default=50,
+                            help="approximate tokens shared by consecutive chunks (default: 50)")
+    arg_parser.add_argument("--related", action="store_true",
+                            help="also write data/related.npy + related.json, the top-k most similar "
+                                 "problems by TF-IDF cosine similarity (needs NumPy)")
+    arg_parser.add_argument("--related-k", type=int, default=5,
+                            help="related problems kept per problem (default: 5)")
+    arg_parser.add_argument("--roi", action="store_true",
+                            help="add ROI, payback and sensitivity grids to every business case (needs NumPy)")
+    arg_parser.add_argument("--outline", action="store_true",
+                            help="index only the body chapters listed in data/bookOutline.json "
+                                 "(written by bookOutline.py), in text or mmap mode; falls back to "
+                                 "a full scan when the outline does not match the book")
+    arg_parser.add_argument("--no-overrides", action="store_true",
+                            help="skip the curated patches in data/overrides")
+    arg_parser.add_argument("--watch", action="store_true",
+                            help="stay resident and rebuild whenever the book changes")
+    arg_parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="seconds between checks of the book in watch mode (default: 1.0)")
+    arg_parser.add_argument("--debounce", type=float, default=0.5,
+                            help="seconds the book must stay unchanged before a rebuild (default: 0.5)")
+    arg_parser.add_argument("--sentinel", type=Path,
+                            help="file rewritten after each watch-mode rebuild, for the server to watch "
+                                 "(e.g. data/.ustav-reload)")
+    arg_parser.add_argument("--gzip", action="store_true",
+                            help="also write <artifact>.gz next to every JSON artifact and an ETag "
+                                 "manifest in data/artifacts.json")
+    arg_parser.add_argument("--gzip-level", type=int, default=DEFAULT_GZIP_LEVEL, choices=range(1, 10),
+                            metavar="1-9", help=f"gzip compression level (default: {DEFAULT_GZIP_LEVEL})")
+    arg_parser.add_argument("--strict", action="store_true",
+                            help="abort the build, leaving every output untouched, at the first "
+                                 "validation error (see data/ustav.diagnostics.json)")
+    arg_parser.add_argument("--profile", type=Path,
+                            help="write a cProfile dump of the run (inspect with python -m pstats)")
+    arg_parser.add_argument("--metrics-json", type=Path,
+                            help="record wall time, CPU time and peak allocation per stage and per "
+                                 "problem, and write per-stage histograms to this file")
+    args = arg_parser.parse_args(argv)
+    
+    workers = args.workers or os.cpu_count() or 1
+    parser = USTAVParser()
+    options = dict(workers=workers, use_mmap=args.mmap, use_cache=not args.no_cache,
+                   output_format=args.format, shards=args.shards, sqlite=args.sqlite,
+                   search_index=args.search_index, roi=args.roi, overrides=not args.no_overrides,
+                   chunks=args.chunks, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+                   related=args.related, related_k=args.related_k, strict=args.strict,
+                   gzip=args.gzip, gzip_level=args.gzip_level, outline=args.outline)
+    if args.metrics_json:
+        METRICS.enable()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        if args.watch:
+            ok = parser.watch(poll_interval=args.poll_interval, debounce=args.debounce,
+                              sentinel=args.sentinel, **options)
+        else:
+            ok = parser.parse(**options)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"[PARSER] ✓ Wrote cProfile dump to {args.profile}")
+        if args.metrics_json:
+            METRICS.report()
+            METRICS.write_json(args.metrics_json)
+            print(f"[PARSER] ✓ Wrote stage metrics to {args.metrics_json}")
+    return ok
+
 # Run parser
 if __name__ == "__main__":
-    parser = USTAVParser()
-    success = parser.parse()
-    exit(0 if success else 1)
+    exit(0 if main() else 1)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+USTAV Related Problems - Top-k similar problems from sparse TF-IDF vectors
+Every problem's text becomes a sublinear TF-IDF vector, L2-normalized and
+stored as a hand-built CSR matrix (indptr / indices / data arrays; no SciPy).
+Cosine similarity of all problem pairs is computed in row batches with one
+gather and one segmented sum per batch, and only the k best neighbours of
+each problem are kept.
+
+The result is data/related.npy, a (problems, k) structured array of
+(neighbor, score) that np.load(..., mmap_mode="r") maps without parsing,
+plus the data/related.json sidecar with the problem IDs its rows and
+neighbour numbers refer to.
+
+Requires NumPy (pip install numpy); the parser only imports this module
+when run with --related.
+
+Usage: python relatedProblems.py ch1_p1 [path/to/related.json]
+"""
+
+import json
+import math
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from searchIndex import problem_text, tokenize
+from ustavWriter import atomic_output
+
+RELATED_VERSION = 1
+
+NEIGHBOR_DTYPE = np.dtype([("neighbor", "<i4"), ("score", "<f4")])
+
+# Upper bound on batch rows x stored nonzeros gathered at once (~64 MB of float32)
+BATCH_CELLS = 16_000_000
+
+
+class CSRMatrix:
+    """Compressed sparse rows: row i is data[indptr[i]:indptr[i + 1]] at columns indices[...]"""
+
+    def __init__(self, indptr, indices, data, columns):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data, dtype=np.float32)
+        self.columns = columns
+
+    @property
+    def rows(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def dense_rows(self, start, stop):
+        """Rows start..stop as a dense (rows, columns) block"""
+        block = np.zeros((stop - start, self.columns), dtype=np.float32)
+        lo, hi = self.indptr[start], self.indptr[stop]
+        row_of = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        block[row_of, self.indices[lo:hi]] = self.data[lo:hi]
+        return block
+
+    def dot_transposed(self, block):
+        """block @ self.T for a dense block: gather each nonzero's column, sum per row"""
+        products = block[:, self.indices] * self.data
+        result = np.zeros((block.shape[0], self.rows), dtype=np.float32)
+        filled = np.flatnonzero(np.diff(self.indptr))
+        if len(filled):
+            result[:, filled] = np.add.reduceat(products, self.indptr[filled], axis=1)
+        return result
+
+
+def tfidf_matrix(documents):
+    """CSR of L2-normalized sublinear TF-IDF rows plus the vocabulary, from token Counters
+
+    Built with plain lists and dicts; NumPy only holds the finished arrays.
+    """
+    document_frequency = Counter()
+    for counts in documents:
+        document_frequency.update(counts.keys())
+    vocabulary = {term: column for column, term in enumerate(sorted(document_frequency))}
+    total = len(documents)
+    # Smoothed IDF: a term in every document still gets weight 1
+    idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    indptr, indices, data = [0], [], []
+    for counts in documents:
+        row = sorted((vocabulary[term], (1 + math.log(tf)) * idf[term]) for term, tf in counts.items())
+        norm = math.sqrt(sum(weight * weight for _, weight in row)) or 1.0
+        indices.extend(column for column, _ in row)
+        data.extend(weight / norm for _, weight in row)
+        indptr.append(len(indices))
+    return CSRMatrix(indptr, indices, data, len(vocabulary)), vocabulary
+
+
+def top_neighbors(matrix, k, batch_rows=None):
+    """(rows, k) NEIGHBOR_DTYPE array of each row's k most cosine-similar other rows
+
+    Rows are unit length, so cosine similarity is the dot product. Neighbours
+    are ordered by descending score, ties by row number. Slots without a
+    neighbour sharing any term with the row are padded with (-1, 0).
+    """
+    rows = matrix.rows
+    k_kept = min(k, max(rows - 1, 0))
+    result = np.zeros((rows, k), dtype=NEIGHBOR_DTYPE)
+    result["neighbor"] = -1
+    if batch_rows is None:
+        batch_rows = max(1, BATCH_CELLS // max(matrix.nnz, matrix.columns, 1))
+
+    for start in range(0, rows, batch_rows):
+        stop = min(start + batch_rows, rows)
+        scores = matrix.dot_transposed(matrix.dense_rows(start, stop))
+        local = np.arange(stop - start)
+        scores[local, start + local] = -np.inf  # a problem is not its own neighbour
+        if k_kept == 0:
+            continue
+        candidates = np.argpartition(-scores, k_kept - 1, axis=1)[:, :k_kept]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.lexsort((candidates, -candidate_scores), axis=1)
+        result["neighbor"][start:stop, :k_kept] = np.take_along_axis(candidates, order, axis=1)
+        result["score"][start:stop, :k_kept] = np.take_along_axis(candidate_scores, order, axis=1)
+    unrelated = result["score"] <= 0
+    result["neighbor"][unrelated] = -1
+    result["score"][unrelated] = 0
+    return result
+
+
+class RelatedProblemsWriter:
+    """Collect problem texts per chapter and write data/related.npy + data/related.json"""
+
+    def __init__(self, matrix_path, k=5):
+        if k <= 0:
+            raise ValueError(f"Invalid neighbour count: k={k}")
+        self.matrix_path = Path(matrix_path)
+        self.sidecar_path = self.matrix_path.with_suffix(".json")
+        self.k = k
+        self.problems = []
+        self.documents = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.save()
+        return False
+
+    def write_chapter(self, chapter):
+        for problem in chapter.get("problems", []):
+            self.problems.append({"id": problem["id"], "chapterId": chapter["id"],
+                                  "title": problem.get("title", "")})
+            self.documents.append(Counter(tokenize(problem_text(problem))))
+
+    def save(self):
+        matrix, vocabulary = tfidf_matrix(self.documents)
+        neighbors = top_neighbors(matrix, self.k)
+        with atomic_output(self.matrix_path, 'wb') as f:
+            np.save(f, neighbors, allow_pickle=False)
+        with atomic_output(self.sidecar_path) as f:
+            json.dump({
+                "version": RELATED_VERSION,
+                "matrix": self.matrix_path.name,
+                "dtype": dict(NEIGHBOR_DTYPE.descr),
+                "k": self.k,
+                "vocabularySize": len(vocabulary),
+                "nonzeros": matrix.nnz,
+                "problems": self.problems
+            }, f, ensure_ascii=False, indent=2)
+
+
+class RelatedProblems:
+    """Query side: the sidecar plus the memory-mapped neighbour matrix"""
+
+    def __init__(self, sidecar, neighbors):
+        self.problems = sidecar["problems"]
+        self.rows = {problem["id"]: row for row, problem in enumerate(self.problems)}
+        self.neighbors = neighbors
+
+    @classmethod
+    def load(cls, sidecar_path):
+        sidecar_path = Path(sidecar_path)
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        neighbors = np.load(sidecar_path.with_name(sidecar["matrix"]), mmap_mode="r")
+        return cls(sidecar, neighbors)
+
+    def related(self, problem_id, limit=None):
+        """Most similar problems first, as sidecar entries with a score"""
+        row = self.neighbors[self.rows[problem_id]][:limit]
+        return [{**self.problems[int(neighbor)], "score": round(float(score), 4)}
+                for neighbor, score in row if neighbor >= 0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    default_path = Path(__file__).parent.parent.parent / "data" / "related.json"
+    related = RelatedProblems.load(sys.argv[2] if len(sys.argv) > 2 else default_path)
+    for hit in related.related(sys.argv[1]):
+        print(f"{hit['score']:6.3f}  {hit['id']:<10} {hit['title']}")
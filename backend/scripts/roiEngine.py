@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+USTAV ROI Engine - Vectorized ROI, payback and sensitivity grids
+The figures parse_business_case extracts for every problem are packed into
+one columnar NumPy table and every metric is computed for all problems in a
+single broadcast, including the full recovery x cost sensitivity grid, so
+the frontend only ever reads precomputed numbers.
+
+Requires NumPy (pip install numpy); the parser only imports this module
+when run with --roi.
+
+Usage: python roiEngine.py [path/to/ustav.json]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Scale factors applied to the projected annual benefit and to all costs
+RECOVERY_MULTIPLIERS = (0.25, 0.5, 0.75, 1.0, 1.25, 1.5)
+COST_MULTIPLIERS = (0.5, 0.75, 1.0, 1.5, 2.0)
+
+# (column, business case block, key) for every extracted input
+COLUMNS = (
+    ("annualSpend", "currentState", "annualSpend"),
+    ("errorRate", "currentState", "estimatedErrorRate"),
+    ("targetRate", "withAI", "targetRate"),
+    ("annualBenefit", "withAI", "annualBenefit"),
+    ("year1NetRecovery", "withAI", "year1NetRecovery"),
+    ("operatingCost", "withAI", "annualOperatingCost"),
+    ("implementationCost", "implementation", "totalCost")
+)
+
+
+def to_json_values(array, decimals):
+    """Round an array into nested lists with NaN and infinities as None"""
+    rounded = np.round(array.astype(float), decimals)
+    finite = np.isfinite(rounded)
+    return np.where(finite, rounded, None).tolist()
+
+
+class BusinessCaseTable:
+    """Columnar table of business-case inputs, one row per problem
+
+    Missing figures are NaN. The annual benefit falls back to the stated
+    year-one net plus operating costs, then to spend x error rate x target
+    rate; operating cost defaults to zero. Each analysis lists the
+    businessCase keys it filled in this way under "assumed".
+    """
+
+    def __init__(self, problem_ids, columns):
+        self.problem_ids = list(problem_ids)
+        self.columns = columns
+
+    @classmethod
+    def from_cases(cls, cases):
+        """Build the table from (problem ID, businessCase dict) pairs"""
+        cases = list(cases)
+        columns = {
+            name: np.array([case.get(block, {}).get(key, np.nan) for _, case in cases], dtype=float)
+            for name, block, key in COLUMNS
+        }
+        return cls([problem_id for problem_id, _ in cases], columns)
+
+    def __len__(self):
+        return len(self.problem_ids)
+
+    def analyze(self, recovery_multipliers=RECOVERY_MULTIPLIERS, cost_multipliers=COST_MULTIPLIERS):
+        """Compute ROI, payback and sensitivity grids for every problem at once
+
+        Returns {problem ID: analysis}; each analysis holds the base-case
+        projection and grids indexed [recovery multiplier][cost multiplier].
+        """
+        c = self.columns
+        operating = np.nan_to_num(c["operatingCost"])
+        implementation = c["implementationCost"]
+        assumed = [
+            [key for key, missing in (("annualBenefit", benefit_missing), ("annualOperatingCost", cost_missing))
+             if missing]
+            for benefit_missing, cost_missing in zip(np.isnan(c["annualBenefit"]), np.isnan(c["operatingCost"]))
+        ]
+        benefit = np.where(np.isnan(c["annualBenefit"]), c["year1NetRecovery"] + operating, c["annualBenefit"])
+        benefit = np.where(np.isnan(benefit), c["annualSpend"] * c["errorRate"] * c["targetRate"], benefit)
+
+        recovery = np.asarray(recovery_multipliers, dtype=float)
+        cost = np.asarray(cost_multipliers, dtype=float)
+
+        # problems x recovery x cost
+        gross = benefit[:, None, None] * recovery[None, :, None]
+        one_time = implementation[:, None, None] * cost[None, None, :]
+        recurring = operating[:, None, None] * cost[None, None, :]
+        invested = one_time + recurring
+        net = gross - invested
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = net / invested
+            monthly = (gross - recurring) / 12
+            payback = np.where(monthly > 0, one_time / monthly, np.inf)
+            break_even = (implementation + operating) / benefit
+
+        base_r = int(np.argmin(np.abs(recovery - 1.0)))
+        base_c = int(np.argmin(np.abs(cost - 1.0)))
+        year_one_net = to_json_values(net[:, base_r, base_c], 0)
+        roi_base = to_json_values(roi[:, base_r, base_c], 4)
+        payback_base = to_json_values(payback[:, base_r, base_c], 2)
+        break_even = to_json_values(break_even, 4)
+        net_grid = to_json_values(net, 0)
+        roi_grid = to_json_values(roi, 4)
+        payback_grid = to_json_values(payback, 2)
+        benefit = to_json_values(benefit, 0)
+
+        return {
+            problem_id: {
+                "projection": {
+                    "annualBenefit": benefit[i],
+                    "yearOneNet": year_one_net[i],
+                    "roi": roi_base[i],
+                    "paybackMonths": payback_base[i],
+                    "breakEvenRecoveryMultiplier": break_even[i]
+                },
+                "sensitivityAnalysis": {
+                    "recoveryMultipliers": list(recovery_multipliers),
+                    "costMultipliers": list(cost_multipliers),
+                    "yearOneNet": net_grid[i],
+                    "roi": roi_grid[i],
+                    "paybackMonths": payback_grid[i]
+                },
+                "assumed": assumed[i]
+            }
+            for i, problem_id in enumerate(self.problem_ids)
+        }
+
+
+def apply_analysis(business_case, analysis):
+    """Return a copy of a businessCase dict with the engine's results merged in"""
+    projection = analysis["projection"]
+    return {
+        **business_case,
+        "withAI": {
+            **business_case.get("withAI", {}),
+            "projectedAnnualBenefit": projection["annualBenefit"],
+            "projectedYearOneNet": projection["yearOneNet"],
+            "roi": projection["roi"]
+        },
+        "payback": {
+            **business_case.get("payback", {}),
+            "projectedMonths": projection["paybackMonths"],
+            "breakEvenRecoveryMultiplier": projection["breakEvenRecoveryMultiplier"]
+        },
+        "sensitivityAnalysis": analysis["sensitivityAnalysis"],
+        "assumed": analysis["assumed"]
+    }
+
+
+if __name__ == "__main__":
+    default_path = Path(__file__).parent.parent.parent / "data" / "ustav.json"
+    with open(sys.argv[1] if len(sys.argv) > 1 else default_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    table = BusinessCaseTable.from_cases(
+        (problem["id"], problem.get("businessCase", {}))
+        for chapter in data.get("chapters", []) for problem in chapter.get("problems", [])
+    )
+    for problem_id, analysis in table.analyze().items():
+        projection = analysis["projection"]
+        roi = f"{projection['roi']:.0%}" if projection["roi"] is not None else "n/a"
+        payback = f"{projection['paybackMonths']} mo" if projection["paybackMonths"] is not None else "n/a"
+        print(f"{problem_id:<9} ROI {roi:>8}  payback {payback}")
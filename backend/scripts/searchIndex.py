@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+USTAV Search Index - Inverted index with BM25 scoring
+Built from the parser's tree in the same run. Each term maps to a posting
+list of (document, term frequency) pairs with a precomputed IDF, so a query
+only touches the postings of its own terms instead of scanning every
+document's text.
+
+Usage: python searchIndex.py "freight invoice dispute" [path/to/index.json]
+"""
+
+import json
+import math
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from ustavWriter import atomic_output
+
+INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have if in into is it its of on or
+that the their them then there these they this to was were will with you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercased word tokens, dropping stopwords and single characters"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def problem_text(problem):
+    """Searchable text of a parsed problem: title, all sections and failure modes"""
+    parts = [problem.get("title", "")]
+    parts.extend(problem.get("sections", {}).values())
+    for failure_mode in problem.get("failureModes", []):
+        parts.extend([failure_mode.get("name", ""), failure_mode.get("symptom", ""),
+                      failure_mode.get("rootCause", "")])
+    return "\n".join(parts)
+
+
+class SearchIndexWriter:
+    """Accumulate term postings per document and write the BM25 index
+
+    Documents are chapters (title + intro) and problems (title, all eight
+    sections and failure modes), identified by the parser's chapter and
+    problem IDs. Postings are stored as flat [docDelta, tf, docDelta, tf, ...]
+    lists with delta-encoded document numbers to keep the file small.
+    """
+
+    def __init__(self, index_path, k1=1.2, b=0.75):
+        self.index_path = Path(index_path)
+        self.k1 = k1
+        self.b = b
+        self.docs = []
+        self.doc_lengths = []
+        self.postings = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            with atomic_output(self.index_path) as f:
+                json.dump(self.build(), f, ensure_ascii=False, separators=(',', ':'))
+        return False
+
+    def add_document(self, doc, text):
+        """Index one document; doc is the metadata returned with search hits"""
+        doc_num = len(self.docs)
+        counts = Counter(tokenize(text))
+        self.docs.append(doc)
+        self.doc_lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, []).append((doc_num, tf))
+
+    def write_chapter(self, chapter):
+        """Index a parsed chapter and its problems"""
+        self.add_document(
+            {"id": chapter["id"], "type": "chapter", "title": chapter.get("title", "")},
+            f"{chapter.get('title', '')}\n{chapter.get('intro', '')}"
+        )
+        for problem in chapter.get("problems", []):
+            self.add_document(
+                {"id": problem["id"], "type": "problem", "chapterId": chapter["id"],
+                 "title": problem.get("title", "")},
+                problem_text(problem)
+            )
+
+    def build(self):
+        """Return the serializable index"""
+        total_docs = len(self.docs)
+        terms = {}
+        for term in sorted(self.postings):
+            postings = self.postings[term]
+            # BM25 IDF with the +1 smoothing that keeps common terms non-negative
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            flat, previous = [], 0
+            for doc_num, tf in postings:
+                flat.extend((doc_num - previous, tf))
+                previous = doc_num
+            terms[term] = [round(idf, 6), flat]
+
+        return {
+            "version": INDEX_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "avgDocLength": sum(self.doc_lengths) / total_docs if total_docs else 0,
+            "docs": self.docs,
+            "docLengths": self.doc_lengths,
+            "terms": terms
+        }
+
+
+class SearchIndex:
+    """Query side of the BM25 index"""
+
+    def __init__(self, data):
+        self.docs = data["docs"]
+        self.terms = data["terms"]
+        k1, b, avgdl = data["k1"], data["b"], data["avgDocLength"] or 1
+        self.k1 = k1
+        # Length normalization depends only on the document, so do it once
+        self.norms = [k1 * (1 - b + b * length / avgdl) for length in data["docLengths"]]
+
+    @classmethod
+    def load(cls, index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def search(self, query, limit=10):
+        """Rank documents for a keyword query; cost grows with the query's postings"""
+        scores = {}
+        for term in set(tokenize(query)):
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            idf, flat = entry
+            doc_num = 0
+            for i in range(0, len(flat), 2):
+                doc_num += flat[i]
+                tf = flat[i + 1]
+                scores[doc_num] = scores.get(doc_num, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.norms[doc_num])
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{**self.docs[doc_num], "score": round(score, 4)} for doc_num, score in ranked]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    default_path = Path(__file__).parent.parent.parent / "data" / "searchIndex.bm25.json"
+    index = SearchIndex.load(sys.argv[2] if len(sys.argv) > 2 else default_path)
+    for hit in index.search(sys.argv[1]):
+        print(f"{hit['score']:8.3f}  {hit['id']:<10} {hit['title']}")
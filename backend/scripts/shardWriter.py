@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+USTAV Shard Writer - Per-chapter / per-problem output with a manifest
+Consumers read data/ustav/manifest.json and load only the shard a request
+touches instead of parsing the whole of data/ustav.json.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from ustavWriter import atomic_output, run_commit_hooks
+
+GRANULARITIES = ("chapter", "problem")
+
+
+class ShardWriter:
+    """Write one JSON file per chapter (or per problem) plus manifest.json
+
+    Shards are written into a temporary sibling directory as chapters
+    arrive and renamed into place only when the build finishes cleanly; a
+    failed build removes them and leaves the previous shards and manifest
+    untouched. The manifest, which lists every shard with its SHA-256
+    content hash and the chapter, problem and prompt IDs it contains, is
+    replaced last so it only ever points at finished shards. Shards left
+    over from a previous build are removed afterwards.
+    """
+
+    def __init__(self, shard_dir, granularity="chapter", metadata=None):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported shard granularity: {granularity}")
+        self.shard_dir = Path(shard_dir)
+        self.tmp_dir = self.shard_dir.with_name(f".{self.shard_dir.name}.{os.getpid()}.tmp")
+        self.granularity = granularity
+        self.metadata = dict(metadata or {})
+        self.chapters = []
+        self.prompts = {}
+        self.files = set()
+        self.totals = {"totalChapters": 0, "totalProblems": 0, "totalPrompts": 0}
+
+    def __enter__(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        self.tmp_dir.mkdir(parents=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._publish_shards()
+                self._write_manifest()
+                self._remove_stale_shards()
+        finally:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return False
+
+    def write_shard(self, name, value):
+        """Write one shard into the temporary directory; returns its manifest entry"""
+        data = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(self.tmp_dir / name, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.files.add(name)
+        return {"shard": name, "hash": hashlib.sha256(data).hexdigest(), "bytes": len(data)}
+
+    def write_chapter(self, chapter):
+        """Shard one fully parsed chapter"""
+        problems = chapter.get("problems", [])
+        header = {key: value for key, value in chapter.items() if key != "problems"}
+
+        problem_entries = []
+        for problem in problems:
+            entry = {
+                "id": problem["id"],
+                "number": problem.get("number"),
+                "title": problem.get("title"),
+                "prompts": [prompt["id"] for prompt in problem.get("prompts", [])],
+                "failureModes": [fm["id"] for fm in problem.get("failureModes", [])]
+            }
+            if self.granularity == "problem":
+                entry.update(self.write_shard(f"{problem['id']}.json", problem))
+            problem_entries.append(entry)
+
+        if self.granularity == "problem":
+            shard_info = self.write_shard(f"{chapter['id']}.json", {
+                **header,
+                "problemIds": [problem["id"] for problem in problems]
+            })
+        else:
+            shard_info = self.write_shard(f"{chapter['id']}.json", chapter)
+
+        for entry in problem_entries:
+            shard = entry.get("shard", shard_info["shard"])
+            for prompt_id in entry["prompts"]:
+                self.prompts[prompt_id] = shard
+
+        self.chapters.append({
+            "id": chapter["id"],
+            "number": chapter.get("number"),
+            "title": chapter.get("title"),
+            **shard_info,
+            "problems": problem_entries
+        })
+        self.totals["totalChapters"] += 1
+        self.totals["totalProblems"] += len(problems)
+        self.totals["totalPrompts"] += sum(len(entry["prompts"]) for entry in problem_entries)
+
+    def _publish_shards(self):
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        for name in sorted(self.files):
+            os.replace(self.tmp_dir / name, self.shard_dir / name)
+            run_commit_hooks(self.shard_dir / name)
+
+    def _write_manifest(self):
+        manifest = {
+            "metadata": {**self.metadata, **self.totals},
+            "granularity": self.granularity,
+            "chapters": self.chapters,
+            "prompts": self.prompts
+        }
+        with atomic_output(self.shard_dir / "manifest.json") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    def _remove_stale_shards(self):
+        for path in self.shard_dir.glob("*.json"):
+            if path.name != "manifest.json" and path.name not in self.files:
+                path.unlink()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+USTAV SQLite Writer - Normalized database with an FTS5 full-text index
+Prompt-by-ID lookups become primary-key reads and keyword queries hit the
+FTS5 index, without loading the parsed corpus into memory.
+
+Example queries:
+    SELECT prompt_code FROM prompts WHERE id = 'ch1_p1_pr1';
+    SELECT ref_id, kind, snippet(search, 4, '[', ']', '...', 12)
+      FROM search WHERE search MATCH 'freight AND dispute' ORDER BY rank;
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE chapters (
+    id TEXT PRIMARY KEY,
+    number INTEGER NOT NULL,
+    title TEXT,
+    intro TEXT,
+    extraction_date TEXT
+);
+CREATE TABLE problems (
+    id TEXT PRIMARY KEY,
+    chapter_id TEXT NOT NULL REFERENCES chapters(id),
+    number INTEGER NOT NULL,
+    title TEXT,
+    severity TEXT,
+    business_case TEXT
+);
+CREATE TABLE sections (
+    problem_id TEXT NOT NULL REFERENCES problems(id),
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    body TEXT,
+    PRIMARY KEY (problem_id, name)
+);
+CREATE TABLE prompts (
+    id TEXT PRIMARY KEY,
+    problem_id TEXT NOT NULL REFERENCES problems(id),
+    position INTEGER NOT NULL,
+    version TEXT,
+    title TEXT,
+    role TEXT,
+    severity TEXT,
+    prompt_code TEXT,
+    platform_compatibility TEXT,
+    mock_output TEXT
+);
+CREATE TABLE input_fields (
+    prompt_id TEXT NOT NULL REFERENCES prompts(id),
+    input_key TEXT NOT NULL,
+    name TEXT,
+    system_source TEXT,
+    required_format TEXT,
+    required_columns TEXT,
+    PRIMARY KEY (prompt_id, input_key)
+);
+CREATE TABLE deliverables (
+    prompt_id TEXT NOT NULL REFERENCES prompts(id),
+    position INTEGER NOT NULL,
+    deliverable INTEGER,
+    name TEXT,
+    priority TEXT,
+    format TEXT,
+    PRIMARY KEY (prompt_id, position)
+);
+CREATE TABLE failure_modes (
+    id TEXT PRIMARY KEY,
+    problem_id TEXT NOT NULL REFERENCES problems(id),
+    position INTEGER NOT NULL,
+    name TEXT,
+    symptom TEXT,
+    root_cause TEXT,
+    recovery TEXT
+);
+CREATE INDEX problems_by_chapter ON problems(chapter_id, number);
+CREATE INDEX prompts_by_problem ON prompts(problem_id, position);
+CREATE INDEX failure_modes_by_problem ON failure_modes(problem_id, position);
+CREATE VIRTUAL TABLE search USING fts5(
+    ref_id UNINDEXED,
+    kind UNINDEXED,
+    problem_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def to_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class SQLiteWriter:
+    """Write parsed chapters into a fresh SQLite database
+
+    The whole build runs in one transaction against a temp file that is
+    renamed over the target on success, so readers keep the previous
+    database until the new one is complete.
+    """
+
+    def __init__(self, db_path, metadata=None):
+        self.db_path = Path(db_path)
+        self.metadata = dict(metadata or {})
+        self.tmp_path = self.db_path.with_name(f".{self.db_path.name}.{os.getpid()}.tmp")
+        self.conn = None
+        self.totals = {"totalChapters": 0, "totalProblems": 0, "totalPrompts": 0}
+
+    def __enter__(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self.conn = sqlite3.connect(self.tmp_path, isolation_level=None)
+        # The file is discarded on failure, so skip the journal entirely
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.executemany(
+                    "INSERT INTO metadata (key, value) VALUES (?, ?)",
+                    [(key, to_json(value)) for key, value in {**self.metadata, **self.totals}.items()]
+                )
+                self.conn.execute("COMMIT")
+                self.conn.execute("INSERT INTO search(search) VALUES ('optimize')")
+                self.conn.close()
+                os.replace(self.tmp_path, self.db_path)
+        finally:
+            self.conn.close()
+            if self.tmp_path.exists():
+                self.tmp_path.unlink()
+        return False
+
+    def write_chapter(self, chapter):
+        """Insert one parsed chapter and everything below it"""
+        conn = self.conn
+        conn.execute(
+            "INSERT INTO chapters (id, number, title, intro, extraction_date) VALUES (?, ?, ?, ?, ?)",
+            (chapter["id"], chapter.get("number"), chapter.get("title"), chapter.get("intro"),
+             chapter.get("metadata", {}).get("extractionDate"))
+        )
+
+        problems = chapter.get("problems", [])
+        sections, prompts, fields, deliverables, failure_modes, search = [], [], [], [], [], []
+
+        for problem in problems:
+            problem_id = problem["id"]
+            conn.execute(
+                "INSERT INTO problems (id, chapter_id, number, title, severity, business_case) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (problem_id, chapter["id"], problem.get("number"), problem.get("title"),
+                 problem.get("metadata", {}).get("severity"), to_json(problem.get("businessCase", {})))
+            )
+
+            for position, (name, body) in enumerate(problem.get("sections", {}).items(), start=1):
+                sections.append((problem_id, name, position, body))
+                search.append((f"{problem_id}:{name}", "section", problem_id, problem.get("title"), body))
+
+            for position, prompt in enumerate(problem.get("prompts", []), start=1):
+                prompt_id = prompt["id"]
+                prompts.append((
+                    prompt_id, problem_id, position, prompt.get("version"), prompt.get("title"),
+                    prompt.get("role"), prompt.get("severity"), prompt.get("promptCode"),
+                    to_json(prompt.get("platformCompatibility", [])), to_json(prompt.get("mockOutput"))
+                ))
+                search.append((prompt_id, "prompt", problem_id, prompt.get("title"), prompt.get("promptCode")))
+
+                for input_key, field in prompt.get("inputSchema", {}).items():
+                    fields.append((
+                        prompt_id, input_key, field.get("name"), field.get("systemSource"),
+                        field.get("requiredFormat"), to_json(field.get("requiredColumns", []))
+                    ))
+                for req_position, requirement in enumerate(prompt.get("outputRequirements", []), start=1):
+                    deliverables.append((
+                        prompt_id, req_position, requirement.get("deliverable"), requirement.get("name"),
+                        requirement.get("priority"), requirement.get("format")
+                    ))
+
+            for position, failure_mode in enumerate(problem.get("failureModes", []), start=1):
+                failure_modes.append((
+                    failure_mode["id"], problem_id, position, failure_mode.get("name"),
+                    failure_mode.get("symptom"), failure_mode.get("rootCause"),
+                    to_json(failure_mode.get("recovery", {}))
+                ))
+
+        conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?)", sections)
+        conn.executemany("INSERT INTO prompts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", prompts)
+        conn.executemany("INSERT INTO input_fields VALUES (?, ?, ?, ?, ?, ?)", fields)
+        conn.executemany("INSERT INTO deliverables VALUES (?, ?, ?, ?, ?, ?)", deliverables)
+        conn.executemany("INSERT INTO failure_modes VALUES (?, ?, ?, ?, ?, ?, ?)", failure_modes)
+        conn.executemany(
+            "INSERT INTO search (ref_id, kind, problem_id, title, body) VALUES (?, ?, ?, ?, ?)", search
+        )
+
+        self.totals["totalChapters"] += 1
+        self.totals["totalProblems"] += len(problems)
+        self.totals["totalPrompts"] += len(prompts)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+USTAV Stage Metrics - Wall time, CPU time and peak allocation per build stage
+METRICS.stage(name, label) is a context manager and @timed() a decorator;
+each finished stage records one sample (wall seconds, CPU seconds, peak
+bytes allocated above the level at entry, via tracemalloc). Samples are
+labelled with the chapter or problem ID where there is one, so the summary
+names the slowest problems as well as the slowest stages.
+
+Disabled (the default), stage() returns a shared no-op context and timed()
+functions pass straight through after one attribute check, so the hooks
+can stay in the parser permanently.
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from ustavWriter import atomic_output
+
+METRICS_VERSION = 1
+
+# Upper bounds of the wall-time histogram buckets, in milliseconds; the
+# last bucket counts everything slower
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_NULL_STAGE = nullcontext()
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "label", "wall", "cpu", "base", "peak")
+
+    def __init__(self, metrics, name, label):
+        self.metrics = metrics
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        stack = self.metrics.stack
+        if self.metrics.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing stage keeps its peak so far; this one starts fresh
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base = self.peak = current
+        stack.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = self.metrics.stack
+        stack.pop()
+        peak = 0
+        if self.metrics.trace_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak = self.peak - self.base
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        self.metrics.samples.append((self.name, self.label, wall, cpu, peak))
+        return False
+
+
+class Metrics:
+    """Sample store for one process; worker processes drain() theirs back to the parent"""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.samples = []
+        self.stack = []
+
+    def enable(self, trace_memory=True):
+        self.enabled = True
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.trace_memory = tracemalloc.is_tracing()
+
+    def disable(self):
+        if self.trace_memory:
+            tracemalloc.stop()
+        self.enabled = self.trace_memory = False
+
+    def stage(self, name, label=None):
+        """Context manager timing one stage; a no-op while disabled"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, label)
+
+    def reset(self):
+        """Forget samples and open stages, e.g. those a forked worker inherits"""
+        self.samples = []
+        self.stack = []
+
+    def drain(self):
+        """Hand over and forget the samples recorded so far"""
+        samples, self.samples = self.samples, []
+        return samples
+
+    def merge(self, samples):
+        self.samples.extend(samples)
+
+    def summary(self, slowest=5):
+        """Per-stage counts, totals, percentiles, histogram and slowest labels"""
+        grouped = {}
+        for name, label, wall, cpu, peak in self.samples:
+            grouped.setdefault(name, []).append((wall * 1000, cpu * 1000, peak, label))
+
+        stages = {}
+        for name, samples in grouped.items():
+            walls = sorted(sample[0] for sample in samples)
+            peaks = sorted(sample[2] for sample in samples)
+            counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            for wall in walls:
+                counts[next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if wall <= bound),
+                            len(HISTOGRAM_BOUNDS_MS))] += 1
+            stages[name] = {
+                "count": len(samples),
+                "wallMs": {
+                    "total": round(sum(walls), 3),
+                    "mean": round(sum(walls) / len(walls), 3),
+                    "p50": round(percentile(walls, 0.5), 3),
+                    "p95": round(percentile(walls, 0.95), 3),
+                    "max": round(walls[-1], 3)
+                },
+                "cpuMs": {"total": round(sum(sample[1] for sample in samples), 3)},
+                "peakBytes": {"p50": percentile(peaks, 0.5), "max": peaks[-1]},
+                "histogram": {"boundsMs": list(HISTOGRAM_BOUNDS_MS), "counts": counts},
+                "slowest": [
+                    {"label": label, "wallMs": round(wall, 3), "peakBytes": peak}
+                    for wall, _, peak, label in sorted(
+                        (sample for sample in samples if sample[3] is not None),
+                        key=lambda sample: sample[0], reverse=True)[:slowest]
+                ]
+            }
+        return {
+            "version": METRICS_VERSION,
+            "tracedMemory": self.trace_memory,
+            "stages": dict(sorted(stages.items(), key=lambda item: item[1]["wallMs"]["total"], reverse=True))
+        }
+
+    def write_json(self, path):
+        with atomic_output(path) as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+    def report(self, limit=12):
+        """Print the stages with the most total wall time"""
+        print(f"\n[METRICS] {'stage':<32} {'count':>6} {'total ms':>10} {'p95 ms':>9} {'peak KiB':>9}")
+        for name, stage in list(self.summary()["stages"].items())[:limit]:
+            print(f"[METRICS] {name:<32} {stage['count']:>6} {stage['wallMs']['total']:>10.1f} "
+                  f"{stage['wallMs']['p95']:>9.2f} {stage['peakBytes']['max'] / 1024:>9.0f}")
+
+
+METRICS = Metrics()
+
+
+def timed(name=None):
+    """Decorator recording every call as a stage (default name: the function's)"""
+    def decorate(function):
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            with _Stage(METRICS, stage_name, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+USTAV Record Model - Lazy views over the indexed book
+Chapter, Problem, Section, Prompt and FailureMode hold only offsets from the
+parser's index. Text is decoded and sub-fields are parsed the first time an
+attribute is read and memoized from then on, so a caller that only needs
+titles or prompt IDs never pays for the rest. to_dict() produces exactly the
+records data/ustav.json has always contained.
+"""
+
+import re
+
+RECOVERY_TIMEFRAMES = [
+    ("immediate", "Immediate"),
+    ("shortTerm", "Short-Term"),
+    ("longTerm", "Long-Term")
+]
+
+SECTION_NAMES = [
+    "operationalReality",
+    "whyTraditionalFails",
+    "managerDecisionPoint",
+    "aiWorkflow",
+    "executionPrompt",
+    "businessCase",
+    "industryContext",
+    "failureModes"
+]
+
+# "**Version:** 1.2" style lines in the context before a prompt
+PROMPT_FIELD_PATTERNS = {
+    label: re.compile(rf"\*\*{label}:\*\*\s*([^\n]+)") for label in ("Version", "Role", "Severity")
+}
+
+_UNSET = object()
+
+
+def memoized(method):
+    """Read-only property computed once and kept in the slot "_<name>" """
+    slot = "_" + method.__name__
+
+    def getter(self):
+        value = getattr(self, slot)
+        if value is _UNSET:
+            value = method(self)
+            setattr(self, slot, value)
+        return value
+
+    getter.__doc__ = method.__doc__
+    return property(getter)
+
+
+class _Record:
+    """Base for the lazy records; every "_"-prefixed slot starts out unset"""
+
+    __slots__ = ("parser",)
+
+    def __init__(self, parser):
+        self.parser = parser
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot.startswith("_"):
+                    setattr(self, slot, _UNSET)
+
+
+class Section(_Record):
+    """One of a problem's eight numbered sections"""
+
+    __slots__ = ("number", "name", "span", "_text")
+
+    def __init__(self, parser, number, span):
+        super().__init__(parser)
+        self.number = number
+        self.name = SECTION_NAMES[number - 1]
+        self.span = span
+
+    @memoized
+    def text(self):
+        """Stripped section body; empty when the book has no such section"""
+        if self.span is None:
+            return ""
+        return self.parser.text(self.span["start"], self.span["end"]).strip()
+
+
+class Prompt(_Record):
+    """A BEGIN/END PROMPT block inside Section 5"""
+
+    __slots__ = ("id", "begin", "code_start", "code_end", "context_start",
+                 "_code", "_context", "_input_schema")
+
+    def __init__(self, parser, prompt_id, markers, problem_start):
+        super().__init__(parser)
+        begin, code_start, code_end, _ = markers
+        self.id = prompt_id
+        self.begin = begin
+        self.code_start = code_start
+        self.code_end = code_end
+        # Version, role and platform lines sit in the 500 characters before BEGIN
+        self.context_start = parser.offset_before(begin, 500, floor=problem_start)
+
+    @memoized
+    def code(self):
+        """Full prompt text between the markers"""
+        return self.parser.text(self.code_start, self.code_end).strip()
+
+    @memoized
+    def context(self):
+        return self.parser.text(self.context_start, self.begin)
+
+    @memoized
+    def input_schema(self):
+        return self.parser.parse_input_schema(self.code)
+
+    def context_field(self, label, default):
+        match = PROMPT_FIELD_PATTERNS[label].search(self.context)
+        return match.group(1).strip() if match else default
+
+    def to_dict(self):
+        parser = self.parser
+        return {
+            "id": self.id,
+            "version": self.context_field("Version", "1.0.v1"),
+            "title": parser.extract_prompt_title(self.code),
+            "role": self.context_field("Role", "AI Assistant"),
+            "severity": self.context_field("Severity", "UNKNOWN"),
+            "promptCode": self.code,
+            "inputSchema": self.input_schema,
+            "interpolationPlan": parser.build_interpolation_plan(self.code, self.input_schema),
+            "outputRequirements": parser.parse_output_requirements(self.code),
+            "mockOutput": parser.generate_mock_output(self.id),
+            "platformCompatibility": parser.extract_platform_compatibility(self.context)
+        }
+
+
+class FailureMode(_Record):
+    """A FAILURE MODE block inside Section 8"""
+
+    __slots__ = ("id", "marker_start", "marker_end", "block_end", "_header", "_content", "_scan")
+
+    def __init__(self, parser, failure_id, marker_start, marker_end, block_end):
+        super().__init__(parser)
+        self.id = failure_id
+        self.marker_start = marker_start
+        self.marker_end = marker_end
+        self.block_end = block_end
+
+    @memoized
+    def header(self):
+        """(title, content start): the title is inline ("FAILURE MODE #3: ...") or on the next line"""
+        marker = self.parser.text(self.marker_start, self.marker_end)
+        if ":" in marker:
+            return marker.split(":", 1)[1].strip(), self.marker_end
+        title, content_start = self.parser.line_after(self.marker_end)
+        return title.strip(), content_start
+
+    @property
+    def name(self):
+        return self.header[0]
+
+    @memoized
+    def content(self):
+        return self.parser.text(self.header[1], self.block_end).strip()
+
+    @memoized
+    def scan(self):
+        """(symptom, root cause, [immediate, short-term, long-term])"""
+        return self.parser.scan_failure_content(self.content)
+
+    def to_dict(self):
+        symptom, root_cause, recovery = self.scan
+        return {
+            "id": self.id,
+            "name": self.name,
+            "symptom": symptom,
+            "rootCause": root_cause,
+            "recovery": {
+                key: {"timeframe": timeframe, "action": action, "details": action}
+                for (key, timeframe), action in zip(RECOVERY_TIMEFRAMES, recovery)
+            }
+        }
+
+
+class Problem(_Record):
+    """A PROBLEM block: title, eight sections, prompts and failure modes"""
+
+    __slots__ = ("entry", "chapter", "number", "_title", "_sections", "_prompts", "_failure_modes")
+
+    def __init__(self, parser, entry):
+        super().__init__(parser)
+        self.entry = entry
+        self.chapter = entry["chapter"]
+        self.number = entry["number"]
+
+    @property
+    def id(self):
+        return f"ch{self.chapter}_p{self.number}"
+
+    @memoized
+    def title(self):
+        title, _ = self.parser.line_after(self.entry["headerEnd"])
+        return title or f"Problem {self.chapter}.{self.number}"
+
+    @memoized
+    def sections(self):
+        """Section name -> Section, in book order"""
+        spans = self.entry["sections"]
+        return {name: Section(self.parser, number, spans.get(number))
+                for number, name in enumerate(SECTION_NAMES, start=1)}
+
+    @memoized
+    def prompts(self):
+        return [Prompt(self.parser, f"{self.id}_pr{position}", markers, self.entry["start"])
+                for position, markers in enumerate(self.entry["prompts"], start=1)]
+
+    @memoized
+    def failure_modes(self):
+        section = self.entry["sections"].get(8)
+        if section is None:
+            return []
+        # FAILURE MODE markers inside Section 8 bound each block
+        markers = [m for m in self.entry["failureModes"] if section["start"] <= m[0] < section["end"]]
+        bounds = [m[0] for m in markers[1:]] + [section["end"]]
+        return [
+            FailureMode(self.parser, f"fm_{self.id}_{str(position).zfill(2)}", start, end, block_end)
+            for position, ((start, end), block_end) in enumerate(zip(markers, bounds), start=1)
+        ]
+
+    def to_dict(self):
+        parser = self.parser
+        sections = {name: section.text for name, section in self.sections.items()}
+        prompts = [prompt.to_dict() for prompt in self.prompts]
+        failure_modes = [failure_mode.to_dict() for failure_mode in self.failure_modes]
+        return {
+            "id": self.id,
+            "number": self.number,
+            "title": self.title,
+            "sections": sections,
+            "prompts": prompts,
+            "businessCase": parser.parse_business_case(sections["businessCase"], f"{self.chapter}.{self.number}"),
+            "failureModes": failure_modes,
+            "metadata": {
+                "severity": parser.extract_severity(sections["executionPrompt"]),
+                "promptCount": len(prompts),
+                "failureModeCount": len(failure_modes)
+            }
+        }
+
+
+class Chapter(_Record):
+    """A CHAPTER block: title line, intro text and its problems"""
+
+    __slots__ = ("entry", "number", "_heading", "_intro", "_problems")
+
+    def __init__(self, parser, entry):
+        super().__init__(parser)
+        self.entry = entry
+        self.number = entry["number"]
+
+    @property
+    def id(self):
+        return f"ch{self.number}"
+
+    @memoized
+    def heading(self):
+        """(title, title line end): the title sits on the line after the CHAPTER marker"""
+        return self.parser.line_after(self.entry["headerEnd"])
+
+    @property
+    def title(self):
+        return self.heading[0]
+
+    @memoized
+    def intro(self):
+        """Text from the title line to the first problem"""
+        problems = self.entry["problems"]
+        intro_end = problems[0]["start"] if problems else self.entry["end"]
+        return self.parser.text(self.heading[1], intro_end).strip()
+
+    @memoized
+    def problems(self):
+        return [Problem(self.parser, entry) for entry in self.entry["problems"]]
+
+    def to_dict(self, problems=None):
+        """Serialize the chapter; problems may be passed in already serialized"""
+        if problems is None:
+            problems = [problem.to_dict() for problem in self.problems]
+        return {
+            "id": self.id,
+            "number": self.number,
+            "title": self.title,
+            "intro": self.intro,
+            "problems": problems,
+            "metadata": {
+                "extractionDate": self.parser.extracted_at,
+                "totalProblems": len(problems),
+                "totalPrompts": sum(len(p.get('prompts', [])) for p in problems),
+                "totalFailureModes": sum(len(p.get('failureModes', [])) for p in problems)
+            }
+        }
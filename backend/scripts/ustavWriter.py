@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+USTAV Output Writers - Streaming JSON / NDJSON serialization
+Chapters are written as soon as they are parsed and the finished file is
+atomically renamed into place, so readers never see a half-written build.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+FORMATS = ("pretty", "compact", "ndjson", "dedup")
+
+# Strings at least this long are split into paragraphs and stored as blobs
+BLOB_TEXT_MIN_LENGTH = 128
+# Containers of plain values at least this large (as compact JSON) become blobs
+BLOB_OBJECT_MIN_BYTES = 48
+BLOB_PARAGRAPH_SEPARATOR = "\n\n"
+
+# Called with each path atomic_output has just put in place, e.g. by
+# ArtifactCompressor to start compressing a finished artifact right away
+COMMIT_HOOKS = []
+
+
+@contextmanager
+def atomic_output(path, mode='w'):
+    """Open a temp file next to path and os.replace it into place on success"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    run_commit_hooks(path)
+
+
+def run_commit_hooks(path):
+    """Announce a file that has just been put in place at path"""
+    for hook in list(COMMIT_HOOKS):
+        hook(path)
+
+
+def dump_compact(value):
+    """Serialize without whitespace between tokens"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class BlobStore:
+    """Content-addressed table of repeated text and sub-objects
+
+    Long strings are replaced by {"$text": [key, ...]}, the keys of their
+    paragraphs in order (joined back with a blank line); a prompt's
+    promptCode and the executionPrompt section that contains it then share
+    every paragraph. Objects and arrays holding only plain values, such as
+    platformCompatibility or a mock output's payload, are replaced by
+    {"$blob": key}. Keys are truncated SHA-256 hashes of the compact JSON
+    of the stored value, so identical content is stored exactly once.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+
+    def put(self, value):
+        """Store a value under its content hash; returns the key"""
+        data = dump_compact(value)
+        key = hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+        existing = self.blobs.setdefault(key, value)
+        if existing is not value and dump_compact(existing) != data:
+            raise ValueError(f"Blob key collision on {key}")
+        return key
+
+    def encode(self, value):
+        """Return value with large strings and plain containers swapped for references"""
+        if isinstance(value, str):
+            if len(value) < BLOB_TEXT_MIN_LENGTH:
+                return value
+            return {"$text": [self.put(part) for part in value.split(BLOB_PARAGRAPH_SEPARATOR)]}
+        if isinstance(value, dict):
+            encoded = {key: self.encode(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            encoded = [self.encode(item) for item in value]
+        else:
+            return value
+
+        # Only leaves are shared; anything already holding a reference stays inline
+        items = encoded.values() if isinstance(encoded, dict) else encoded
+        if any(isinstance(item, (dict, list)) for item in items):
+            return encoded
+        if len(dump_compact(encoded).encode('utf-8')) < BLOB_OBJECT_MIN_BYTES:
+            return encoded
+        return {"$blob": self.put(encoded)}
+
+
+class StreamingWriter:
+    """Write parser output chapter by chapter
+
+    compact: one minified JSON document, {"chapters": [...], "metadata": {...}};
+             metadata comes last because its totals are only known at the end.
+    ndjson:  one record per line - a chapter header, then one line per problem,
+             then a trailing metadata record with the accumulated totals.
+    dedup:   like compact, but repeated text and sub-objects are replaced by
+             references into a "blobs" table written before the metadata
+             (see BlobStore; backend/rag/blobReader.js resolves them).
+    """
+
+    def __init__(self, output_path, output_format="compact", metadata=None):
+        if output_format not in ("compact", "ndjson", "dedup"):
+            raise ValueError(f"Unsupported streaming format: {output_format}")
+        self.output_path = Path(output_path)
+        self.output_format = output_format
+        self.metadata = dict(metadata or {})
+        self.totals = {"totalChapters": 0, "totalProblems": 0, "totalPrompts": 0}
+        self.blob_store = BlobStore() if output_format == "dedup" else None
+        self._context = None
+        self._file = None
+
+    def __enter__(self):
+        self._context = atomic_output(self.output_path)
+        self._file = self._context.__enter__()
+        if self.output_format != "ndjson":
+            self._file.write('{"chapters":[')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._write_trailer()
+        return self._context.__exit__(exc_type, exc, tb)
+
+    def write_chapter(self, chapter):
+        """Append one fully parsed chapter to the stream"""
+        problems = chapter.get("problems", [])
+
+        if self.output_format != "ndjson":
+            if self.totals["totalChapters"]:
+                self._file.write(',')
+            if self.blob_store is not None:
+                self._file.write(dump_compact(self.blob_store.encode(chapter)))
+            else:
+                self._file.write(dump_compact(chapter))
+        else:
+            header = {key: value for key, value in chapter.items() if key != "problems"}
+            self._file.write(dump_compact({"type": "chapter", **header}) + "\n")
+            for problem in problems:
+                record = {"type": "problem", "chapterId": chapter.get("id"), **problem}
+                self._file.write(dump_compact(record) + "\n")
+
+        self.totals["totalChapters"] += 1
+        self.totals["totalProblems"] += len(problems)
+        self.totals["totalPrompts"] += sum(len(p.get('prompts', [])) for p in problems)
+
+    def _write_trailer(self):
+        metadata = {**self.metadata, **self.totals}
+        if self.output_format == "compact":
+            self._file.write('],"metadata":' + dump_compact(metadata) + '}')
+        elif self.output_format == "dedup":
+            self._file.write('],"blobs":' + dump_compact(self.blob_store.blobs))
+            self._file.write(',"metadata":' + dump_compact(metadata) + '}')
+        else:
+            self._file.write(dump_compact({"type": "metadata", **metadata}) + "\n")
@@ -3,12 +3,16 @@
 /**
  * USTAV JSON Validator
  * Validates the structure and completeness of the ustav.json file
+ * parseUSTAV.py already validates every chapter during the parse and writes
+ * data/ustav.diagnostics.json (fail fast with --strict); this script is for
+ * checking a ustav.json that was produced or edited some other way.
  * 
  * Usage: node validateUSTAV.js [path/to/ustav.json]
  */
 
 const fs = require('fs');
 const path = require('path');
+const { resolveBlobs } = require('../rag/blobReader');
 
 // Default path
 const USTAV_PATH = process.argv[2] || path.join(__dirname, '../../data/ustav.json');
@@ -69,7 +73,7 @@ class USTAVValidator {
       const rawData = fs.readFileSync(this.filePath, 'utf-8');
       this.stats.fileSize = (rawData.length / 1024).toFixed(2);
       
-      this.data = JSON.parse(rawData);
+      this.data = resolveBlobs(JSON.parse(rawData));
       console.log(`[VALIDATOR] ✓ JSON parsed successfully (${this.stats.fileSize} KB)`);
       return true;
     } catch (error) {
@@ -7,6 +7,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { resolveBlobs } = require('../rag/blobReader');
 
 function validateStructure(filePath) {
   console.log('\n' + '='.repeat(70));
@@ -15,7 +16,7 @@ function validateStructure(filePath) {
 
   try {
     // 1. Load file
-    const data = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+    const data = resolveBlobs(JSON.parse(fs.readFileSync(filePath, 'utf-8')));
     console.log('\n✅ JSON Parse: Valid');
 
     // 2. Check metadata
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 """
-Write correct Chapter 1 Logistics & Supply Chain data to ustav.json
+Write the curated Chapter 1 Logistics & Supply Chain data as an overlay
+The hand-written records below are turned into patches keyed by stable ID
+in data/overrides/ch1.json; parseUSTAV.py applies them on top of the parsed
+book instead of this script overwriting data/ustav.json.
 """
 
 import json
-import os
+from pathlib import Path
+
+from ustavModel import RECOVERY_TIMEFRAMES
+from ustavWriter import atomic_output
 
 # Define the complete Chapter 1 Logistics & Supply Chain data
 chapter_1_data = {
@@ -136,18 +142,101 @@ chapter_1_data = {
     ]
 }
 
+
+def chapter_patch(chapter):
+    """Curated chapter fields under the parser's keys"""
+    return {"title": chapter["title"], "intro": chapter["introduction"]}
+
+
+def problem_patch(problem):
+    """Curated problem fields under the parser's keys
+
+    businessCaseMetrics becomes the parser's businessCase figures, and the
+    placeholder failureModes section text is left to the book.
+    """
+    metrics = problem["businessCaseMetrics"]
+    current, outcome = metrics["currentState"], metrics["aiOutcome"]
+    sections = {name: text for name, text in problem["sections"].items() if name != "failureModes"}
+    return {
+        "title": problem["title"],
+        "promptability": problem["promptability"],
+        "sections": sections,
+        "businessCase": {
+            "currentState": {
+                "annualSpend": current["annualFreightSpend"],
+                "estimatedErrorRate": current["errorRatePercentage"] / 100,
+                "currentAnnualLoss": current["annualCostToCompany"]
+            },
+            "withAI": {
+                "annualBenefit": outcome["estimatedRecovery"],
+                "annualOperatingCost": outcome["annualOperatingCost"],
+                "year1NetRecovery": outcome["yearOneNet"]
+            },
+            "implementation": {"totalCost": outcome["implementationCost"]},
+            "payback": {"months": outcome["paybackMonths"]}
+        },
+        "metadata": {"severity": problem["severity"]}
+    }
+
+
+def prompt_patch(prompt):
+    """Curated prompt fields under the parser's keys
+
+    inputSchema is left out: the parser derives it, and the interpolation
+    plan, from the book's promptCode, which the curated schema does not
+    describe. The curated example output goes into the mock output's data.
+    """
+    example = dict(prompt["mockOutput"])
+    summary, records = example.pop("summary"), example.pop("topDisputes")
+    return {
+        "title": prompt["title"],
+        "version": prompt["version"],
+        "role": prompt["role"],
+        "severity": prompt["severity"],
+        "platformCompatibility": prompt["platformCompatibility"],
+        "mockOutput": {
+            "message": "Curated example output",
+            "data": {"summary": summary, "records": records, **example}
+        }
+    }
+
+
+def failure_mode_patch(failure_mode):
+    """Curated failure mode fields under the parser's keys; recovery steps become step objects"""
+    return {
+        "name": failure_mode["name"],
+        "symptom": failure_mode["symptom"],
+        "rootCause": failure_mode["rootCause"],
+        "recovery": {
+            key: {"timeframe": timeframe, "action": failure_mode["recovery"][key],
+                  "details": failure_mode["recovery"][key]}
+            for key, timeframe in RECOVERY_TIMEFRAMES
+        }
+    }
+
+
+def build_patches(data):
+    """Convert the curated tree into {stable ID: patch} for chapters, problems, prompts and failure modes"""
+    patches = {}
+    for chapter in data["chapters"]:
+        for problem in chapter.get("problems", []):
+            for prompt in problem.get("prompts", []):
+                patches[prompt["id"]] = prompt_patch(prompt)
+            for failure_mode in problem.get("failureModes", []):
+                patches[failure_mode["id"]] = failure_mode_patch(failure_mode)
+            patches[problem["id"]] = problem_patch(problem)
+        patches[chapter["id"]] = chapter_patch(chapter)
+    return patches
+
+
 # Write to file
-output_path = "data/ustav.json"
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(chapter_1_data, f, indent=2, ensure_ascii=False)
-
-print(f"✓ Successfully wrote Chapter 1 Logistics & Supply Chain data to {output_path}")
-print(f"  - Chapters: 1")
-print(f"  - Problems: 1")
-print(f"  - Prompts: 1")
-print(f"  - Failure Modes: 3")
-print(f"\nFile size: {os.path.getsize(output_path) / 1024:.1f} KB")
-print("\nChapter 1 finalized: Freight Invoice Audit (Problem 1.1)")
-print("Status: READY FOR TESTING")
+output_path = Path(__file__).parent.parent.parent / "data" / "overrides" / "ch1.json"
+patches = build_patches(chapter_1_data)
+
+with atomic_output(output_path) as f:
+    json.dump(patches, f, indent=2, ensure_ascii=False)
+
+print(f"✓ Successfully wrote Chapter 1 curated overrides to {output_path}")
+print(f"  - Patches: {len(patches)} ({', '.join(patches)})")
+print(f"\nFile size: {output_path.stat().st_size / 1024:.1f} KB")
+print("\nRun parseUSTAV.py to rebuild data/ustav.json with the overrides applied")
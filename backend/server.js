@@ -5,6 +5,8 @@ const path = require('path');
 const fs = require('fs');
 const apiRoutes = require('./routes/api');
 const ragRoutes = require('./routes/rag');
+const { resolveBlobs } = require('./rag/blobReader');
+const { watchReloadSentinel } = require('./rag/retrieval');
 
 const app = express();
 const PORT = process.env.PORT || 5000;
@@ -36,7 +38,7 @@ try {
     ustavPath = path.join(__dirname, '../data/ustav-from-txt.json');
   }
   const ustavData = fs.readFileSync(ustavPath, 'utf-8');
-  ustav = JSON.parse(ustavData);
+  ustav = resolveBlobs(JSON.parse(ustavData));
   console.log(`✓ Loaded USTAV data with ${ustav.chapters.length} chapters and ${ustav.metadata?.totalProblems || 'unknown'} problems`);
   console.log(`  >> Edition: ${ustav.metadata?.edition || 'unknown'}`);
   console.log(`  >> Target Audience: ${ustav.metadata?.targetAudience || 'unknown'}`);
@@ -45,6 +47,14 @@ try {
   process.exit(1);
 }
 
+// Hot reload after `parseUSTAV.py --watch --sentinel <file>` rebuilds
+if (process.env.USTAV_RELOAD_SENTINEL) {
+  watchReloadSentinel(path.resolve(process.env.USTAV_RELOAD_SENTINEL), (fresh) => {
+    Object.assign(ustav, fresh);
+    console.log(`✓ Reloaded USTAV data with ${ustav.chapters.length} chapters`);
+  });
+}
+
 // API Routes (includes RAG execution)
 app.use('/api', apiRoutes(ustav));
 app.use('/api/rag', ragRoutes);
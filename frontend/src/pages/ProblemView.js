@@ -3,6 +3,24 @@ import { useParams, Link } from 'react-router-dom';
 import axios from '../api/axios';
 import MarkdownRenderer from '../components/MarkdownRenderer';
 
+const DAYS_PER_MONTH = 365 / 12;
+
+// Payback months are unrounded, so sub-day paybacks show in hours or minutes
+function formatPayback(months) {
+  const days = months * DAYS_PER_MONTH;
+  const [amount, unit] = months >= 1 ? [months, 'months']
+    : days >= 1 ? [days, 'days']
+    : days * 24 >= 1 ? [days * 24, 'hours']
+    : [days * 1440, 'minutes'];
+  return `${Number(amount.toFixed(1))} ${unit}`;
+}
+
+// Inputs the ROI engine filled in when the book does not state them
+const ASSUMED_FIGURES = {
+  annualBenefit: 'annual benefit (derived)',
+  annualOperatingCost: 'operating cost ($0)'
+};
+
 function ProblemView() {
   const { chapterId, problemId } = useParams();
   const [problem, setProblem] = useState(null);
@@ -28,6 +46,7 @@ function ProblemView() {
   const sections = problem.sections || {};
   const prompts = problem.prompts || [];
   const businessCase = problem.businessCase || {};
+  const assumedFigures = (businessCase.assumed || []).map(key => ASSUMED_FIGURES[key] || key);
   const failureModes = problem.failureModes || [];
 
   return (
@@ -90,10 +109,10 @@ function ProblemView() {
                   <div className="case-metric-group">
                     <h3 className="metric-heading">Current State</h3>
                     <div className="metric-list">
-                      {businessCase.currentState.annualFreightSpend && (
+                      {(businessCase.currentState.annualSpend || businessCase.currentState.annualFreightSpend) && (
                         <div className="metric-item">
                           <span className="metric-label">Annual Spend</span>
-                          <span className="metric-value">${businessCase.currentState.annualFreightSpend.toLocaleString()}</span>
+                          <span className="metric-value">${(businessCase.currentState.annualSpend || businessCase.currentState.annualFreightSpend).toLocaleString()}</span>
                         </div>
                       )}
                       {businessCase.currentState.estimatedErrorRate && (
@@ -121,10 +140,21 @@ function ProblemView() {
                           <span className="metric-value highlight-gain">${businessCase.withAI.year1NetRecovery.toLocaleString()}</span>
                         </div>
                       )}
+                      {businessCase.withAI.roi != null && (
+                        <div className="metric-item">
+                          <span className="metric-label">Projected ROI</span>
+                          <span className="metric-value highlight-gain">{Math.round(businessCase.withAI.roi * 100)}%</span>
+                        </div>
+                      )}
                       {businessCase.payback && businessCase.payback.months && (
                         <div className="metric-item">
                           <span className="metric-label">Payback Period</span>
-                          <span className="metric-value">{businessCase.payback.months} months</span>
+                          <span className="metric-value">{formatPayback(businessCase.payback.months)}</span>
+                        </div>
+                      )}
+                      {businessCase.withAI.roi != null && assumedFigures.length > 0 && (
+                        <div className="metric-note">
+                          Not stated in the book, assumed for the projection: {assumedFigures.join(', ')}
                         </div>
                       )}
                     </div>
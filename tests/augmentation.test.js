@@ -0,0 +1,50 @@
+const { augment, applyInterpolationPlan } = require('../backend/rag/augmentation');
+
+const promptCode = 'Invoices: [User: Paste Data]\nContracts: [User: Paste Data]\nNotes: [User: Paste Data]';
+
+// Offsets of the three placeholders, as parseUSTAV.py writes them
+function slotsFor(code, inputKeys) {
+  const slots = [];
+  const pattern = /\[User:\s*Paste Data\]/g;
+  let match;
+  while ((match = pattern.exec(code)) !== null) {
+    slots.push({
+      start: match.index,
+      end: match.index + match[0].length,
+      inputKey: inputKeys[slots.length] || null
+    });
+  }
+  return slots;
+}
+
+describe('Interpolation plan', () => {
+  const plan = { slots: slotsFor(promptCode, ['input1', 'input2']) };
+
+  test('should fill each slot by its inputKey, whatever the key order', () => {
+    const result = applyInterpolationPlan(plan, promptCode, {
+      _followUp: 'ignored',
+      input2: 'contract data',
+      input1: 'invoice data'
+    });
+
+    expect(result).toBe('Invoices: invoice data\nContracts: contract data\nNotes: [User: Paste Data]');
+  });
+
+  test('should give slots without an input the remaining values in order', () => {
+    const result = applyInterpolationPlan(plan, promptCode, {
+      extra: 'extra notes',
+      input1: 'invoice data',
+      other: 'other data'
+    });
+
+    expect(result).toBe('Invoices: invoice data\nContracts: extra notes\nNotes: other data');
+  });
+
+  test('should match the plan-less augment output', () => {
+    const userData = { input1: 'invoice data', input2: 'contract data' };
+    const prompt = { id: 'ch1_p1_pr1', title: 'Auditor', promptCode };
+    const planned = { ...prompt, interpolationPlan: plan };
+
+    expect(augment(planned, userData)).toBe(augment(prompt, userData));
+  });
+});
@@ -0,0 +1,190 @@
+"""
+Regression tests for the USTAV parser and the build tools around it.
+
+The line-oriented state machine in USTAVParser.scan_failure_content must
+reproduce the lazy-regex extraction it replaced, byte for byte, on every
+failure mode in the real book. The remaining tests run the real book
+through the in-pass build diagnostics, the CSV validators compiled from
+prompt input schemas, the business-case figure extraction and the lookup
+service's indexes.
+"""
+
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend" / "scripts"))
+
+from benchmarkLookup import tree_walk
+from buildDiagnostics import BuildValidator, ValidationError
+from inputValidator import compile_schema
+from lookupService import Corpus, LookupService
+from parseUSTAV import USTAVParser
+from ustavModel import Problem
+
+
+def regex_failure_content(failure_content):
+    """Reference implementation: the original regex-based extraction"""
+    def recovery_step(recovery_text, timeframe):
+        pattern = f"{timeframe}[^\n]*\n([\\s\\S]+?)(?=\n\n|\\w+-Term|$)"
+        match = re.search(pattern, recovery_text, re.IGNORECASE)
+        return match.group(1).strip() if match else ""
+
+    symptom_match = re.search(r"What You See[\s\S]*?Symptom[^\n]*\n([\s\S]+?)(?=\n\nWhy It Happens|$)",
+                              failure_content, re.IGNORECASE)
+    root_cause_match = re.search(r"Why It Happens[\s\S]*?Root Cause[^\n]*\n([\s\S]+?)(?=\n\nHow to|$)",
+                                 failure_content, re.IGNORECASE)
+    recovery_match = re.search(r"How to Recover[\s\S]*?\n([\s\S]+?)(?=\n\nEmail|$)",
+                               failure_content, re.IGNORECASE)
+    recovery_text = recovery_match.group(1) if recovery_match else ""
+
+    return (
+        symptom_match.group(1).strip() if symptom_match else "",
+        root_cause_match.group(1).strip() if root_cause_match else "",
+        [recovery_step(recovery_text, t) for t in ("Immediate", "Short-Term", "Long-Term")]
+    )
+
+
+@pytest.fixture(scope="module")
+def parser():
+    parser = USTAVParser()
+    if not parser.book_path.exists():
+        pytest.skip("USTAV book not available")
+    assert parser.load_book()
+    parser.index_book()
+    return parser
+
+
+def failure_blocks(parser):
+    """Yield the content of every failure-mode block in the book"""
+    for chapter in parser.index:
+        for problem in chapter["problems"]:
+            section = problem["sections"].get(8)
+            if section is None:
+                continue
+            markers = [m for m in problem["failureModes"] if section["start"] <= m[0] < section["end"]]
+            for i, (_, marker_end) in enumerate(markers):
+                block_end = markers[i + 1][0] if i + 1 < len(markers) else section["end"]
+                header = parser.text(markers[i][0], marker_end)
+                content_start = marker_end if ":" in header else parser.line_after(marker_end)[1]
+                yield parser.text(content_start, block_end).strip()
+
+
+def test_state_machine_matches_regex_on_real_book(parser):
+    blocks = list(failure_blocks(parser))
+    assert len(blocks) >= 150
+
+    for content in blocks:
+        assert parser.scan_failure_content(content) == regex_failure_content(content)
+
+
+def test_every_failure_mode_has_symptom_and_immediate_recovery(parser):
+    for chapter in parser.index:
+        for problem in chapter["problems"]:
+            problem_id = f"{problem['chapter']}.{problem['number']}"
+            for failure_mode in parser.parse_failure_modes(problem, problem_id):
+                assert failure_mode["symptom"]
+                assert failure_mode["recovery"]["shortTerm"]["timeframe"] == "Short-Term"
+
+
+@pytest.mark.parametrize("content", [
+    "What You See (Symptom)\nLine one\nline two\n\nWhy It Happens (Root Cause)\nCause\n\nHow to Recover\n"
+    "Immediate\nDo it now\nShort-Term (Fix)\nFix it\n\nEmail to Your CEO\nBody",
+    "What You See\nno symptom heading here",
+    "How to Recover\nImmediate\n\nShort-Term\nwait for long-term fixes\nLong-Term\nplan",
+    "Why It Happens: Root Cause\n\nHow to Confirm\nstill part of the cause",
+])
+def test_state_machine_matches_regex_on_edge_cases(parser, content):
+    assert parser.scan_failure_content(content) == regex_failure_content(content)
+
+
+def test_real_book_validates_without_errors(parser):
+    validator = BuildValidator(parser)
+    for chapter in parser.index:
+        validator.check_chapter(parser.parse_chapter(chapter))
+    assert validator.errors == 0
+
+
+def test_strict_validation_stops_at_first_error(parser):
+    chapter = parser.parse_chapter(parser.index[0])
+    chapter["problems"][1] = {**chapter["problems"][1], "failureModes": []}
+    validator = BuildValidator(parser, strict=True)
+    with pytest.raises(ValidationError) as error:
+        validator.check_chapter(chapter)
+    diagnostic = error.value.diagnostic
+    assert (diagnostic["code"], diagnostic["id"]) == ("no-failure-modes", "ch1_p2")
+    assert diagnostic["byteOffset"] == len(parser.book_text[:parser.index[0]["problems"][1]["start"]].encode("utf-8"))
+
+
+def test_input_schema_compiles_to_streaming_csv_validator(parser):
+    prompt = Problem(parser, parser.index[0]["problems"][0]).prompts[0]
+    validator = compile_schema(prompt.input_schema)["input1"]
+    assert validator.types["Origin_Zip"] == "zip" and validator.types["Base_Rate"] == "number"
+
+    rows = ["carrier_name,Service Level,ORIGIN_ZIP,Dest_Zip,Base_Rate,Weight_Break,Notes"]
+    rows += [f"UPS,Ground,{10000 + i},{20000 + i},\"$1,{i:03d}.50\",{i},x" for i in range(25)]
+    rows[8] = "FedEx,Ground,ABCDE,20007,n/a,7,x"
+    report = validator.validate(io.StringIO("\n".join(rows) + "\n"), batch_rows=10, max_errors=2)
+    assert report.rows == 25
+    assert report.header["missing"] == ["Min_Charge"] and report.header["extra"] == ["Notes"]
+    assert report.errors_total == 3 and len(report.errors) == 2
+    assert report.errors[1]["line"] == 9 and report.errors[1]["code"] == "invalid-zip"
+    stats = report.to_dict()["columns"]
+    assert stats["Base_Rate"]["invalid"] == 1 and stats["Base_Rate"]["max"] == 1024.5
+    assert stats["Carrier_Name"]["top"] == [["UPS", 24]]
+
+
+def test_business_case_reads_the_book_phrasings(parser):
+    problems = {p["id"]: p for chapter in parser.index for p in parser.parse_chapter(chapter)["problems"]}
+    cases = {problem_id: problem["businessCase"] for problem_id, problem in problems.items()}
+    # "Annual Churn: 20%" and "Year 1 Net Recovery" stated in the implementation block
+    assert cases["ch2_p2"]["currentState"]["estimatedErrorRate"] == 0.2
+    assert cases["ch2_p2"]["withAI"]["year1NetRecovery"] == 320000
+    # "API Costs: <$1,000/year" is operating cost, out of the $16,000 year-one total
+    assert cases["ch3_p1"]["withAI"]["annualOperatingCost"] == 1000
+    assert cases["ch3_p1"]["implementation"]["totalCost"] == 15000
+    # "Reallocated AE Time ... ($96,000 annual value)" is a gain, not a cost
+    assert "annualOperatingCost" not in cases["ch8_p2"]["withAI"]
+    assert sum("estimatedErrorRate" in case["currentState"] for case in cases.values()) >= 23
+
+    roi_engine = pytest.importorskip("roiEngine")
+    analyses = roi_engine.BusinessCaseTable.from_cases(cases.items()).analyze()
+    assert analyses["ch1_p1"]["assumed"] == []
+    assert analyses["ch8_p2"]["assumed"] == ["annualOperatingCost"]
+    assert roi_engine.apply_analysis(cases["ch8_p2"], analyses["ch8_p2"])["assumed"] == ["annualOperatingCost"]
+
+
+def test_lookup_indexes_answer_like_the_tree_walk(parser):
+    ustav = {"chapters": [parser.parse_chapter(chapter) for chapter in parser.index],
+             "metadata": {"totalChapters": 10, "totalProblems": 50}}
+    corpus = Corpus(ustav)
+    service = LookupService("ustav.json")
+    service.swap(corpus, None, 0)
+    for prompt_id in corpus.prompts:
+        status, body = corpus.route(f"/prompts/{prompt_id}/inputs", "")
+        assert status == 200 and json.loads(body) == json.loads(tree_walk(ustav, "inputs", prompt_id))
+    assert corpus.route("/prompts/ch99_p1_pr1/inputs", "")[0] == 400
+    # Chapters are found by their "number" field, not by position
+    for chapter in ustav["chapters"]:
+        chapter["number"] += 1
+    corpus = Corpus(ustav)
+    for path in ("/chapters/3/problems", "/chapters/03/problems"):
+        status, body = corpus.route(path, "")
+        assert status == 200 and json.loads(body) == json.loads(tree_walk(ustav, "problems", 3))
+    assert corpus.route("/chapters/1/problems", "")[0] == 404
+    stats = json.loads(service.handle("/api/rag/stats")[1])
+    expected = json.loads(tree_walk(ustav, "stats", None))
+    assert list(expected) == ["timestamp", "uptime", "totalProblems", "totalChapters"]
+    assert [key for key in stats if key in expected] == list(expected)
+    assert stats["timestamp"].endswith("Z") and stats["totalProblems"] == 50
+    for query in ("freight invoice audit", "churn", "no such keyword anywhere"):
+        expected = json.loads(tree_walk(ustav, "search", query))
+        found = json.loads(corpus.search(query)[1])
+        assert found["success"] == expected["success"]
+        if expected["success"]:
+            assert (found["prompt"]["id"], found["searchScore"]) == (expected["prompt"]["id"], expected["searchScore"])
+    assert corpus.route("/prompts/ch99_p1_pr1", "")[0] == 404